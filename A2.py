@@ -1,8 +1,18 @@
 import streamlit as st
 from datetime import date
-from dateutil.relativedelta import relativedelta
-import pandas as pd
-import altair as alt
+from pathlib import Path
+import tempfile
+import time
+
+import instrumentacao
+
+# pandas/altair só são importados no primeiro cálculo ou gráfico (ver inicializacao.py)
+from inicializacao import alt, pd
+from rescisao import calcular_rescisoes_df, COLUNAS_ENTRADA
+from tabelas_impostos import IRRF
+from cenarios_rescisao import varrer_cenarios
+from grafo_rescisao import grafo_rescisao
+from extratos_rescisao import FORMATOS, exportar_extratos, fatiar
 
 # -----------------------
 # Metadados / Fontes (links oficiais usados dentro do app)
@@ -20,6 +30,9 @@ URL_INSS_2025_INFO = "https://www.gov.br/inss/pt-br/noticias/confira-como-ficara
 URL_RECEITA_TABELAS = "https://www.gov.br/receitafederal/pt-br/assuntos/meu-imposto-de-renda/tabelas" # Tabelas IR (Receita) - inclui 2024/2025
 # -----------------------
 
+# Tempos por seção (desligado por padrão; ver instrumentacao.py)
+instrumentacao.iniciar("A2.py")
+
 # --- 1. CONFIGURAÇÃO DA PÁGINA ---
 st.set_page_config(
     page_title="Calculadora Rescisória Simplificada (CLT) + Fontes Detalhadas",
@@ -27,86 +40,33 @@ st.set_page_config(
     layout="wide"
 )
 
-# --- 2. TABELAS DE IMPOSTOS (Mantidas) ---
-
-def get_inss_aliquota_e_deducao(salario_base):
-    # Tabela INSS Progressiva (exemplo com valores de 2025; função compatível com 2022/2023/2025)
-    # Faixas usadas no app (R$): 1.518,00 | 2.793,88 | 4.190,83 | 8.157,41
-    faixas = [
-        (1518.00, 0.075, 0.00),
-        (2793.88, 0.09, 22.77),
-        (4190.83, 0.12, 106.59),
-        (8157.41, 0.14, 190.40)
-    ]
-    if salario_base <= 0:
-        return 0.0
-    base_calculo = min(salario_base, faixas[-1][0])
-    
-    for teto, aliquota, deducao in reversed(faixas):
-        if base_calculo > teto:
-            return (base_calculo * aliquota) - deducao
-    return base_calculo * faixas[0][1]
-
-
-def get_irrf_aliquota_e_deducao(base_ir):
-    # Tabela IRRF usada no app (faixas e deduções que vigiaram em 2024/2025 até mudanças de maio/2025)
-    faixas = [
-        (2428.80, 0.00, 0.00),
-        (2826.65, 0.075, 182.16),
-        (3751.05, 0.15, 394.16),
-        (4664.68, 0.225, 675.49),
-        (999999.00, 0.275, 908.73)
-    ]
-    if base_ir <= 0:
-        return 0.0
-    for teto, aliquota, deducao in faixas:
-        if base_ir <= teto:
-            return (base_ir * aliquota) - deducao
-    return (base_ir * faixas[-1][1]) - faixas[-1][2]
-
-# --- 3. FUNÇÕES DE CÁLCULO (Lógica Trabalhista) ---
-
-def calcular_meses_proporcionais(admissao, demissao):
-    """
-    Calcula os meses proporcionais para 13º e Férias:
-    - Regra prática adotada: fracionamento de 15 dias ou mais conta como mês completo.
-    - Implementação via relativedelta para obter meses completos entre as datas.
-    """
-    if demissao <= admissao:
-        return 0, 0
-    
-    diferenca = relativedelta(demissao.replace(day=1), admissao.replace(day=1))
-    total_meses = diferenca.years * 12 + diferenca.months + 1
-
-    if demissao.day < 15 and diferenca.months > 0:
-          total_meses -= 1
-          
-    return total_meses, total_meses 
-
-
-def calcular_aviso_previo_indenizado(admissao, demissao, salario_base):
-    """
-    Aviso Prévio Indenizado:
-    - Base legal: CLT art. 487 + Lei 12.506/2011 (acréscimo de 3 dias por ano completo, até 60 dias adicionais)
-    - Dias = 30 dias + min(anos_completos*3, 60)
-    """
-    tempo_servico = relativedelta(demissao, admissao)
-    anos_trabalhados = tempo_servico.years
-    
-    dias_ap = 30
-    dias_adicionais = min(anos_trabalhados * 3, 60)
-    dias_ap += dias_adicionais
-    
-    valor_dia = salario_base / 30.0
-    valor_ap = valor_dia * dias_ap
-    
-    return valor_ap, dias_ap
+# ZIPs de extratos: uma pasta temporária por processo (removida ao encerrar o servidor); a cada nova geração
+# descarta os arquivos com mais de TTL_EXTRATOS_S segundos e mantém no máximo MAX_EXTRATOS (os mais recentes)
+TTL_EXTRATOS_S = 3600
+MAX_EXTRATOS = 20
 
-def calcular_saldo_salario(salario_base, dias_trabalhados_no_mes):
-    """Saldo de Salário = (salário / 30) * dias trabalhados (CLT - prática adotada)"""
-    valor_dia = salario_base / 30.0
-    saldo = valor_dia * dias_trabalhados_no_mes
-    return saldo
+
+@st.cache_resource
+def pasta_extratos():
+    return tempfile.TemporaryDirectory(prefix="extratos_")
+
+
+def podar_extratos(pasta):
+    limite = time.time() - TTL_EXTRATOS_S
+    arquivos = []
+    for arquivo in Path(pasta).glob("extratos_*.zip"):
+        try:
+            arquivos.append((arquivo.stat().st_mtime, arquivo))
+        except FileNotFoundError:  # removido por outra sessão no meio da varredura
+            pass
+    arquivos.sort(reverse=True)
+    for posicao, (modificado, arquivo) in enumerate(arquivos):
+        if posicao >= MAX_EXTRATOS - 1 or modificado < limite:  # abre espaço para o ZIP que será gravado
+            arquivo.unlink(missing_ok=True)
+
+
+# --- 2. TABELAS DE IMPOSTOS e 3. FUNÇÕES DE CÁLCULO (movidas para rescisao.py) ---
+# As mesmas funções atendem à tela (um empregado) e ao cálculo em lote (folha inteira).
 
 # --- 4. INTERFACE STREAMLIT (Layout preservado) ---
 
@@ -133,47 +93,28 @@ st.markdown("---")
 
 # --- 5. CÁLCULOS E RESULTADOS ---
 
+# O botão libera os resultados; depois disso, editar um campo recalcula só os nós que dependem dele
+# (grafo de dependências com cache por nó, um por sessão; ver grafo_rescisao.py)
 if st.button("Calcular Verbas Rescisórias", type="primary"):
-    # Saldo de Salário
-    valor_saldo_salario = calcular_saldo_salario(salario_base, dias_trabalhados)
-    
-    # Meses proporcionais para 13º e férias proporcionais (fixo 30 dias/12 avos)
-    meses_13_prop, meses_ferias_prop = calcular_meses_proporcionais(data_admissao, data_demissao)
-
-    # 13º Salário Proporcional (Lei 4.090/62)
-    valor_13_proporcional = (salario_base / 12) * meses_13_prop
-    
-    # Férias Proporcionais (sempre 30 dias / 12 avos) + 1/3 constitucional
-    valor_ferias_prop_base = (salario_base / 12) * meses_ferias_prop
-    valor_terco_prop = valor_ferias_prop_base / 3
-    valor_ferias_prop_total = valor_ferias_prop_base + valor_terco_prop
-    
-    # Aviso Prévio Indenizado
-    valor_ap, dias_ap = calcular_aviso_previo_indenizado(data_admissao, data_demissao, salario_base)
-    
-    # Multa FGTS (40%)
-    valor_multa_fgts = saldo_fgts_base * 0.40
-    
-    # --- CÁLCULO DE DESCONTOS ---
-    # 1. Base INSS (Principal): Apenas Saldo de Salário. Aviso Prévio Indenizado é isento de INSS (Súmula 449 TST).
-    base_inss_principal = valor_saldo_salario
-    inss_principal = get_inss_aliquota_e_deducao(base_inss_principal)
-
-    # 2. INSS sobre 13º Salário (tributado separadamente)
-    inss_13 = get_inss_aliquota_e_deducao(valor_13_proporcional)
-    
-    # 3. Base IRRF: Saldo de Salário + Aviso Prévio Indenizado - INSS Principal
-    base_irrf_principal = (valor_saldo_salario + valor_ap) - inss_principal
-    irrf_principal = get_irrf_aliquota_e_deducao(base_irrf_principal)
-    
-    # Total de Descontos
-    total_descontos = inss_principal + inss_13 + irrf_principal 
-    # ----------------------------------------
-    
-    # Totais
-    verbas_brutas_diretas = valor_saldo_salario + valor_ap + valor_13_proporcional + valor_ferias_prop_total
-    verbas_pagas_liquidas = verbas_brutas_diretas - total_descontos
-    total_liquido_simulado = verbas_pagas_liquidas + saldo_fgts_base + valor_multa_fgts
+    st.session_state["a2_calculado"] = True
+
+if st.session_state.get("a2_calculado"):
+    if "a2_grafo" not in st.session_state:
+        st.session_state["a2_grafo"] = grafo_rescisao()
+    grafo = st.session_state["a2_grafo"]
+    with instrumentacao.secao("calculo"):
+        r = grafo.avaliar({
+            'salario_base': salario_base,
+            'saldo_fgts': saldo_fgts_base,
+            'data_admissao': data_admissao,
+            'data_demissao': data_demissao,
+            'dias_trabalhados': dias_trabalhados,
+        })
+    valor_multa_fgts = r['multa_fgts']
+    total_descontos = r['total_descontos']
+    verbas_brutas_diretas = r['verbas_brutas']
+    verbas_pagas_liquidas = r['verbas_liquidas']
+    total_liquido_simulado = r['total_receber']
 
     # --- EXIBIÇÃO ---
     st.subheader("✅ Resumo dos Cálculos")
@@ -189,36 +130,16 @@ if st.button("Calcular Verbas Rescisórias", type="primary"):
     # 5.4. DETALHAMENTO E GRÁFICOS
     st.subheader("📊 Detalhamento de Valores")
     
-    df_verbas = pd.DataFrame({
-        'Verba': ['Saldo de Salário', '13º Salário Prop. (Avos)', 'Férias Proporcionais (+1/3)', 'Aviso Prévio', 'Multa FGTS (40%)'],
-        'Valor Bruto (R$)': [valor_saldo_salario, valor_13_proporcional, valor_ferias_prop_total, valor_ap, valor_multa_fgts],
-        'Natureza': ['Tributável (CLT, Art. 462)', 'Tributável (Lei 4.090/62)', 'Isenta (CLT, Art. 146)', 'Tributável para IRRF (CLT, Art. 487)', 'Isenta (Lei 8.036/90)']
-    })
-    
-    df_descontos = pd.DataFrame({
-        'Desconto': ['INSS (Saldo Salário)', 'INSS (13º Proporcional)', 'IRRF (Principal)'],
-        'Valor (R$)': [inss_principal, inss_13, irrf_principal],
-        'Base': ['SS', '13º', 'SS e AP (Após INSS)']
-    })
-
-    col_tabela, col_grafico = st.columns([1.5, 1])
-    with col_tabela:
-        st.markdown("#### Tabela de Proventos e Descontos")
-        st.dataframe(df_verbas.style.format({'Valor Bruto (R$)': 'R$ {:,.2f}'}), use_container_width=True, hide_index=True)
-        st.dataframe(df_descontos.style.format({'Valor (R$)': 'R$ {:,.2f}'}), use_container_width=True, hide_index=True)
-
-    with col_grafico:
-        st.markdown("#### Composição das Verbas Brutas (Pagamento Direto)")
-        df_pie = pd.DataFrame({
-            'Verba': ['Saldo Salário', '13º Prop.', 'Férias Prop.', 'Aviso Prévio'],
-            'Valor': [valor_saldo_salario, valor_13_proporcional, valor_ferias_prop_total, valor_ap]
-        })
-        chart_pie = alt.Chart(df_pie).mark_arc(outerRadius=120).encode(
-            theta=alt.Theta(field="Valor", type="quantitative"),
-            color=alt.Color(field="Verba", type="nominal"),
-            tooltip=['Verba', alt.Tooltip('Valor', format='$,.2f')]
-        ).properties(title='Verbas Pagas Diretamente (Exclui FGTS/Multa)')
-        st.altair_chart(chart_pie, use_container_width=True)
+    with instrumentacao.secao("tabelas_e_grafico"):
+        col_tabela, col_grafico = st.columns([1.5, 1])
+        with col_tabela:
+            st.markdown("#### Tabela de Proventos e Descontos")
+            st.dataframe(r['tabela_verbas'].style.format({'Valor Bruto (R$)': 'R$ {:,.2f}'}), use_container_width=True, hide_index=True)
+            st.dataframe(r['tabela_descontos'].style.format({'Valor (R$)': 'R$ {:,.2f}'}), use_container_width=True, hide_index=True)
+
+        with col_grafico:
+            st.markdown("#### Composição das Verbas Brutas (Pagamento Direto)")
+            st.vega_lite_chart(r['grafico_verbas'], use_container_width=True)
 
     st.markdown("---")
 
@@ -260,11 +181,8 @@ if st.button("Calcular Verbas Rescisórias", type="primary"):
 
     with tab_irrf:
         st.markdown("### Resumo IRRF (faixas e deduções aplicadas no app)")
-        st.table(pd.DataFrame({
-            'Base C. (Até)': ['R$ 2.428,80', 'R$ 2.826,65', 'R$ 3.751,05', 'R$ 4.664,68', 'Acima'],
-            'Alíquota': ['0%', '7,5%', '15,0%', '22,5%', '27,5%'],
-            'Dedução (R$)': ['0,00', '182,16', '394,16', '675,49', '908,73']
-        }))
+        st.caption(f"Tabela vigente na data de demissão (vigência a partir de {IRRF.vigencia(data_demissao):%d/%m/%Y}).")
+        st.table(r['tabela_irrf'])
         st.caption(f"Fonte: Receita Federal — tabelas de incidência (página geral de tabelas): {URL_RECEITA_TABELAS}")
 
     with tab_detalhadas:
@@ -291,4 +209,100 @@ if st.button("Calcular Verbas Rescisórias", type="primary"):
     st.markdown("---")
     st.info("⚠️ **Atenção:** Simulação baseada em dispositivos legais e em práticas de cálculo de folhas. Valores finais podem variar segundo Convenções Coletivas, acordos empresariais e decisões judiciais. Consulte sempre um profissional para casos concretos.")
 
+# --- 6. PROCESSAMENTO EM LOTE (folha inteira via CSV) ---
+st.markdown("---")
+with st.expander("📂 Processamento em Lote (CSV com vários empregados)"):
+    st.caption(f"Colunas obrigatórias: {', '.join(COLUNAS_ENTRADA)}. Datas no formato AAAA-MM-DD. "
+               "Para arquivos muito grandes use a linha de comando: `python rescisao.py entrada.csv saida.csv` "
+               "(extratos: `python extratos_rescisao.py entrada.csv extratos.zip`).")
+    arquivo_lote = st.file_uploader("Arquivo da folha (CSV):", type=["csv"])
+    if arquivo_lote is not None:
+        try:
+            with instrumentacao.secao("lote"):
+                df_entrada = pd.read_csv(arquivo_lote)
+                df_lote = calcular_rescisoes_df(df_entrada)
+        except ValueError as e:
+            st.error(f"Não foi possível processar o arquivo: {e}")
+        else:
+            st.success(f"{len(df_lote):,} rescisões calculadas. Total a receber (soma): R$ {df_lote['total_receber'].sum():,.2f}")
+            st.dataframe(df_lote.head(1000), use_container_width=True, hide_index=True)
+            st.download_button("Baixar resultado (CSV)", df_lote.to_csv(index=False).encode("utf-8"),
+                               file_name="rescisoes_calculadas.csv", mime="text/csv")
+
+            # Um extrato por empregado (mesmas tabelas da calculadora), renderizados em paralelo num ZIP
+            formatos_extrato = st.multiselect("Extratos individuais — formatos:", list(FORMATOS), default=["html"],
+                                              key="extratos_formatos")
+            if formatos_extrato and st.button("Gerar extratos (ZIP)", key="extratos_botao"):
+                # ZIP gravado direto num arquivo da pasta do processo (não fica inteiro em memória) e calculado no
+                # próprio processo: um pool com fork dentro do servidor multithread do Streamlit não é seguro
+                anterior = st.session_state.pop("extratos_zip", None)
+                if anterior:
+                    Path(anterior).unlink(missing_ok=True)
+                pasta = pasta_extratos().name
+                podar_extratos(pasta)
+                with tempfile.NamedTemporaryFile(dir=pasta, prefix="extratos_", suffix=".zip",
+                                                 delete=False) as zip_extratos:
+                    with st.spinner("Gerando extratos..."), instrumentacao.secao("extratos"):
+                        resumo_extratos = exportar_extratos(fatiar(df_entrada), zip_extratos, formatos_extrato,
+                                                            processos=1)
+                st.session_state["extratos_zip"] = zip_extratos.name
+                st.caption(f"{resumo_extratos['extratos']:,} extratos em {resumo_extratos['segundos']:.1f}s "
+                           f"({resumo_extratos['extratos_por_segundo']:,.0f} extratos/s).")
+                # Leitura do arquivo só no clique (download adiado), sem rerun
+                st.download_button("Baixar extratos (ZIP)", Path(zip_extratos.name).read_bytes,
+                                   file_name="extratos_rescisao.zip", mime="application/zip", on_click="ignore")
+
+# --- 7. SIMULAÇÃO DE CENÁRIOS (varredura de datas × salários × FGTS) ---
+with st.expander("🔎 Simulação de Cenários (ex.: demitir no dia 14 ou no dia 15?)"):
+    st.caption("Usa a data de admissão informada acima. Dias trabalhados no último mês = dia da demissão. "
+               "Células já calculadas ficam em memória: ampliar as faixas calcula apenas as novas.")
+    col_datas, col_sal, col_fgts = st.columns(3)
+    with col_datas:
+        periodo_demissao = st.date_input("Período de demissão:", value=(date(2025, 6, 1), date(2025, 6, 30)),
+                                         min_value=data_admissao, key="cenario_periodo")
+    with col_sal:
+        faixa_salario = st.slider("Faixa salarial (R$):", 500, 50000, (1500, 10000), step=500, key="cenario_salario")
+        passo_salario = st.number_input("Passo salarial (R$):", min_value=50, value=500, step=50, key="cenario_passo")
+    with col_fgts:
+        saldos_texto = st.text_input("Saldos de FGTS (R$, separados por ;):", value="0; 10000; 50000", key="cenario_fgts")
+
+    if st.button("Simular Cenários", key="cenario_botao"):
+        try:
+            saldos_cenario = [float(v.replace(",", ".")) for v in saldos_texto.split(";") if v.strip()]
+        except ValueError:
+            st.error("Saldos de FGTS inválidos. Use números separados por ';'.")
+            saldos_cenario = []
+        if len(periodo_demissao) == 2 and saldos_cenario:
+            # A grade fica na sessão para que trocar o indicador/saldo do mapa não exija nova simulação.
+            # processos=1: como nos extratos, nada de pool com fork dentro do servidor multithread do Streamlit
+            with instrumentacao.secao("cenarios"):
+                st.session_state["cenario_grade"] = varrer_cenarios(
+                    data_admissao,
+                    pd.date_range(periodo_demissao[0], periodo_demissao[1]),
+                    range(faixa_salario[0], faixa_salario[1] + 1, int(passo_salario)),
+                    saldos_cenario,
+                    processos=1
+                )
+
+    if "cenario_grade" in st.session_state:
+        grade = st.session_state["cenario_grade"]
+        st.caption(f"{len(grade):,} cenários — {int(grade['calculada_agora'].sum()):,} calculados agora, "
+                   f"{int((~grade['calculada_agora']).sum()):,} reaproveitados da memória.")
+        saldo_heatmap = st.selectbox("Saldo de FGTS exibido no mapa de calor:", grade['saldo_fgts'].unique(), key="cenario_saldo_mapa")
+        indicador = st.radio("Indicador:", ["custo_total", "total_receber"], horizontal=True, key="cenario_indicador",
+                             format_func=lambda v: "Custo Total (Empregador)" if v == "custo_total" else "Total a Receber (Empregado)")
+        with instrumentacao.secao("mapa_cenarios"):
+            df_mapa = grade[grade['saldo_fgts'] == saldo_heatmap].astype({'data_demissao': 'datetime64[ns]'})
+            mapa = alt.Chart(df_mapa).mark_rect().encode(
+                x=alt.X('yearmonthdate(data_demissao):O', title='Data de Demissão'),
+                y=alt.Y('salario_base:O', title='Salário (R$)', sort='descending'),
+                color=alt.Color(f'{indicador}:Q', title='R$'),
+                tooltip=['data_demissao:T', 'salario_base:Q',
+                         alt.Tooltip('custo_total:Q', format='$,.2f'), alt.Tooltip('total_receber:Q', format='$,.2f')]
+            )
+            st.altair_chart(mapa, use_container_width=True)
+        st.dataframe(grade.drop(columns='calculada_agora'), use_container_width=True, hide_index=True)
+
+instrumentacao.painel()
+
 # Fim do app
@@ -1,8 +1,14 @@
+from datetime import datetime
+
 import streamlit as st
-import plotly.graph_objects as go
-import pandas as pd
+
+import instrumentacao
+from freeflow_amostragem import LIMITE_PONTOS_GRAFICO, reduzir_se_longa, serie_amostrada
+from freeflow_figuras import dados_freeflow, figura_avulsa, figuras_freeflow
 
 st.set_page_config(page_title="Free Flow — Eficiência Regulatória da ANTT", layout="wide")
+# Tempos por seção (desligado por padrão; ver instrumentacao.py)
+instrumentacao.iniciar("AED.py")
 
 st.title("Free Flow no Brasil: Benefícios Superam os Custos de Enforcement")
 st.markdown("""
@@ -13,25 +19,14 @@ mostra que os **benefícios líquidos superam amplamente os custos de enforcemen
 ---
 """)
 
+# Figuras em cache (go.Figure por hash dos dados; ver freeflow_figuras.py)
+with instrumentacao.secao("figuras"):
+    figuras = figuras_freeflow()
+
 # ===================== GRÁFICO 1 — CAPEX =====================
 st.subheader("1️⃣ Redução de CAPEX: Free Flow vs. Modelo Tradicional")
 
-capex_data = pd.DataFrame({
-    "Modelo": ["Tradicional (3 Praças)", "Free Flow (3 Pórticos)"],
-    "Custo (R$ milhões)": [216.9, 30.7]
-})
-
-fig1 = go.Figure(go.Bar(
-    x=capex_data["Modelo"],
-    y=capex_data["Custo (R$ milhões)"],
-    text=capex_data["Custo (R$ milhões)"],
-    textposition="auto",
-    marker_color=["#C0392B", "#27AE60"]
-))
-fig1.update_layout(title="Redução de 86% no Custo de Capital (CAPEX)",
-                   yaxis_title="Custo Total (R$ milhões)",
-                   template="plotly_white")
-st.plotly_chart(fig1, use_container_width=True)
+st.plotly_chart(figuras["capex"], use_container_width=True)
 
 st.markdown("""
 💡 **Análise:**  
@@ -43,29 +38,7 @@ superando com folga qualquer perda potencial com inadimplência (~8%).
 # ===================== GRÁFICO 2 — OPEX =====================
 st.subheader("2️⃣ Redução de OPEX: Custos Operacionais Eliminados")
 
-opex_data = pd.DataFrame({
-    "Categoria": ["Pessoal (Arrecadadores, Conferentes, Líderes)", "Transporte de Valores", "Operação e Manutenção Eletrônica"],
-    "Modelo Tradicional (R$ milhões/ano)": [83, 10, 7],
-    "Modelo Free Flow (R$ milhões/ano)": [5, 0, 9]
-})
-
-fig2 = go.Figure()
-fig2.add_trace(go.Bar(
-    x=opex_data["Categoria"],
-    y=opex_data["Modelo Tradicional (R$ milhões/ano)"],
-    name="Tradicional",
-    marker_color="#C0392B"
-))
-fig2.add_trace(go.Bar(
-    x=opex_data["Categoria"],
-    y=opex_data["Modelo Free Flow (R$ milhões/ano)"],
-    name="Free Flow",
-    marker_color="#27AE60"
-))
-fig2.update_layout(barmode="group", template="plotly_white",
-                   title="Redução de Custos Operacionais (OPEX)",
-                   yaxis_title="Custo Estimado (R$ milhões/ano)")
-st.plotly_chart(fig2, use_container_width=True)
+st.plotly_chart(figuras["opex"], use_container_width=True)
 
 st.markdown("""
 💡 **Análise:**  
@@ -77,22 +50,27 @@ Essas economias **mais do que compensam** as perdas de receita decorrentes da in
 # ===================== GRÁFICO 3 — INADIMPLÊNCIA =====================
 st.subheader("3️⃣ Taxa de Inadimplência e Impontualidade (Sandbox ANTT)")
 
-inad_data = pd.DataFrame({
-    "Mês": ["jun/24", "jul/24", "ago/24", "set/24", "out/24"],
-    "Taxa de Inadimplência (%)": [6.5, 7.2, 8.0, 9.1, 8.5],
-    "Taxa de Impontualidade (%)": [11.8, 11.9, 11.8, 11.9, 11.8]
-})
-
-fig3 = go.Figure()
-fig3.add_trace(go.Scatter(x=inad_data["Mês"], y=inad_data["Taxa de Inadimplência (%)"],
-                          mode="lines+markers", name="Inadimplência", line=dict(color="red", width=3)))
-fig3.add_trace(go.Scatter(x=inad_data["Mês"], y=inad_data["Taxa de Impontualidade (%)"],
-                          mode="lines+markers", name="Impontualidade", line=dict(color="orange", width=3, dash="dash")))
-fig3.add_hline(y=8.03, line_dash="dot", line_color="gray",
-               annotation_text="Média de inadimplência: 8,03%", annotation_position="bottom right")
-fig3.update_layout(template="plotly_white", title="Tendência da Inadimplência e Impontualidade (2024)",
-                   yaxis_title="Percentual (%)", legend_title="Indicadores")
-st.plotly_chart(fig3, use_container_width=True)
+with instrumentacao.secao("serie_inadimplencia"):
+    serie_inad = dados_freeflow()["inadimplencia"]
+if len(serie_inad["Mês"]) > LIMITE_PONTOS_GRAFICO:
+    # Série diária/horária: o zoom é feito no servidor, sobre a série reduzida (ver freeflow_amostragem.py)
+    serie = serie_amostrada(serie_inad, "Mês")
+    primeiro, ultimo = serie.extremos()
+    if serie.posicional:
+        # Rótulos que não são datas (ex.: "jun/24"): zoom pela posição na série
+        inicio, fim = st.slider("Período exibido (posição na série)", primeiro, ultimo, (primeiro, ultimo))
+        st.caption(f"{serie_inad['Mês'][inicio]} a {serie_inad['Mês'][fim]}")
+    elif isinstance(primeiro, datetime):
+        inicio, fim = st.slider("Período exibido", min_value=primeiro, max_value=ultimo,
+                                value=(primeiro, ultimo), format="DD/MM/YY HH:mm")
+    else:
+        inicio, fim = st.slider("Período exibido", primeiro, ultimo, (primeiro, ultimo))
+    with instrumentacao.secao("janela_inadimplencia"):
+        # Uma figura por janela: montada na hora, sem gravar em .cache_freeflow/ (o zoom não acumula arquivos)
+        fig_janela = figura_avulsa("inadimplencia", reduzir_se_longa(serie_inad, inicio=inicio, fim=fim))
+    st.plotly_chart(fig_janela, use_container_width=True)
+else:
+    st.plotly_chart(figuras["inadimplencia"], use_container_width=True)
 
 st.markdown("""
 📊 **Análise:**  
@@ -105,23 +83,7 @@ e a ANTT respondeu com **smart regulation**, ajustando prazos e fluxos de pagame
 # ===================== GRÁFICO 4 — EFICIÊNCIA REGULATÓRIA =====================
 st.subheader("4️⃣ Regulação Inteligente da ANTT: Eficiência Líquida Positiva")
 
-eff_data = pd.DataFrame({
-    "Mês": ["jun/24", "jul/24", "ago/24", "set/24", "out/24"],
-    "Benefício Líquido (%)": [4.0, 5.5, 6.8, 8.2, 9.5],
-    "Inadimplência (%)": [6.5, 7.2, 8.0, 9.1, 8.5]
-})
-
-fig4 = go.Figure()
-fig4.add_trace(go.Scatter(x=eff_data["Mês"], y=eff_data["Benefício Líquido (%)"],
-                          mode="lines+markers", name="Benefício Líquido (Eficiência)",
-                          line=dict(color="green", width=3)))
-fig4.add_trace(go.Scatter(x=eff_data["Mês"], y=eff_data["Inadimplência (%)"],
-                          mode="lines+markers", name="Inadimplência",
-                          line=dict(color="red", width=3, dash="dash")))
-
-fig4.update_layout(template="plotly_white", title="Evolução da Eficiência Líquida — Benefícios Superam Custos",
-                   yaxis_title="Percentual (%)", legend_title="Indicadores")
-st.plotly_chart(fig4, use_container_width=True)
+st.plotly_chart(figuras["eficiencia"], use_container_width=True)
 
 st.markdown("""
 ✅ **Conclusão Geral:**  
@@ -132,3 +94,57 @@ reduzindo custos de enforcement e garantindo sustentabilidade financeira.
 ➡️ **Os benefícios (redução de CAPEX e OPEX + eficiência regulatória)** **superam amplamente** os custos decorrentes da inadimplência.  
 O custo de enforcement é **transitório**, enquanto os ganhos estruturais do Free Flow são **permanentes e cumulativos**.
 """)
+
+# ===================== GRÁFICO 5 — SIMULAÇÃO DE MONTE CARLO =====================
+st.subheader("5️⃣ Incerteza: Simulação de Monte Carlo do Benefício Líquido")
+
+
+@st.cache_data(show_spinner="Simulando cenários...", max_entries=16)
+def simulacao_freeflow(cenarios, horizonte, semente):
+    """Percentis ano a ano e resumo do benefício líquido (ver freeflow_montecarlo.py)."""
+    from freeflow_montecarlo import simular
+
+    resultado = simular(cenarios, horizonte=horizonte, semente=semente)
+    return resultado.leque().to_dict(orient='list'), resultado.resumo()
+
+
+def conclusao_simulacao(resumo, horizonte):
+    """Conclusão tirada da própria simulação: cauda inferior (P1, mínimo) e proporção de benefício negativo."""
+    cauda = (f"no pior 1% dos cenários o benefício acumulado em {horizonte} anos fica abaixo de "
+             f"R$ {resumo['p1']:,.1f} milhões (mínimo simulado: R$ {resumo['minimo']:,.1f} milhões)")
+    if resumo['prob_negativo'] == 0:
+        return (f"a economia de CAPEX e OPEX superou a perda de receita com inadimplência em todos os "
+                f"{resumo['cenarios']:,} cenários; {cauda}.")
+    if resumo['p5'] > 0:
+        return (f"a economia de CAPEX e OPEX supera a perda de receita com inadimplência em "
+                f"{resumo['prob_positivo']:.1%} dos cenários, mas o benefício é negativo em "
+                f"{resumo['prob_negativo']:.2%} deles; {cauda}.")
+    return (f"o resultado não é robusto: o benefício é negativo em {resumo['prob_negativo']:.1%} dos cenários "
+            f"(P5 de R$ {resumo['p5']:,.1f} milhões); {cauda}.")
+
+
+col_cenarios, col_horizonte, col_semente = st.columns(3)
+cenarios = col_cenarios.select_slider("Cenários", options=[100_000, 250_000, 500_000, 1_000_000], value=1_000_000)
+horizonte = col_horizonte.slider("Horizonte da concessão (anos)", min_value=10, max_value=35, value=30)
+semente = col_semente.number_input("Semente", min_value=0, value=0, step=1)
+
+with instrumentacao.secao("monte_carlo"):
+    leque, resumo = simulacao_freeflow(cenarios, horizonte, int(semente))
+    # Figura por combinação de parâmetros: montada na hora, sem gravar em .cache_freeflow/
+    fig_leque = figura_avulsa("leque", leque)
+st.plotly_chart(fig_leque, use_container_width=True)
+
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("P5 (R$ milhões)", f"{resumo['p5']:,.1f}")
+col2.metric("Mediana (R$ milhões)", f"{resumo['p50']:,.1f}")
+col3.metric("P95 (R$ milhões)", f"{resumo['p95']:,.1f}")
+col4.metric("Cenários com benefício positivo", f"{resumo['prob_positivo']:.1%}")
+
+st.markdown("""
+🎲 **Análise:**  
+Em vez de uma única estimativa, a simulação sorteia inadimplência, impontualidade, itens de OPEX, tráfego, tarifa
+e taxa de desconto a partir de distribuições calibradas nos dados acima.  
+As faixas mostram onde ficam 50%, 80% e 90% dos cenários para o **benefício líquido acumulado em valor presente**:
+""" + conclusao_simulacao(resumo, horizonte))
+
+instrumentacao.painel()
@@ -1,13 +1,19 @@
-import pandas as pd
+import sys
 
-df = pd.read_csv(
-    "BD_Consolidado_JF_Secao_23_Set_2025.csv",
-    sep=';',       # ou ',' dependendo do seu CSV
-    encoding='utf-8'  # ou 'latin1'
-)
+from jf_dados import carregar_jf, carregar_jf_compacto
 
-# Limpar espaços e quebras de linha
-df.columns = df.columns.str.strip().str.replace("\n", " ")
+# Leitura tipada via cache colunar (Parquet); o CSV só é relido quando muda.
+# Nomes de coluna já chegam limpos (sem espaços e quebras de linha).
+# Modo compacto (python background.py --compacto): inteiros reduzidos, colunas esparsas/vazias e categorias.
+if "--compacto" in sys.argv:
+    painel = carregar_jf_compacto()
+    df = painel.dados
+
+    # Uso de memória por coluna (antes/depois) para acompanhar a evolução entre versões do arquivo
+    print(painel.relatorio.to_string())
+    print(f"Colunas vazias removidas: {painel.colunas_vazias}")
+else:
+    df = carregar_jf()
 
 # Mostrar todas as colunas lidas
 print(df.columns.tolist())
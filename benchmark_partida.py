@@ -0,0 +1,139 @@
+"""
+Benchmark de partida a frio dos apps (um processo Python novo por medição).
+
+Para cada app:
+- importacao_ms: soma do tempo (cumulativo) das importações disparadas pelo próprio app,
+  medida com python -X importtime (as importações do Streamlit e do executor de testes ficam de fora)
+- primeira_renderizacao_ms: do início do processo até o fim da primeira execução do script no
+  executor headless do Streamlit (streamlit.testing.v1.AppTest)
+- execucao_ms: só a execução do script (sem a partida do interpretador e do Streamlit)
+- mais_pesados: módulos de maior tempo cumulativo importados pelo app
+
+Uso:
+  python benchmark_partida.py [app.py ...] [--repeticoes N] [--salvar base.json] [--comparar base.json] [--tolerancia 0.2]
+Com --comparar, termina com código 1 se algum app ficar mais de 'tolerancia' (20%) acima da base.
+"""
+import json
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+import time
+
+PASTA_APPS = Path(__file__).parent
+APPS = ['A2.py', 'AED.py', 'paises.py', 'teste.py', 'background.py']
+MARCADOR = '--- inicio do app ---'
+TIMEOUT_APP = 120
+
+# Executado no processo filho: prepara o AppTest, marca o início e roda o app uma vez
+_PROGRAMA_FILHO = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file({caminho!r}, default_timeout={timeout})
+app.secrets["openweather"] = "chave-benchmark"
+sys.stderr.write({marcador!r} + "\\n")
+sys.stderr.flush()
+inicio = time.perf_counter()
+app.run()
+fim = time.perf_counter()
+excecoes = [e.message for e in app.exception] if app.exception else []
+print(json.dumps({{"execucao_ms": (fim - inicio) * 1e3, "fim": time.time(), "excecoes": excecoes}}))
+"""
+
+
+def _importacoes(stderr, mais_pesados=5):
+    """Lê a saída de -X importtime depois do marcador: total das importações de nível mais alto e as mais pesadas."""
+    linhas = stderr.split(MARCADOR, 1)[-1].splitlines()
+    registros = []
+    for linha in linhas:
+        if not linha.startswith('import time:') or 'self [us]' in linha:
+            continue
+        _, cumulativo, nome = linha[len('import time:'):].split('|', 2)
+        profundidade = len(nome) - len(nome.lstrip())
+        registros.append((profundidade, int(cumulativo), nome.strip()))
+    if not registros:
+        return 0.0, []
+    raiz = min(profundidade for profundidade, _, _ in registros)
+    topo = [(cumulativo, nome) for profundidade, cumulativo, nome in registros if profundidade == raiz]
+    pesados = sorted(topo, reverse=True)[:mais_pesados]
+    return sum(c for c, _ in topo) / 1e3, [f"{nome} ({c / 1e3:.0f} ms)" for c, nome in pesados]
+
+
+def medir_app(app, pasta=PASTA_APPS):
+    """Uma medição de partida a frio de um app."""
+    caminho = str(Path(pasta) / app)
+    programa = _PROGRAMA_FILHO.format(caminho=caminho, timeout=TIMEOUT_APP, marcador=MARCADOR)
+    inicio = time.time()
+    processo = subprocess.run([sys.executable, '-X', 'importtime', '-c', programa], cwd=pasta,
+                              capture_output=True, text=True, timeout=TIMEOUT_APP + 60)
+    importacao_ms, pesados = _importacoes(processo.stderr)
+    try:
+        saida = json.loads(processo.stdout.strip().splitlines()[-1])
+    except (IndexError, ValueError):
+        return {'app': app, 'erro': processo.stderr.strip().splitlines()[-1:] or ['sem saída']}
+    return {
+        'app': app,
+        'importacao_ms': round(importacao_ms, 1),
+        'primeira_renderizacao_ms': round((saida['fim'] - inicio) * 1e3, 1),
+        'execucao_ms': round(saida['execucao_ms'], 1),
+        'mais_pesados': pesados,
+        'excecoes': saida['excecoes'],
+    }
+
+
+def benchmark(apps=APPS, repeticoes=3):
+    """Mediana de 'repeticoes' medições por app (cada uma num processo novo)."""
+    resultados = []
+    for app in apps:
+        medicoes = [medir_app(app) for _ in range(repeticoes)]
+        validas = [m for m in medicoes if 'erro' not in m]
+        if not validas:
+            resultados.append(medicoes[0])
+            continue
+        resumo = dict(validas[-1])
+        for campo in ('importacao_ms', 'primeira_renderizacao_ms', 'execucao_ms'):
+            resumo[campo] = round(statistics.median(m[campo] for m in validas), 1)
+        resultados.append(resumo)
+    return resultados
+
+
+def comparar(resultados, base, tolerancia=0.2):
+    """Apps cuja primeira renderização piorou mais que 'tolerancia' em relação à base."""
+    referencia = {r['app']: r for r in base if 'erro' not in r}
+    regressoes = []
+    for atual in resultados:
+        anterior = referencia.get(atual['app'])
+        if anterior and 'erro' not in atual:
+            limite = anterior['primeira_renderizacao_ms'] * (1 + tolerancia)
+            if atual['primeira_renderizacao_ms'] > limite:
+                regressoes.append(f"{atual['app']}: {anterior['primeira_renderizacao_ms']} -> "
+                                  f"{atual['primeira_renderizacao_ms']} ms")
+    return regressoes
+
+
+def _opcao(argumentos, nome, padrao=None):
+    if nome in argumentos:
+        posicao = argumentos.index(nome)
+        valor = argumentos[posicao + 1]
+        del argumentos[posicao:posicao + 2]
+        return valor
+    return padrao
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    repeticoes = int(_opcao(argumentos, '--repeticoes', 3))
+    salvar = _opcao(argumentos, '--salvar')
+    base = _opcao(argumentos, '--comparar')
+    tolerancia = float(_opcao(argumentos, '--tolerancia', 0.2))
+
+    resultados = benchmark(argumentos or APPS, repeticoes)
+    for resultado in resultados:
+        print(json.dumps(resultado, ensure_ascii=False))
+    if salvar:
+        Path(salvar).write_text(json.dumps(resultados, ensure_ascii=False, indent=2), encoding='utf-8')
+    if base:
+        regressoes = comparar(resultados, json.loads(Path(base).read_text(encoding='utf-8')), tolerancia)
+        for regressao in regressoes:
+            print(f"REGRESSÃO {regressao}")
+        sys.exit(1 if regressoes else 0)
@@ -0,0 +1,107 @@
+"""
+Varredura de cenários (análise de sensibilidade) da rescisão.
+
+- Avalia a grade cartesiana datas de demissão × salários × saldos de FGTS para uma admissão.
+- Cada célula calculada fica memorizada no processo (LRU de até LIMITE_CELULAS células, ~300 bytes cada):
+  ampliar a faixa só calcula as células novas.
+- Grades grandes são divididas em blocos e calculadas em um pool de processos.
+"""
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import os
+import threading
+
+from inicializacao import np, pd
+from rescisao import calcular_rescisoes_lote
+
+# Acima deste número de células novas o cálculo é distribuído entre processos
+LIMITE_PROCESSOS = 200_000
+TAMANHO_BLOCO = 100_000
+# Células memorizadas no processo (compartilhadas entre sessões): ~75 MB
+LIMITE_CELULAS = 250_000
+
+COLUNAS_GRADE = ['data_demissao', 'salario_base', 'saldo_fgts']
+
+# (admissão, demissão, salário, saldo FGTS) -> (custo total empregador, total líquido ao empregado), em ordem de uso
+_CACHE_CELULAS = OrderedDict()
+_TRAVA_CACHE = threading.Lock()
+
+
+def limpar_cache():
+    """Descarta as células memorizadas."""
+    with _TRAVA_CACHE:
+        _CACHE_CELULAS.clear()
+
+
+def dias_trabalhados_no_mes(datas_demissao):
+    """Dias trabalhados no mês da demissão: o próprio dia da demissão (limitado a 30)."""
+    datas = np.asarray(datas_demissao, dtype='datetime64[D]')
+    dias = (datas - datas.astype('datetime64[M]').astype('datetime64[D]')).astype(np.int64) + 1
+    return np.minimum(dias, 30)
+
+
+def _calcular_bloco(admissao, datas_demissao, salarios, saldos_fgts):
+    """Calcula um bloco de células (executado no processo principal ou em um processo do pool)."""
+    resultado = calcular_rescisoes_lote(salarios, saldos_fgts, np.full(len(datas_demissao), admissao),
+                                        datas_demissao, dias_trabalhados_no_mes(datas_demissao))
+    custo_total = (resultado['verbas_brutas'] + resultado['multa_fgts']).to_numpy()
+    return custo_total, resultado['total_receber'].to_numpy()
+
+
+def _calcular_pendentes(admissao, pendentes, processos):
+    """Calcula as células ainda não memorizadas, em blocos (pool de processos para grades grandes)."""
+    datas = pendentes['data_demissao'].to_numpy(dtype='datetime64[D]')
+    salarios = pendentes['salario_base'].to_numpy()
+    saldos = pendentes['saldo_fgts'].to_numpy()
+
+    if len(pendentes) < LIMITE_PROCESSOS or processos == 1:
+        return _calcular_bloco(admissao, datas, salarios, saldos)
+
+    cortes = range(0, len(pendentes), TAMANHO_BLOCO)
+    with ProcessPoolExecutor(max_workers=processos or os.cpu_count()) as pool:
+        futuros = [pool.submit(_calcular_bloco, admissao, datas[i:i + TAMANHO_BLOCO],
+                               salarios[i:i + TAMANHO_BLOCO], saldos[i:i + TAMANHO_BLOCO]) for i in cortes]
+        blocos = [futuro.result() for futuro in futuros]
+    return np.concatenate([b[0] for b in blocos]), np.concatenate([b[1] for b in blocos])
+
+
+def varrer_cenarios(data_admissao, datas_demissao, salarios, saldos_fgts, processos=None):
+    """
+    Avalia a grade completa de cenários e devolve um DataFrame (uma linha por célula) com:
+    - custo_total: verbas brutas + multa FGTS (desembolso do empregador na rescisão)
+    - total_receber: verbas líquidas + saque do FGTS + multa (valor recebido pelo empregado)
+    - calculada_agora: False quando a célula veio da memória
+    Uma grade maior que LIMITE_CELULAS é calculada inteira, mas só as últimas células ficam memorizadas.
+    """
+    admissao = pd.Timestamp(data_admissao).date()
+    grade = pd.MultiIndex.from_product(
+        [pd.to_datetime(list(datas_demissao)).date, list(salarios), list(saldos_fgts)],
+        names=COLUNAS_GRADE
+    ).to_frame(index=False)
+
+    chaves = [(admissao,) + celula for celula in zip(grade['data_demissao'], grade['salario_base'], grade['saldo_fgts'])]
+    valores = np.empty((len(chaves), 2))
+    novas = np.zeros(len(chaves), dtype=bool)
+    with _TRAVA_CACHE:
+        for i, chave in enumerate(chaves):
+            celula = _CACHE_CELULAS.get(chave)
+            if celula is None:
+                novas[i] = True
+            else:
+                _CACHE_CELULAS.move_to_end(chave)
+                valores[i] = celula
+
+    if novas.any():
+        custo, liquido = _calcular_pendentes(admissao, grade[novas], processos)
+        valores[novas, 0] = custo
+        valores[novas, 1] = liquido
+        with _TRAVA_CACHE:
+            for i, c, l in zip(np.flatnonzero(novas), custo, liquido):
+                _CACHE_CELULAS[chaves[i]] = (float(c), float(l))
+            while len(_CACHE_CELULAS) > LIMITE_CELULAS:
+                _CACHE_CELULAS.popitem(last=False)
+
+    grade['custo_total'] = valores[:, 0]
+    grade['total_receber'] = valores[:, 1]
+    grade['calculada_agora'] = novas
+    return grade
@@ -0,0 +1,354 @@
+"""
+Cliente do OpenWeather para o Assistente Matinal (teste.py).
+
+- Sessão HTTP persistente (pool de conexões) com timeouts de conexão e leitura.
+- Cache TTL + LRU por cidade normalizada (sem acentos, sem diferença de maiúsculas/espaços):
+  "Rio de Janeiro", "rio de janeiro " e "RIO DE JANEIRO" compartilham a mesma entrada.
+- Coalescência: sessões simultâneas pedindo a mesma cidade aguardam uma única chamada ao OpenWeather.
+- Contadores de acertos/faltas expostos em estatisticas().
+- Várias cidades de uma vez (asyncio + aiohttp): concorrência limitada, balde de fichas (token bucket)
+  único por processo respeitando a cota da API, timeout por requisição e relatório de falhas parciais.
+- ClienteClima.consultar_varias: o mesmo, servindo do cache do cliente as cidades já consultadas.
+
+Demonstração com servidor falso local: python clima.py
+Testes contra o mesmo servidor falso: pytest tests/test_clima.py
+"""
+import asyncio
+from collections import OrderedDict
+from concurrent.futures import Future
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import threading
+import time
+import unicodedata
+from urllib.parse import parse_qs, urlparse
+
+from inicializacao import preguicoso
+
+# Importados no primeiro uso: a página desenha antes de carregar requests/aiohttp
+aiohttp = preguicoso('aiohttp')
+requests = preguicoso('requests')
+
+URL_OPENWEATHER = "https://api.openweathermap.org/data/2.5/weather"
+TIMEOUT_PADRAO = (3.05, 10)  # (conexão, leitura) em segundos
+TTL_PADRAO = 600  # 10 minutos: o OpenWeather atualiza as condições a cada ~10 min
+MAX_CIDADES = 512
+# Cota do plano gratuito do OpenWeather: 60 chamadas/minuto
+COTA_POR_SEGUNDO = 1.0
+RAJADA_MAXIMA = 60
+CONCORRENCIA_PADRAO = 32
+
+
+def normalizar_cidade(cidade):
+    """Chave de cache: sem acentos, casefold e espaços colapsados ("São  Paulo " -> "sao paulo")."""
+    sem_acentos = unicodedata.normalize("NFKD", cidade)
+    sem_acentos = "".join(c for c in sem_acentos if not unicodedata.combining(c))
+    return " ".join(sem_acentos.casefold().split())
+
+
+class ClienteClima:
+    """
+    Cliente com pool de conexões, cache TTL/LRU e coalescência de requisições.
+    - consultar(cidade) -> (status HTTP, JSON da resposta), como o requests.get original.
+    - Apenas respostas 200 entram no cache; erros são repassados sem cache.
+    """
+
+    def __init__(self, chave_api, url_base=URL_OPENWEATHER, ttl=TTL_PADRAO, max_cidades=MAX_CIDADES,
+                 timeout=TIMEOUT_PADRAO, tamanho_pool=20):
+        self.chave_api = chave_api
+        self.url_base = url_base
+        self.ttl = ttl
+        self.max_cidades = max_cidades
+        self.timeout = timeout
+
+        self.sessao = requests.Session()
+        adaptador = requests.adapters.HTTPAdapter(pool_connections=tamanho_pool, pool_maxsize=tamanho_pool)
+        self.sessao.mount("https://", adaptador)
+        self.sessao.mount("http://", adaptador)
+
+        self._cache = OrderedDict()  # chave -> (expira_em, status, dados)
+        self._em_andamento = {}  # chave -> Future da chamada em curso
+        self._trava = threading.Lock()
+        self._contadores = {"acertos": 0, "faltas": 0, "coalescidas": 0, "chamadas_upstream": 0, "erros": 0}
+
+    def _buscar(self, cidade):
+        """Chamada real ao OpenWeather."""
+        with self._trava:
+            self._contadores["chamadas_upstream"] += 1
+        resposta = self.sessao.get(
+            self.url_base,
+            params={"q": cidade, "units": "metric", "lang": "pt_br", "appid": self.chave_api},
+            timeout=self.timeout,
+        )
+        return resposta.status_code, resposta.json()
+
+    def consultar(self, cidade):
+        """Condições atuais da cidade: (status HTTP, dados)."""
+        chave = normalizar_cidade(cidade)
+        with self._trava:
+            entrada = self._cache.get(chave)
+            if entrada is not None and entrada[0] > time.monotonic():
+                self._cache.move_to_end(chave)
+                self._contadores["acertos"] += 1
+                return entrada[1], entrada[2]
+            futuro = self._em_andamento.get(chave)
+            if futuro is not None:
+                self._contadores["coalescidas"] += 1
+                lider = False
+            else:
+                self._contadores["faltas"] += 1
+                futuro = self._em_andamento[chave] = Future()
+                lider = True
+
+        if not lider:
+            return futuro.result()
+
+        try:
+            status, dados = self._buscar(cidade.strip())
+        except Exception as erro:
+            with self._trava:
+                self._contadores["erros"] += 1
+                del self._em_andamento[chave]
+            futuro.set_exception(erro)
+            raise
+
+        with self._trava:
+            if status == 200:
+                self._guardar(chave, status, dados)
+            del self._em_andamento[chave]
+        futuro.set_result((status, dados))
+        return status, dados
+
+    def _guardar(self, chave, status, dados):
+        """Insere no cache TTL/LRU (chamado com self._trava adquirida)."""
+        self._cache[chave] = (time.monotonic() + self.ttl, status, dados)
+        self._cache.move_to_end(chave)
+        while len(self._cache) > self.max_cidades:
+            self._cache.popitem(last=False)
+
+    def consultar_varias(self, cidades, **opcoes):
+        """
+        Várias cidades de uma vez (consultar_cidades): um ResultadoCidade por cidade, na ordem recebida.
+        - Cidades em cache não vão ao OpenWeather; as demais são consultadas juntas, em paralelo.
+        - Como em consultar(), só respostas 200 entram no cache: timeouts, erros de rede e "cidade não
+          encontrada" são consultados de novo na próxima vez.
+        """
+        resultados = {}
+        faltantes = []
+        with self._trava:
+            agora = time.monotonic()
+            for cidade in cidades:
+                chave = normalizar_cidade(cidade)
+                entrada = self._cache.get(chave)
+                if entrada is not None and entrada[0] > agora:
+                    self._cache.move_to_end(chave)
+                    self._contadores["acertos"] += 1
+                    resultados[cidade] = ResultadoCidade(cidade, entrada[1], entrada[2])
+                else:
+                    faltantes.append(cidade)
+            self._contadores["faltas"] += len(faltantes)
+            self._contadores["chamadas_upstream"] += len(faltantes)
+
+        if faltantes:
+            for resultado in consultar_cidades(faltantes, self.chave_api, url_base=self.url_base, **opcoes):
+                resultados[resultado.cidade] = resultado
+                with self._trava:
+                    if resultado.ok:
+                        self._guardar(normalizar_cidade(resultado.cidade), resultado.status, resultado.dados)
+                    elif resultado.erro:
+                        self._contadores["erros"] += 1
+        return [resultados[cidade] for cidade in cidades]
+
+    def estatisticas(self):
+        """Contadores de cache (acertos, faltas, coalescidas, chamadas ao upstream, erros) e tamanho atual."""
+        with self._trava:
+            return dict(self._contadores, cidades_em_cache=len(self._cache))
+
+    def limpar_cache(self):
+        with self._trava:
+            self._cache.clear()
+
+# --- Várias cidades (assíncrono) ---
+
+class BaldeDeFichas:
+    """
+    Limitador de taxa (token bucket): 'taxa' fichas por segundo, acumulando até 'capacidade'.
+    - Trava de thread (não asyncio.Lock): o mesmo balde atende várias sessões do Streamlit, cada uma com
+      seu próprio laço de eventos (asyncio.run por chamada).
+    - Quem chega sem ficha reserva a próxima (o saldo fica negativo) e dorme só o tempo dela.
+    """
+
+    def __init__(self, taxa=COTA_POR_SEGUNDO, capacidade=RAJADA_MAXIMA):
+        self.taxa = taxa
+        self.capacidade = capacidade
+        self._fichas = float(capacidade)
+        self._ultimo = time.monotonic()
+        self._trava = threading.Lock()
+
+    def _reservar(self):
+        """Consome uma ficha e devolve quantos segundos esperar até ela estar disponível."""
+        with self._trava:
+            agora = time.monotonic()
+            self._fichas = min(self.capacidade, self._fichas + (agora - self._ultimo) * self.taxa)
+            self._ultimo = agora
+            self._fichas -= 1
+            return max(0.0, -self._fichas / self.taxa)
+
+    async def adquirir(self):
+        """Aguarda até haver uma ficha disponível e a consome."""
+        espera = self._reservar()
+        if espera:
+            await asyncio.sleep(espera)
+
+
+# A cota é da chave de API, não da chamada: um balde para o processo inteiro
+BALDE_PROCESSO = BaldeDeFichas()
+
+
+class ResultadoCidade:
+    """Resultado de uma cidade: status/dados em caso de resposta, ou a mensagem de erro (timeout, rede)."""
+
+    def __init__(self, cidade, status=None, dados=None, erro=None):
+        self.cidade = cidade
+        self.status = status
+        self.dados = dados
+        self.erro = erro
+
+    @property
+    def ok(self):
+        return self.erro is None and self.status == 200
+
+    def __repr__(self):
+        return f"ResultadoCidade({self.cidade!r}, status={self.status}, erro={self.erro!r})"
+
+
+async def _consultar_cidade(sessao, cidade, chave_api, url_base, semaforo, balde, timeout):
+    async with semaforo:
+        await balde.adquirir()
+        try:
+            parametros = {"q": cidade.strip(), "units": "metric", "lang": "pt_br", "appid": chave_api}
+            async with sessao.get(url_base, params=parametros, timeout=aiohttp.ClientTimeout(total=timeout)) as resposta:
+                return ResultadoCidade(cidade, resposta.status, await resposta.json(content_type=None))
+        except asyncio.TimeoutError:
+            return ResultadoCidade(cidade, erro=f"tempo esgotado ({timeout}s)")
+        except (aiohttp.ClientError, ValueError) as erro:
+            return ResultadoCidade(cidade, erro=str(erro) or erro.__class__.__name__)
+
+
+async def consultar_cidades_async(cidades, chave_api, url_base=URL_OPENWEATHER, concorrencia=CONCORRENCIA_PADRAO,
+                                  balde=None, timeout=TIMEOUT_PADRAO[1]):
+    """
+    Consulta várias cidades em paralelo (no máximo 'concorrencia' ao mesmo tempo) e devolve um
+    ResultadoCidade por cidade, na ordem recebida. Falhas de uma cidade não interrompem as demais.
+    - balde: por padrão BALDE_PROCESSO, compartilhado por todas as chamadas do processo.
+    """
+    semaforo = asyncio.Semaphore(concorrencia)
+    balde = balde or BALDE_PROCESSO
+    conector = aiohttp.TCPConnector(limit=concorrencia)
+    async with aiohttp.ClientSession(connector=conector) as sessao:
+        return await asyncio.gather(*(
+            _consultar_cidade(sessao, cidade, chave_api, url_base, semaforo, balde, timeout) for cidade in cidades
+        ))
+
+
+def consultar_cidades(cidades, chave_api, **opcoes):
+    """Versão síncrona de consultar_cidades_async (para uso direto no script Streamlit)."""
+    return asyncio.run(consultar_cidades_async(cidades, chave_api, **opcoes))
+
+# --- Servidor falso (desenvolvimento/benchmark, sem chave de API nem rede) ---
+
+def _resposta_falsa(cidade):
+    """JSON no formato do OpenWeather com valores determinísticos por cidade."""
+    semente = sum(map(ord, normalizar_cidade(cidade)))
+    return {
+        "name": cidade,
+        "main": {"temp": 10 + semente % 25, "humidity": 40 + semente % 55},
+        "weather": [{"description": "chuva fraca" if semente % 3 == 0 else "céu limpo"}],
+    }
+
+
+@contextmanager
+def servidor_falso(atraso=0.0, cidades_inexistentes=("cidade inexistente",), atrasos_por_cidade=None):
+    """
+    Sobe um servidor HTTP local que imita o endpoint /data/2.5/weather do OpenWeather.
+    - atraso: segundos de espera por requisição (simula a latência da API)
+    - atrasos_por_cidade: {cidade normalizada: segundos}, substitui 'atraso' para essas cidades
+    - Produz (url_base, contador de requisições recebidas).
+    """
+    atrasos_por_cidade = atrasos_por_cidade or {}
+    recebidas = {"total": 0}
+    trava = threading.Lock()
+
+    class Manipulador(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with trava:
+                recebidas["total"] += 1
+            cidade = parse_qs(urlparse(self.path).query).get("q", [""])[0]
+            espera = atrasos_por_cidade.get(normalizar_cidade(cidade), atraso)
+            if espera:
+                time.sleep(espera)
+            if normalizar_cidade(cidade) in cidades_inexistentes:
+                status, corpo = 404, {"cod": "404", "message": "city not found"}
+            else:
+                status, corpo = 200, _resposta_falsa(cidade)
+            conteudo = json.dumps(corpo).encode("utf-8")
+            try:
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(conteudo)))
+                self.end_headers()
+                self.wfile.write(conteudo)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # o cliente desistiu (timeout): comportamento esperado nos testes de tempo esgotado
+
+        def log_message(self, *args):
+            pass
+
+    class Servidor(ThreadingHTTPServer):
+        request_queue_size = 128  # aceita rajadas de conexões simultâneas
+
+    servidor = Servidor(("127.0.0.1", 0), Manipulador)
+    linha = threading.Thread(target=servidor.serve_forever, daemon=True)
+    linha.start()
+    try:
+        yield f"http://127.0.0.1:{servidor.server_port}/data/2.5/weather", recebidas
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+
+
+if __name__ == "__main__":
+    from concurrent.futures import ThreadPoolExecutor
+
+    with servidor_falso(atraso=0.2) as (url, recebidas):
+        cliente = ClienteClima("chave-falsa", url_base=url)
+        nomes = ["Rio de Janeiro", "rio de janeiro ", "RIO DE JANEIRO", "São Paulo", "sao paulo"] * 20
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(nomes)) as pool:
+            list(pool.map(cliente.consultar, nomes))
+        print(f"{len(nomes)} consultas simultâneas em {time.perf_counter() - inicio:.2f}s; "
+              f"requisições recebidas pelo servidor: {recebidas['total']}")
+        cliente.consultar("Rio de Janeiro")
+        print(cliente.estatisticas())
+
+    # Várias cidades: sequencial (um round-trip por cidade) x assíncrono (~um round-trip no total)
+    atraso = 0.3
+    escritorios = [f"Escritório {i}" for i in range(30)] + ["Cidade Inexistente"]
+    with servidor_falso(atraso=atraso) as (url, recebidas):
+        sequencial = ClienteClima("chave-falsa", url_base=url)
+        inicio = time.perf_counter()
+        for cidade in escritorios:
+            sequencial.consultar(cidade)
+        tempo_sequencial = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        resultados = consultar_cidades(escritorios, "chave-falsa", url_base=url)
+        tempo_async = time.perf_counter() - inicio
+        falhas = [r for r in resultados if not r.ok]
+        print(f"{len(escritorios)} cidades com atraso de {atraso}s: sequencial {tempo_sequencial:.2f}s, "
+              f"assíncrono {tempo_async:.2f}s; falhas parciais: {falhas}")
+
+    with servidor_falso(atraso=2.0) as (url, recebidas):
+        resultados = consultar_cidades(escritorios[:3], "chave-falsa", url_base=url, timeout=0.5)
+        print(f"Timeout por requisição (0.5s contra servidor de 2s): {resultados}")
@@ -0,0 +1,125 @@
+"""
+Aritmética de datas em lote (numpy datetime64) para os cálculos rescisórios.
+
+Substitui, no cálculo em lote, os relativedelta criados por empregado em
+calcular_meses_proporcionais e calcular_aviso_previo_indenizado, com a mesma semântica:
+- meses completos entre duas datas (dia ajustado ao fim do mês, ex.: 31/01 + 1 mês = 28/02 ou 29/02)
+- regra dos 15 dias para os meses proporcionais de 13º e férias
+- anos completos de serviço (aviso prévio proporcional)
+- datas ausentes (NaT) são rejeitadas com ValueError: sem data não há meses nem anos de serviço
+
+Testes de propriedade (hypothesis) contra as funções escalares: pytest tests/test_datas_vetorizadas.py
+Verificação em massa com datas aleatórias: python datas_vetorizadas.py [n] [semente]
+"""
+import sys
+
+from inicializacao import np
+
+
+def para_datetime64(datas):
+    """
+    Converte datas (date, strings ISO ou datetime64) em array datetime64[D].
+    - ValueError com as posições quando há datas ausentes (NaT, None, ''): a comparação com NaT é sempre
+      falsa e os meses sairiam como um inteiro sem sentido, em vez de um erro.
+    """
+    convertidas = np.asarray(datas, dtype='datetime64[D]')
+    ausentes = np.flatnonzero(np.isnat(convertidas))
+    if len(ausentes):
+        posicoes = ', '.join(map(str, ausentes[:10])) + (', ...' if len(ausentes) > 10 else '')
+        raise ValueError(f"{len(ausentes)} data(s) ausente(s) (NaT) na(s) posição(ões) {posicoes}")
+    return convertidas
+
+
+def _decompor(datas):
+    """Separa um array datetime64[D] em (mês absoluto desde 1970, dia do mês)."""
+    meses = datas.astype('datetime64[M]')
+    dias = (datas - meses.astype('datetime64[D]')).astype(np.int64) + 1
+    return meses.astype(np.int64), dias
+
+
+def _dias_no_mes(meses):
+    """Quantidade de dias de cada mês (mês absoluto desde 1970)."""
+    inicio = meses.astype('datetime64[M]').astype('datetime64[D]')
+    fim = (meses + 1).astype('datetime64[M]').astype('datetime64[D]')
+    return (fim - inicio).astype(np.int64)
+
+
+def meses_completos(inicio, fim):
+    """
+    Meses completos de 'inicio' até 'fim' (equivale a years*12 + months de relativedelta(fim, inicio)).
+    - Negativo quando fim < inicio, como no relativedelta.
+    """
+    inicio, fim = para_datetime64(inicio), para_datetime64(fim)
+    mes_ini, dia_ini = _decompor(inicio)
+    mes_fim, dia_fim = _decompor(fim)
+
+    meses = mes_fim - mes_ini
+    # inicio + meses cai no mês de 'fim', com o dia limitado ao último dia desse mês
+    dia_ajustado = np.minimum(dia_ini, _dias_no_mes(mes_fim))
+    meses = meses - ((fim >= inicio) & (dia_fim < dia_ajustado))
+    meses = meses + ((fim < inicio) & (dia_fim > dia_ajustado))
+    return meses
+
+
+def anos_completos(admissao, demissao):
+    """Anos completos de serviço (equivale a relativedelta(demissao, admissao).years; trunca em direção a zero)."""
+    meses = meses_completos(admissao, demissao)
+    return np.sign(meses) * (np.abs(meses) // 12)
+
+
+def meses_proporcionais(admissao, demissao):
+    """
+    Versão em lote de calcular_meses_proporcionais (rescisao.py):
+    - Meses entre os primeiros dias dos meses de admissão e demissão, + 1.
+    - Demissão antes do dia 15 descarta o último mês (apenas quando o componente de meses do relativedelta é > 0).
+    - Demissão na mesma data ou antes da admissão: 0.
+    """
+    admissao, demissao = para_datetime64(admissao), para_datetime64(demissao)
+    mes_adm, _ = _decompor(admissao)
+    mes_dem, dia_dem = _decompor(demissao)
+
+    diferenca = mes_dem - mes_adm
+    total_meses = diferenca + 1
+    total_meses = total_meses - ((dia_dem < 15) & (diferenca % 12 > 0))
+    return np.where(demissao <= admissao, 0, total_meses)
+
+
+def verificar_equivalencia(n=200_000, semente=0):
+    """
+    Compara o motor vetorizado com as funções escalares (relativedelta) em datas aleatórias,
+    concentrando casos de fim de mês, anos bissextos e demissões anteriores à admissão.
+    Retorna a lista de divergências (vazia quando equivalentes).
+    """
+    from datetime import date
+    from dateutil.relativedelta import relativedelta
+    from rescisao import calcular_meses_proporcionais
+
+    rng = np.random.default_rng(semente)
+    base = np.datetime64('1990-01-01')
+    admissao = base + rng.integers(0, 15_000, n).astype('timedelta64[D]')
+    # Metade das admissões cai nos últimos dias do mês (casos de ajuste de dia no relativedelta)
+    bordas = rng.random(n) < 0.5
+    meses_adm = admissao.astype('datetime64[M]')
+    admissao[bordas] = (meses_adm[bordas] + 1).astype('datetime64[D]') - rng.integers(1, 4, bordas.sum()).astype('timedelta64[D]')
+    demissao = admissao + rng.integers(-400, 15_000, n).astype('timedelta64[D]')
+
+    meses_vet = meses_proporcionais(admissao, demissao)
+    anos_vet = anos_completos(admissao, demissao)
+
+    divergencias = []
+    for i, (a, d) in enumerate(zip(admissao.astype(date), demissao.astype(date))):
+        meses_esc = calcular_meses_proporcionais(a, d)[0]
+        anos_esc = relativedelta(d, a).years
+        if meses_esc != meses_vet[i] or anos_esc != anos_vet[i]:
+            divergencias.append((a, d, (meses_esc, anos_esc), (int(meses_vet[i]), int(anos_vet[i]))))
+    return divergencias
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    semente = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    divergencias = verificar_equivalencia(n, semente)
+    print(f"{n} pares de datas verificados: {len(divergencias)} divergências")
+    for divergencia in divergencias[:20]:
+        print(divergencia)
+    sys.exit(1 if divergencias else 0)
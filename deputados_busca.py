@@ -0,0 +1,300 @@
+"""
+Índice de busca sobre deputados_2022.csv (e versões com várias legislaturas, mesmo layout).
+
+- Texto normalizado sem acentos e sem diferença de maiúsculas (ex.: 'Abílio' e 'ABILIO' -> 'abilio').
+- Busca por prefixo: lista ordenada das palavras de 'nome' e 'nome_civil' + busca binária.
+- Busca aproximada: postings de trigramas por texto único de nome/nome_civil e similaridade de Jaccard
+  (como o pg_trgm); nomes repetidos entre legislaturas são indexados uma vez só.
+- Facetas: conjuntos de linhas por partido, uf e sexo (e legislatura, se a coluna existir).
+- O índice é montado uma vez por processo e gravado em .cache_deputados/<hash do CSV>.pkl;
+  as próximas execuções apenas o desserializam.
+
+Uso: python deputados_busca.py "abilio" [--partido PSC] [--uf BA] [--sexo M] [--modo prefixo|aproximado|auto]
+Benchmark: python deputados_busca.py --benchmark
+"""
+from bisect import bisect_left
+from collections import Counter
+import csv
+import hashlib
+import heapq
+from pathlib import Path
+import pickle
+import re
+import sys
+import time
+import unicodedata
+
+ARQUIVO_DEPUTADOS = Path(__file__).with_name('deputados_2022.csv')
+PASTA_CACHE = Path(__file__).with_name('.cache_deputados')
+VERSAO_INDICE = 1
+
+CAMPOS_TEXTO = ['nome', 'nome_civil']
+FACETAS = ['partido', 'uf', 'sexo', 'legislatura']
+COLUNAS_RESULTADO = ['id', 'nome', 'nome_civil', 'partido', 'uf', 'sexo', 'legislatura']
+LIMIAR_SIMILARIDADE = 0.3
+
+_NAO_ALFANUMERICO = re.compile(r'[^0-9a-z]+')
+
+# Memória do processo: caminhos dos CSVs -> (assinatura (caminho, mtime_ns, tamanho) de cada um, índice)
+_INDICES = {}
+
+
+def normalizar(texto):
+    """Remove acentos, ignora maiúsculas e reduz pontuação a espaços: 'José Abílio' -> 'jose abilio'."""
+    decomposto = unicodedata.normalize('NFKD', str(texto))
+    sem_acento = ''.join(c for c in decomposto if not unicodedata.combining(c))
+    return _NAO_ALFANUMERICO.sub(' ', sem_acento.casefold()).strip()
+
+
+def trigramas(texto_normalizado):
+    """Trigramas por palavra, com espaços nas bordas (como o pg_trgm): 'ana' -> {'  a', ' an', 'ana', 'na '}."""
+    resultado = set()
+    for palavra in texto_normalizado.split():
+        palavra = f'  {palavra} '
+        resultado.update(palavra[i:i + 3] for i in range(len(palavra) - 2))
+    return resultado
+
+
+class IndiceDeputados:
+    """
+    Índice em memória.
+    - registros: lista de dicts (uma entrada por linha do CSV, sem o CPF)
+    - buscar(consulta, modo, partido, uf, sexo, legislatura, limite): lista de registros com 'pontuacao'
+    """
+
+    def __init__(self, linhas):
+        self.registros = [{coluna: linha.get(coluna) for coluna in COLUNAS_RESULTADO if coluna in linha} for linha in linhas]
+        self.facetas = {}
+        # Textos únicos de nome/nome_civil (repetidos entre legislaturas): trigramas indexados uma vez só
+        self._textos = {}
+        self._registros_texto = []
+        self._tamanhos = []
+        self._postings = {}
+        palavras = []
+        self._nomes = []
+
+        for posicao, registro in enumerate(self.registros):
+            for faceta in FACETAS:
+                if registro.get(faceta) not in (None, ''):
+                    self.facetas.setdefault(faceta, {}).setdefault(normalizar(registro[faceta]), set()).add(posicao)
+            for campo in CAMPOS_TEXTO:
+                texto = normalizar(registro.get(campo) or '')
+                palavras.extend((palavra, posicao) for palavra in set(texto.split()))
+                id_texto = self._textos.get(texto)
+                if id_texto is None:
+                    id_texto = self._textos[texto] = len(self._registros_texto)
+                    self._registros_texto.append([])
+                    grams = trigramas(texto)
+                    self._tamanhos.append(len(grams))
+                    for gram in grams:
+                        self._postings.setdefault(gram, []).append(id_texto)
+                if not self._registros_texto[id_texto] or self._registros_texto[id_texto][-1] != posicao:
+                    self._registros_texto[id_texto].append(posicao)
+            self._nomes.append(normalizar(registro.get('nome') or ''))
+
+        palavras.sort()
+        self._palavras = [palavra for palavra, _ in palavras]
+        self._posicoes_palavras = [posicao for _, posicao in palavras]
+
+    @classmethod
+    def de_estado(cls, estado):
+        """Reconstrói o índice a partir de estado() sem remontar as estruturas."""
+        indice = cls.__new__(cls)
+        indice.__dict__.update(estado)
+        return indice
+
+    def estado(self):
+        """Estruturas do índice (só tipos nativos), para serialização."""
+        return dict(self.__dict__)
+
+    def __len__(self):
+        return len(self.registros)
+
+    # --- Filtros e modos de busca ---
+
+    def _filtro(self, **valores):
+        """Interseção das facetas pedidas (None = sem filtro)."""
+        conjuntos = []
+        for faceta, valor in valores.items():
+            if valor is not None:
+                conjuntos.append(self.facetas.get(faceta, {}).get(normalizar(valor), set()))
+        if not conjuntos:
+            return None
+        return set.intersection(*sorted(conjuntos, key=len))
+
+    def _prefixo(self, palavra):
+        """Linhas com alguma palavra (em nome ou nome_civil) começando por 'palavra'."""
+        inicio = bisect_left(self._palavras, palavra)
+        fim = bisect_left(self._palavras, palavra + '\uffff', inicio)
+        return set(self._posicoes_palavras[inicio:fim])
+
+    def buscar_prefixo(self, consulta, permitidos=None):
+        """Todas as palavras da consulta precisam ser prefixo de alguma palavra do registro."""
+        palavras = normalizar(consulta).split()
+        if not palavras:
+            return []
+        encontrados = None
+        for palavra in sorted(palavras, key=len, reverse=True):
+            posicoes = self._prefixo(palavra)
+            encontrados = posicoes if encontrados is None else encontrados & posicoes
+            if not encontrados:
+                return []
+        if permitidos is not None:
+            encontrados &= permitidos
+        consulta_normalizada = ' '.join(palavras)
+        # Nome de urna começando pela consulta vale mais
+        return [(1.0 if self._nomes[p].startswith(consulta_normalizada) else 0.9, p) for p in encontrados]
+
+    def buscar_aproximado(self, consulta, permitidos=None, limiar=LIMIAR_SIMILARIDADE):
+        """Similaridade de trigramas (interseção / união), o maior valor entre nome e nome_civil."""
+        grams = trigramas(normalizar(consulta))
+        if not grams:
+            return []
+        comuns = Counter()
+        for gram in grams:
+            comuns.update(self._postings.get(gram, ()))
+        melhores = {}
+        for id_texto, iguais in comuns.items():
+            similaridade = iguais / (len(grams) + self._tamanhos[id_texto] - iguais)
+            if similaridade < limiar:
+                continue
+            for posicao in self._registros_texto[id_texto]:
+                if similaridade > melhores.get(posicao, 0.0) and (permitidos is None or posicao in permitidos):
+                    melhores[posicao] = similaridade
+        return [(s, p) for p, s in melhores.items()]
+
+    def buscar(self, consulta='', modo='auto', partido=None, uf=None, sexo=None, legislatura=None,
+               limite=10, limiar=LIMIAR_SIMILARIDADE):
+        """
+        - modo 'prefixo', 'aproximado' ou 'auto' (prefixo, completado pela busca aproximada)
+        - consulta vazia com filtros: lista os registros das facetas em ordem alfabética
+        """
+        permitidos = self._filtro(partido=partido, uf=uf, sexo=sexo, legislatura=legislatura)
+        if not normalizar(consulta):
+            pares = [(1.0, p) for p in (range(len(self)) if permitidos is None else permitidos)]
+        elif modo == 'prefixo':
+            pares = self.buscar_prefixo(consulta, permitidos)
+        elif modo == 'aproximado':
+            pares = self.buscar_aproximado(consulta, permitidos, limiar)
+        else:
+            pares = self.buscar_prefixo(consulta, permitidos)
+            if len(pares) < limite:
+                vistos = {p for _, p in pares}
+                pares += [(s * 0.9, p) for s, p in self.buscar_aproximado(consulta, permitidos, limiar) if p not in vistos]
+        # Maior pontuação primeiro, empate em ordem alfabética; só os 'limite' primeiros são ordenados
+        melhores = heapq.nsmallest(limite, pares, key=lambda par: (-par[0], self._nomes[par[1]]))
+        return [{**self.registros[p], 'pontuacao': round(s, 3)} for s, p in melhores]
+
+
+# --- Leitura e cache serializado ---
+
+def ler_linhas(caminhos):
+    """Linhas dos CSVs (utf-8 com ou sem BOM), na ordem dos arquivos."""
+    linhas = []
+    for caminho in caminhos:
+        with open(caminho, encoding='utf-8-sig', newline='') as arquivo:
+            linhas.extend(csv.DictReader(arquivo))
+    return linhas
+
+
+def _hash_arquivos(caminhos):
+    sha = hashlib.sha256(f'v{VERSAO_INDICE}'.encode())
+    for caminho in caminhos:
+        sha.update(Path(caminho).read_bytes())
+    return sha.hexdigest()[:16]
+
+
+def _assinatura(caminhos):
+    """(caminho, mtime_ns, tamanho) de cada CSV: detecta alterações sem ler o conteúdo."""
+    return tuple((str(c), estado.st_mtime_ns, estado.st_size) for c, estado in ((c, c.stat()) for c in caminhos))
+
+
+def carregar_indice(caminhos=(ARQUIVO_DEPUTADOS,), pasta_cache=PASTA_CACHE):
+    """
+    Índice dos CSVs dados, na ordem de preferência: memória do processo -> arquivo .pkl -> montagem.
+    - Memória: válida enquanto mtime e tamanho dos CSVs não mudam (só um stat por arquivo a cada chamada).
+    - .pkl: nomeado pelo hash do conteúdo; qualquer alteração nos CSVs gera um novo índice.
+    """
+    caminhos = [Path(c) for c in ([caminhos] if isinstance(caminhos, (str, Path)) else caminhos)]
+    assinatura = _assinatura(caminhos)
+    chave = tuple(str(c) for c in caminhos)
+    if chave in _INDICES and _INDICES[chave][0] == assinatura:
+        return _INDICES[chave][1]
+
+    hash_conteudo = _hash_arquivos(caminhos)
+    arquivo_indice = Path(pasta_cache) / f'deputados_{hash_conteudo}.pkl'
+    if arquivo_indice.exists():
+        with open(arquivo_indice, 'rb') as arquivo:
+            indice = IndiceDeputados.de_estado(pickle.load(arquivo))
+    else:
+        indice = IndiceDeputados(ler_linhas(caminhos))
+        arquivo_indice.parent.mkdir(parents=True, exist_ok=True)
+        temporario = arquivo_indice.with_suffix('.tmp')
+        with open(temporario, 'wb') as arquivo:
+            pickle.dump(indice.estado(), arquivo, protocol=pickle.HIGHEST_PROTOCOL)
+        temporario.replace(arquivo_indice)
+    _INDICES[chave] = (assinatura, indice)
+    return indice
+
+
+def benchmark(fator=100, repeticoes=2000):
+    """Montagem, carga do .pkl e tempo por consulta (µs), índice x varredura de strings no pandas."""
+    import pandas as pd
+    import tempfile
+
+    linhas = ler_linhas([ARQUIVO_DEPUTADOS])
+    # Versão ampliada (várias "legislaturas" com os mesmos nomes) para medir o crescimento
+    ampliadas = [{**linha, 'legislatura': str(57 - k)} for k in range(fator) for linha in linhas]
+    resultados = []
+    with tempfile.TemporaryDirectory() as pasta:
+        for nome, conjunto in (('2022', linhas), (f'x{fator}', ampliadas)):
+            caminho = Path(pasta) / f'deputados_{nome}.csv'
+            with open(caminho, 'w', encoding='utf-8', newline='') as arquivo:
+                escritor = csv.DictWriter(arquivo, fieldnames=list(conjunto[0]))
+                escritor.writeheader()
+                escritor.writerows(conjunto)
+
+            _INDICES.clear()
+            inicio = time.perf_counter()
+            indice = carregar_indice([caminho], Path(pasta) / 'cache')
+            montagem = time.perf_counter() - inicio
+            _INDICES.clear()
+            inicio = time.perf_counter()
+            carregar_indice([caminho], Path(pasta) / 'cache')
+            carga = time.perf_counter() - inicio
+
+            df = pd.read_csv(caminho, dtype=str)
+            def medir(funcao, n):
+                inicio = time.perf_counter()
+                for _ in range(n):
+                    funcao()
+                return (time.perf_counter() - inicio) / n * 1e6
+
+            resultados.append({
+                'registros': len(indice),
+                'montagem_ms': round(montagem * 1e3, 1),
+                'carga_pkl_ms': round(carga * 1e3, 1),
+                'prefixo_us': round(medir(lambda: indice.buscar('abi', 'prefixo'), repeticoes), 1),
+                'prefixo_filtro_us': round(medir(lambda: indice.buscar('jose', 'prefixo', uf='SP'), repeticoes), 1),
+                'aproximado_us': round(medir(lambda: indice.buscar('abilio santanna', 'aproximado'), repeticoes), 1),
+                'pandas_contains_us': round(medir(lambda: df[df['nome'].str.contains('Abí', case=False)
+                                                             | df['nome_civil'].str.contains('ABI', case=False)],
+                                                  max(repeticoes // 20, 5)), 1),
+            })
+    return resultados
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    if argumentos and argumentos[0] == '--benchmark':
+        for linha in benchmark():
+            print(linha)
+        sys.exit()
+    opcoes = {}
+    for opcao in ('--partido', '--uf', '--sexo', '--modo', '--legislatura'):
+        if opcao in argumentos:
+            posicao = argumentos.index(opcao)
+            opcoes[opcao[2:]] = argumentos[posicao + 1]
+            del argumentos[posicao:posicao + 2]
+    for registro in carregar_indice().buscar(' '.join(argumentos), **opcoes):
+        print(registro)
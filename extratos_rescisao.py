@@ -0,0 +1,370 @@
+"""
+Extratos de rescisão em lote: um extrato por empregado (CSV, XLSX e/ou HTML) dentro de um único ZIP.
+
+- Cada extrato repete as tabelas da calculadora (A2.py): verbas com a natureza/base legal de cada linha,
+  descontos com base de cálculo e base legal, e os totais (linhas em rescisao.LINHAS_VERBAS/LINHAS_DESCONTOS).
+- A entrada é lida em blocos (CSV com as colunas de rescisao.COLUNAS_ENTRADA); cada bloco é calculado e
+  renderizado num processo do pool e o ZIP é gravado em sequência, à medida que os blocos ficam prontos.
+  No máximo 2 blocos por processo ficam em voo, mas o índice do ZIP (um ZipInfo por arquivo, gravado no
+  fim) fica em memória até o fim: o pico cresce cerca de 1 KB por arquivo (--benchmark, 1 processo:
+  ~120 MB com 500 empregados, ~185 MB com 20 mil em três formatos = 60 mil arquivos).
+- XLSX sem dependências extras: planilha mínima (SpreadsheetML) montada aqui mesmo.
+- Identificação do empregado: primeira coluna presente entre COLUNAS_IDENTIFICACAO; senão, o número da linha.
+
+Linha de comando:
+  python extratos_rescisao.py entrada.csv extratos.zip [--formatos csv,xlsx,html] [--processos N] [--bloco 2000]
+  python extratos_rescisao.py --benchmark 20000 [--formatos ...] [--processos N]
+"""
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import html
+import io
+import os
+import re
+import sys
+import time
+import zipfile
+
+from inicializacao import np, pd
+from rescisao import COLUNAS_ENTRADA, LINHAS_DESCONTOS, LINHAS_VERBAS, calcular_rescisoes_df
+
+FORMATOS = ('csv', 'xlsx', 'html')
+COLUNAS_IDENTIFICACAO = ('matricula', 'nome', 'id')
+TAMANHO_BLOCO = 2000
+
+# --- 1. CONTEÚDO DO EXTRATO ---
+
+def _brl(valor):
+    return "R$ " + f"{valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def _data(valor):
+    return str(valor)[:10]
+
+
+def _secoes(registro, identificacao):
+    """Cabeçalho, verbas, descontos e totais de um empregado (linha de calcular_rescisoes_df)."""
+    cabecalho = [
+        ('Empregado', identificacao),
+        ('Admissão', _data(registro['data_admissao'])),
+        ('Demissão', _data(registro['data_demissao'])),
+        ('Salário Mensal Bruto (R$)', float(registro['salario_base'])),
+        ('Dias Trabalhados no Último Mês', int(registro['dias_trabalhados'])),
+        ('Meses Proporcionais (13º/Férias)', int(registro['meses_proporcionais'])),
+        ('Dias de Aviso Prévio', int(registro['dias_aviso_previo'])),
+    ]
+    verbas = [(rotulo, float(registro[coluna]), natureza) for rotulo, coluna, natureza in LINHAS_VERBAS]
+    descontos = [(rotulo, float(registro[coluna]), base, base_legal)
+                 for rotulo, coluna, base, base_legal in LINHAS_DESCONTOS]
+    totais = [
+        ('Total Verbas Brutas (Pagamento Direto)', float(registro['verbas_brutas'])),
+        ('Total de Descontos (INSS/IRRF)', float(registro['total_descontos'])),
+        ('Total de Verbas Líquidas', float(registro['verbas_liquidas'])),
+        ('Saldo do FGTS', float(registro['saldo_fgts'])),
+        ('Saque FGTS e Total a Receber', float(registro['total_receber'])),
+    ]
+    return cabecalho, verbas, descontos, totais
+
+
+def _linhas(secoes):
+    """As seções como linhas de planilha (CSV e XLSX)."""
+    cabecalho, verbas, descontos, totais = secoes
+    return [
+        ['Extrato de Rescisão (CLT) — Demissão Sem Justa Causa'],
+        *[[campo, valor] for campo, valor in cabecalho],
+        [],
+        ['Verba', 'Valor Bruto (R$)', 'Natureza'],
+        *[list(linha) for linha in verbas],
+        [],
+        ['Desconto', 'Valor (R$)', 'Base', 'Base Legal'],
+        *[list(linha) for linha in descontos],
+        [],
+        *[[rotulo, valor] for rotulo, valor in totais],
+    ]
+
+
+# --- 2. FORMATOS ---
+
+def _csv(secoes):
+    saida = io.StringIO()
+    escritor = csv.writer(saida, lineterminator='\n')
+    for linha in _linhas(secoes):
+        escritor.writerow([f"{v:.2f}" if isinstance(v, float) else v for v in linha])
+    return saida.getvalue().encode('utf-8')
+
+
+def _html(secoes):
+    cabecalho, verbas, descontos, totais = secoes
+    e = html.escape
+
+    def tabela(titulos, linhas):
+        celulas = ''.join(f"<th>{e(t)}</th>" for t in titulos)
+        corpo = ''.join(
+            '<tr>' + ''.join(f'<td class="valor">{_brl(v)}</td>' if isinstance(v, float) else f"<td>{e(str(v))}</td>"
+                             for v in linha) + '</tr>'
+            for linha in linhas
+        )
+        return f"<table><thead><tr>{celulas}</tr></thead><tbody>{corpo}</tbody></table>"
+
+    dados = ''.join(f"<dt>{e(campo)}</dt><dd>{_brl(valor) if isinstance(valor, float) else e(str(valor))}</dd>"
+                    for campo, valor in cabecalho)
+    return (
+        '<!DOCTYPE html><html lang="pt-BR"><head><meta charset="utf-8">'
+        f"<title>Extrato de Rescisão — {e(str(cabecalho[0][1]))}</title><style>{_ESTILO_HTML}</style></head><body>"
+        '<h1>Extrato de Rescisão (CLT) — Demissão Sem Justa Causa</h1>'
+        f"<dl>{dados}</dl>"
+        f"<h2>Proventos</h2>{tabela(['Verba', 'Valor Bruto (R$)', 'Natureza'], verbas)}"
+        f"<h2>Descontos</h2>{tabela(['Desconto', 'Valor (R$)', 'Base', 'Base Legal'], descontos)}"
+        f"<h2>Totais</h2>{tabela(['Resumo', 'Valor (R$)'], totais)}"
+        '<p class="nota">Simulação baseada em dispositivos legais e em práticas de cálculo de folhas. '
+        'Valores finais podem variar segundo Convenções Coletivas, acordos e decisões judiciais.</p>'
+        '</body></html>'
+    ).encode('utf-8')
+
+
+_ESTILO_HTML = (
+    "body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;margin-bottom:1em}"
+    "th,td{border:1px solid #ccc;padding:4px 8px;text-align:left}td.valor{text-align:right}"
+    "dl{display:grid;grid-template-columns:max-content auto;gap:2px 12px}dd{margin:0}.nota{color:#666;font-size:small}"
+)
+
+# Partes fixas da planilha XLSX; só a folha (sheet1.xml) muda por empregado
+_XLSX_FIXOS = {
+    '[Content_Types].xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        '<Override PartName="/xl/workbook.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+        '<Override PartName="/xl/worksheets/sheet1.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        '<Override PartName="/xl/styles.xml" '
+        'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+        '</Types>'
+    ),
+    '_rels/.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+        'Target="xl/workbook.xml"/></Relationships>'
+    ),
+    'xl/workbook.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+        '<sheets><sheet name="Extrato" sheetId="1" r:id="rId1"/></sheets></workbook>'
+    ),
+    'xl/_rels/workbook.xml.rels': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        '<Relationship Id="rId1" '
+        'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        'Target="worksheets/sheet1.xml"/>'
+        '<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" '
+        'Target="styles.xml"/></Relationships>'
+    ),
+    'xl/styles.xml': (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        '<numFmts count="1"><numFmt numFmtId="164" formatCode="&quot;R$&quot; #,##0.00"/></numFmts>'
+        '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+        '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+        '<fills count="2"><fill><patternFill patternType="none"/></fill>'
+        '<fill><patternFill patternType="gray125"/></fill></fills>'
+        '<borders count="1"><border><left/><right/><top/><bottom/><diagonal/></border></borders>'
+        '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+        '<cellXfs count="3"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+        '<xf numFmtId="164" fontId="0" fillId="0" borderId="0" xfId="0" applyNumberFormat="1"/>'
+        '<xf numFmtId="0" fontId="1" fillId="0" borderId="0" xfId="0" applyFont="1"/></cellXfs>'
+        '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+        '</styleSheet>'
+    ),
+}
+_XLSX_COLUNAS = '<cols><col min="1" max="1" width="40" customWidth="1"/><col min="2" max="2" width="18" customWidth="1"/>' \
+                '<col min="3" max="4" width="45" customWidth="1"/></cols>'
+_TITULOS = {'Verba', 'Desconto'}
+
+
+def _xlsx(secoes):
+    linhas_xml = []
+    for numero, linha in enumerate(_linhas(secoes), start=1):
+        negrito = numero == 1 or (linha and linha[0] in _TITULOS)
+        celulas = []
+        for coluna, valor in zip('ABCD', linha):
+            ref = f"{coluna}{numero}"
+            if isinstance(valor, (int, float)):
+                estilo = ' s="1"' if isinstance(valor, float) else ''
+                celulas.append(f'<c r="{ref}"{estilo}><v>{valor!r}</v></c>')
+            else:
+                estilo = ' s="2"' if negrito else ''
+                celulas.append(f'<c r="{ref}" t="inlineStr"{estilo}><is><t>{html.escape(str(valor), quote=False)}</t></is></c>')
+        linhas_xml.append(f'<row r="{numero}">{"".join(celulas)}</row>')
+    folha = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+        f"{_XLSX_COLUNAS}<sheetData>{''.join(linhas_xml)}</sheetData></worksheet>"
+    )
+    saida = io.BytesIO()
+    with zipfile.ZipFile(saida, 'w') as planilha:
+        # Partes fixas são pequenas: guardadas sem compressão (um compressor zlib a menos por parte)
+        for nome, conteudo in _XLSX_FIXOS.items():
+            planilha.writestr(nome, conteudo, zipfile.ZIP_STORED)
+        planilha.writestr('xl/worksheets/sheet1.xml', folha, zipfile.ZIP_DEFLATED)
+    return saida.getvalue()
+
+
+_RENDERIZADORES = {'csv': _csv, 'xlsx': _xlsx, 'html': _html}
+
+
+# --- 3. BLOCOS (processos do pool) E ZIP ---
+
+def _coluna_identificacao(colunas):
+    return next((c for c in COLUNAS_IDENTIFICACAO if c in colunas), None)
+
+
+def _nome_arquivo(indice, identificacao):
+    sufixo = re.sub(r'[^\w.-]+', '_', str(identificacao)).strip('_')[:60]
+    return f"{indice:07d}_{sufixo}" if sufixo and sufixo != str(indice) else f"{indice:07d}"
+
+
+def _renderizar_bloco(argumentos):
+    """Calcula e renderiza um bloco da folha; devolve [(nome no ZIP, conteúdo)]."""
+    bloco, formatos = argumentos
+    resultado = calcular_rescisoes_df(bloco)
+    coluna_id = _coluna_identificacao(resultado.columns)
+    arquivos = []
+    for indice, registro in zip(resultado.index, resultado.to_dict('records')):
+        identificacao = registro[coluna_id] if coluna_id else indice
+        secoes = _secoes(registro, identificacao)
+        nome = _nome_arquivo(indice, identificacao)
+        for formato in formatos:
+            arquivos.append((f"{formato}/{nome}.{formato}", _RENDERIZADORES[formato](secoes)))
+    return len(resultado), arquivos
+
+
+def _blocos_renderizados(blocos, formatos, processos):
+    """Renderiza os blocos na ordem, com no máximo 2 blocos por processo em voo."""
+    if not processos or processos <= 1:
+        for bloco in blocos:
+            yield _renderizar_bloco((bloco, formatos))
+        return
+    with ProcessPoolExecutor(max_workers=processos) as pool:
+        em_voo = deque()
+        for bloco in blocos:
+            em_voo.append(pool.submit(_renderizar_bloco, (bloco, formatos)))
+            if len(em_voo) >= 2 * processos:
+                yield em_voo.popleft().result()
+        while em_voo:
+            yield em_voo.popleft().result()
+
+
+def exportar_extratos(blocos, destino, formatos=FORMATOS, processos=None):
+    """
+    Grava um ZIP com um extrato por empregado e por formato.
+    - blocos: DataFrames com as colunas de COLUNAS_ENTRADA (ex.: pd.read_csv(..., chunksize=...) ou fatiar(df))
+    - destino: caminho ou arquivo binário aberto (pode ser não pesquisável, ex.: sys.stdout.buffer)
+    - processos: None = os.cpu_count(); 1 = no processo atual
+    Retorna extratos, arquivos, segundos e extratos_por_segundo.
+    """
+    formatos = tuple(formatos)
+    desconhecidos = [f for f in formatos if f not in _RENDERIZADORES]
+    if desconhecidos or not formatos:
+        raise ValueError(f"Formatos inválidos: {', '.join(desconhecidos) or 'nenhum'} (use {', '.join(FORMATOS)})")
+    processos = os.cpu_count() if processos is None else processos
+    inicio = time.perf_counter()
+    extratos = arquivos = 0
+    with zipfile.ZipFile(destino, 'w', zipfile.ZIP_DEFLATED, compresslevel=6) as saida:
+        for quantidade, conteudos in _blocos_renderizados(blocos, formatos, processos):
+            for nome, conteudo in conteudos:
+                # XLSX já é um ZIP comprimido: guardado sem recomprimir
+                saida.writestr(nome, conteudo, zipfile.ZIP_STORED if nome.endswith('.xlsx') else zipfile.ZIP_DEFLATED)
+            extratos += quantidade
+            arquivos += len(conteudos)
+    segundos = time.perf_counter() - inicio
+    return {'extratos': extratos, 'arquivos': arquivos, 'segundos': round(segundos, 2),
+            'extratos_por_segundo': round(extratos / segundos, 1) if segundos else None}
+
+
+def fatiar(df, tamanho=TAMANHO_BLOCO):
+    """Blocos de um DataFrame já carregado (ex.: upload no A2.py)."""
+    for inicio in range(0, len(df), tamanho):
+        yield df.iloc[inicio:inicio + tamanho]
+
+
+# --- 4. LINHA DE COMANDO E BENCHMARK ---
+
+def folha_sintetica(n, tamanho=TAMANHO_BLOCO, semente=0):
+    """Blocos de uma folha fictícia de n empregados (gerados sob demanda)."""
+    rng = np.random.default_rng(semente)
+    for inicio in range(0, n, tamanho):
+        m = min(tamanho, n - inicio)
+        admissao = np.datetime64('2010-01-01') + rng.integers(0, 5000, m)
+        yield pd.DataFrame({
+            'matricula': [f"M{i:07d}" for i in range(inicio, inicio + m)],
+            'salario_base': rng.uniform(1518, 25000, m).round(2),
+            'saldo_fgts': rng.uniform(0, 150000, m).round(2),
+            'data_admissao': admissao,
+            'data_demissao': admissao + rng.integers(30, 4000, m),
+            'dias_trabalhados': rng.integers(1, 31, m),
+        }, index=pd.RangeIndex(inicio, inicio + m))
+
+
+class _Contador:
+    """Destino do benchmark sem arquivo de saída: descarta os bytes e só conta (o ZIP é gravado como em fluxo)."""
+
+    def __init__(self):
+        self.bytes = 0
+
+    def write(self, dados):
+        self.bytes += len(dados)
+        return len(dados)
+
+    def flush(self):
+        pass
+
+
+def _pico_memoria_mb():
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(pico / 2**20 if sys.platform == 'darwin' else pico / 2**10, 1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporta um extrato de rescisão por empregado (ZIP).")
+    parser.add_argument("entrada", nargs='?', help=f"CSV com as colunas: {', '.join(COLUNAS_ENTRADA)}")
+    parser.add_argument("saida", nargs='?', help="ZIP de saída ('-' para a saída padrão)")
+    parser.add_argument("--formatos", default=','.join(FORMATOS), help="Formatos separados por vírgula (csv,xlsx,html)")
+    parser.add_argument("--processos", type=int, default=None, help="Processos do pool (padrão: número de CPUs)")
+    parser.add_argument("--bloco", type=int, default=TAMANHO_BLOCO, help="Empregados por bloco")
+    parser.add_argument("--sep", default=",", help="Separador do CSV (padrão: ',')")
+    parser.add_argument("--benchmark", type=int, metavar="N", help="Folha fictícia de N empregados (ZIP só contado, não gravado, se não houver saída)")
+    args = parser.parse_args(argv)
+    formatos = [f.strip() for f in args.formatos.split(',') if f.strip()]
+
+    if args.benchmark:
+        blocos = folha_sintetica(args.benchmark, args.bloco)
+        destino = args.saida or args.entrada or _Contador()
+    elif args.entrada and args.saida:
+        blocos = pd.read_csv(args.entrada, sep=args.sep, chunksize=args.bloco)
+        destino = args.saida
+    else:
+        parser.error("informe entrada e saída, ou --benchmark N")
+    if destino == '-':
+        destino = sys.stdout.buffer
+
+    resumo = exportar_extratos(blocos, destino, formatos, args.processos)
+    if isinstance(destino, _Contador):
+        resumo['bytes_zip'] = destino.bytes
+    resumo['pico_memoria_mb'] = _pico_memoria_mb()
+    print(resumo, file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
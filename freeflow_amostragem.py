@@ -0,0 +1,330 @@
+"""
+Redução de séries longas (diárias/horárias) antes de enviá-las aos gráficos do painel Free Flow.
+
+- Orçamento de pontos = largura do gráfico em pixels x PONTOS_POR_PX.
+- 'minmax': pirâmide de mínimos/máximos montada uma vez (O(n)); cada janela (zoom) lê só os
+  baldes do nível adequado (busca binária + no máximo 'orçamento' posições), sem varrer a série bruta.
+- 'lttb': Largest-Triangle-Three-Buckets sobre a janela (preserva melhor a forma em linhas suaves).
+- Janelas já calculadas ficam num cache LRU por (método, nível/orçamento, intervalo).
+
+Benchmark (tamanho do JSON, montagem da figura e renderização com kaleido, antes x depois):
+python freeflow_amostragem.py [pontos ...]
+"""
+from collections import OrderedDict
+import hashlib
+import json
+import math
+import sys
+import time
+
+from inicializacao import np
+
+# Largura presumida do gráfico: o servidor não conhece a largura real no navegador (layout "wide" e
+# use_container_width), então 1200 px é uma aproximação de tela cheia; em telas maiores o orçamento fica
+# um pouco abaixo de 2 pontos por pixel, em menores sobra resolução
+LARGURA_PADRAO_PX = 1200
+PONTOS_POR_PX = 2
+LIMITE_PONTOS_GRAFICO = LARGURA_PADRAO_PX * PONTOS_POR_PX
+LIMITE_CACHE = 64
+
+
+def orcamento_pontos(largura_px=LARGURA_PADRAO_PX, pontos_por_px=PONTOS_POR_PX):
+    """Número máximo de pontos por gráfico para a largura dada."""
+    return max(int(largura_px * pontos_por_px), 4)
+
+
+def _eixo_numerico(x):
+    """
+    (eixo, posicional): eixo x como int64/float64 ordenável; datas (datetime64 ou texto ISO) em ns.
+    Rótulos livres (ex.: 'jun/24') viram posições 0..n-1 e posicional = True.
+    """
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype('datetime64[ns]').astype(np.int64), False
+    if np.issubdtype(x.dtype, np.number):
+        return x.astype(np.float64), False
+    try:
+        return x.astype('datetime64[ns]').astype(np.int64), False
+    except ValueError:
+        return np.arange(len(x), dtype=np.int64), True
+
+
+def _converter_limite(valor, x_original, posicional=False):
+    """Converte inicio/fim (data, texto ou número; posição se o eixo for de rótulos livres) para a escala do eixo."""
+    if valor is None:
+        return None
+    if posicional:
+        return int(valor)
+    if np.issubdtype(np.asarray(x_original).dtype, np.number):
+        return float(valor)
+    return np.datetime64(valor, 'ns').astype(np.int64)
+
+
+def lttb(x, y, pontos):
+    """Índices escolhidos pelo Largest-Triangle-Three-Buckets (primeiro e último pontos sempre incluídos)."""
+    n = len(x)
+    if pontos >= n or pontos < 3:
+        return np.arange(n)
+    x = x.astype(np.float64)
+    y = np.nan_to_num(y.astype(np.float64))
+    limites = np.linspace(1, n - 1, pontos - 1).astype(np.int64)
+    escolhidos = np.empty(pontos, dtype=np.int64)
+    escolhidos[0], escolhidos[-1] = 0, n - 1
+    anterior = 0
+    for balde in range(pontos - 2):
+        inicio, fim = limites[balde], limites[balde + 1]
+        prox_inicio, prox_fim = fim, limites[balde + 2] if balde + 2 < len(limites) else n
+        media_x = x[prox_inicio:prox_fim].mean() if prox_fim > prox_inicio else x[-1]
+        media_y = y[prox_inicio:prox_fim].mean() if prox_fim > prox_inicio else y[-1]
+        areas = np.abs((x[anterior] - media_x) * (y[inicio:fim] - y[anterior])
+                       - (x[anterior] - x[inicio:fim]) * (media_y - y[anterior]))
+        anterior = inicio + int(areas.argmax())
+        escolhidos[balde + 1] = anterior
+    return escolhidos
+
+
+class SerieAmostrada:
+    """
+    Série (x + uma ou mais colunas y, x em ordem crescente) pronta para janelas reduzidas.
+    - janela(inicio, fim, largura_px, metodo): dict {coluna_x: ..., coluna_y: ...} com no máximo o orçamento de pontos
+    - extremos(): limites do eixo x para o controle de zoom; posicional: eixo de rótulos livres (zoom por posição)
+    - estatisticas(): acertos/falhas do cache de janelas
+    """
+
+    def __init__(self, dados, coluna_x, colunas_y=None, limite_cache=LIMITE_CACHE):
+        self.coluna_x = coluna_x
+        self.colunas_y = list(colunas_y or [c for c in dados if c != coluna_x])
+        self._x_original = np.asarray(dados[coluna_x])
+        self._x, self.posicional = _eixo_numerico(self._x_original)
+        self._y = {coluna: np.asarray(dados[coluna], dtype=np.float64) for coluna in self.colunas_y}
+        self._cache = OrderedDict()
+        self._limite_cache = limite_cache
+        self.acertos = self.falhas = 0
+        self._piramide = {coluna: self._montar_piramide(y) for coluna, y in self._y.items()}
+
+    def __len__(self):
+        return len(self._x)
+
+    def extremos(self):
+        """(primeiro, último) do eixo x: datetime para datas, número para eixo numérico, posição para rótulos livres."""
+        if self.posicional:
+            return 0, len(self) - 1
+        if np.issubdtype(self._x_original.dtype, np.number):
+            return float(self._x[0]), float(self._x[-1])
+        return tuple(np.datetime64(int(v), 'ns').astype('datetime64[us]').item() for v in (self._x[0], self._x[-1]))
+
+    @staticmethod
+    def _montar_piramide(y):
+        """Níveis k >= 1: para cada balde de 2^k pontos, índice do mínimo e do máximo (nulos ignorados)."""
+        chave_min = np.where(np.isnan(y), np.inf, y)
+        chave_max = np.where(np.isnan(y), -np.inf, y)
+        indices_min = indices_max = np.arange(len(y))
+        niveis = [(indices_min, indices_max)]
+        while len(indices_min) > 1:
+            if len(indices_min) % 2:
+                indices_min = np.append(indices_min, indices_min[-1])
+                indices_max = np.append(indices_max, indices_max[-1])
+            a, b = indices_min[0::2], indices_min[1::2]
+            indices_min = np.where(chave_min[a] <= chave_min[b], a, b)
+            a, b = indices_max[0::2], indices_max[1::2]
+            indices_max = np.where(chave_max[a] >= chave_max[b], a, b)
+            niveis.append((indices_min, indices_max))
+        return niveis
+
+    def _intervalo(self, inicio, fim):
+        i0 = 0 if inicio is None else int(np.searchsorted(
+            self._x, _converter_limite(inicio, self._x_original, self.posicional), 'left'))
+        i1 = len(self._x) if fim is None else int(np.searchsorted(
+            self._x, _converter_limite(fim, self._x_original, self.posicional), 'right'))
+        return i0, max(i1, i0)
+
+    def _indices_minmax(self, i0, i1, pontos):
+        """Índices da janela pelo nível mais fino da pirâmide que cabe no orçamento."""
+        por_coluna = max(pontos // max(len(self.colunas_y), 1), 4)
+        if i1 - i0 <= por_coluna:
+            return ('minmax', 0, i0, i1), lambda: np.arange(i0, i1)
+        nivel = max(math.ceil(math.log2(2 * (i1 - i0) / por_coluna)), 1)
+        b0, b1 = i0 >> nivel, ((i1 - 1) >> nivel) + 1
+
+        def calcular():
+            partes = [np.array([i0, i1 - 1])]
+            for piramide in self._piramide.values():
+                indices_min, indices_max = piramide[min(nivel, len(piramide) - 1)]
+                partes += [indices_min[b0:b1], indices_max[b0:b1]]
+            indices = np.unique(np.concatenate(partes))
+            return indices[(indices >= i0) & (indices < i1)]
+        return ('minmax', nivel, b0, b1), calcular
+
+    def _indices_lttb(self, i0, i1, pontos):
+        por_coluna = max(pontos // max(len(self.colunas_y), 1), 3)
+
+        def calcular():
+            partes = [i0 + lttb(self._x[i0:i1], y[i0:i1], por_coluna) for y in self._y.values()]
+            return np.unique(np.concatenate(partes))
+        return ('lttb', por_coluna, i0, i1), calcular
+
+    def indices(self, inicio=None, fim=None, largura_px=LARGURA_PADRAO_PX, metodo='minmax'):
+        """Posições da série bruta a exibir na janela [inicio, fim]."""
+        i0, i1 = self._intervalo(inicio, fim)
+        pontos = orcamento_pontos(largura_px)
+        chave, calcular = (self._indices_lttb if metodo == 'lttb' else self._indices_minmax)(i0, i1, pontos)
+        if chave in self._cache:
+            self.acertos += 1
+            self._cache.move_to_end(chave)
+            return self._cache[chave]
+        self.falhas += 1
+        resultado = self._cache[chave] = calcular()
+        if len(self._cache) > self._limite_cache:
+            self._cache.popitem(last=False)
+        return resultado
+
+    def janela(self, inicio=None, fim=None, largura_px=LARGURA_PADRAO_PX, metodo='minmax'):
+        """Dados reduzidos no mesmo formato de entrada (listas por coluna)."""
+        posicoes = self.indices(inicio, fim, largura_px, metodo)
+        reduzidos = {self.coluna_x: self._x_original[posicoes].tolist()}
+        for coluna, y in self._y.items():
+            reduzidos[coluna] = [None if math.isnan(v) else v for v in y[posicoes].tolist()]
+        return reduzidos
+
+    def estatisticas(self):
+        return {'pontos': len(self), 'janelas_em_cache': len(self._cache), 'acertos': self.acertos, 'falhas': self.falhas}
+
+
+LIMITE_SERIES = 4
+
+# Séries já preparadas (LRU): hash do conteúdo -> SerieAmostrada. O hash de uma série longa custa
+# ~0,2 s por milhão de pontos, então também fica memorizado por objeto (LRU; o dict fica referenciado
+# enquanto está na tabela, o que impede que o id seja reaproveitado por outro objeto)
+_SERIES = OrderedDict()
+_HASHES = OrderedDict()
+
+
+def hash_serie(dados, coluna_x):
+    """Hash do conteúdo de um dict de listas (eixo x em texto; colunas y como float64)."""
+    chave = (id(dados), coluna_x)
+    registro = _HASHES.get(chave)
+    if registro is not None and registro[0] is dados:
+        _HASHES.move_to_end(chave)
+        return registro[1]
+    resumo = hashlib.blake2b(coluna_x.encode('utf-8'), digest_size=16)
+    for coluna, valores in dados.items():
+        resumo.update(b'\x1e' + coluna.encode('utf-8') + b'\x1e')
+        if coluna == coluna_x:
+            resumo.update('\x1f'.join(map(str, valores)).encode('utf-8'))
+        else:
+            resumo.update(np.asarray(valores, dtype=np.float64).tobytes())
+    _HASHES[chave] = (dados, resumo.hexdigest())
+    if len(_HASHES) > LIMITE_SERIES:
+        _HASHES.popitem(last=False)
+    return _HASHES[chave][1]
+
+
+def serie_amostrada(dados, coluna_x):
+    """SerieAmostrada de um dict de listas, montada uma vez por conteúdo (no máximo LIMITE_SERIES em memória)."""
+    chave = hash_serie(dados, coluna_x)
+    if chave in _SERIES:
+        _SERIES.move_to_end(chave)
+        return _SERIES[chave]
+    _SERIES[chave] = SerieAmostrada(dados, coluna_x)
+    if len(_SERIES) > LIMITE_SERIES:
+        _SERIES.popitem(last=False)
+    return _SERIES[chave]
+
+
+def reduzir_se_longa(dados, largura_px=LARGURA_PADRAO_PX, inicio=None, fim=None, metodo='minmax'):
+    """
+    Devolve dados reduzidos quando a série passa do orçamento de pontos (a primeira coluna é o eixo x).
+    - inicio/fim: datas ou números; posições (0..n-1) quando o eixo x é de rótulos livres (ex.: 'jun/24').
+    """
+    coluna_x = next(iter(dados))
+    if len(dados[coluna_x]) <= orcamento_pontos(largura_px) and inicio is None and fim is None:
+        return dados
+    return serie_amostrada(dados, coluna_x).janela(inicio, fim, largura_px, metodo)
+
+
+# --- Benchmark ---
+
+def _serie_horaria(n, semente=0):
+    rng = np.random.default_rng(semente)
+    horas = np.datetime64('2024-06-01T00', 'h') + np.arange(n)
+    base = 8 + np.sin(np.arange(n) / 24 * 2 * np.pi) + np.cumsum(rng.normal(0, 0.02, n))
+    return {
+        "Mês": np.datetime_as_string(horas).tolist(),
+        "Taxa de Inadimplência (%)": np.round(base + rng.normal(0, 0.3, n), 3).tolist(),
+        "Taxa de Impontualidade (%)": np.round(base + 3.8 + rng.normal(0, 0.3, n), 3).tolist(),
+    }
+
+
+def benchmark(tamanhos=(10_000, 100_000, 1_000_000), largura_px=LARGURA_PADRAO_PX, renderizar=True,
+              renderizar_completa_ate=100_000):
+    """
+    Série completa x reduzida: tamanho do JSON, montagem+serialização no servidor e renderização em PNG
+    com kaleido (plotly.js local, na largura largura_px); zoom com e sem cache.
+    - A renderização pelo kaleido é uma aproximação do custo no navegador (mesmo plotly.js, outro motor
+      e sem interação); sem o kaleido instalado, só os tempos do servidor são medidos.
+    - renderizar_completa_ate: acima disso a figura completa não é renderizada (dezenas de segundos por figura)
+    """
+    from freeflow_figuras import CONSTRUTORES
+    from paises_geometria import _renderizador
+
+    construir = CONSTRUTORES['inadimplencia']
+    renderizador = _renderizador() if renderizar else None
+
+    def renderizacao_ms(figura):
+        figura.update_layout(width=largura_px)
+        renderizador(figura)  # aquecimento
+        inicio = time.perf_counter()
+        renderizador(figura)
+        return round((time.perf_counter() - inicio) * 1e3, 1)
+
+    resultados = []
+    for n in tamanhos:
+        dados = _serie_horaria(n)
+        inicio = time.perf_counter()
+        figura_completa = construir(dados)
+        completo = figura_completa.to_json()
+        tempo_completo = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        serie = SerieAmostrada(dados, "Mês")
+        tempo_piramide = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        figura_reduzida = construir(serie.janela(largura_px=largura_px))
+        reduzido = figura_reduzida.to_json()
+        tempo_reduzido = time.perf_counter() - inicio
+
+        meio = dados["Mês"][n // 2]
+        fim_zoom = dados["Mês"][n // 2 + n // 10]
+        inicio = time.perf_counter()
+        serie.janela(meio, fim_zoom, largura_px)
+        zoom_novo = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        serie.janela(meio, fim_zoom, largura_px)
+        zoom_cache = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        serie.janela(meio, fim_zoom, largura_px, metodo='lttb')
+        zoom_lttb = time.perf_counter() - inicio
+
+        linha = {
+            'pontos': n,
+            'json_completo_kb': round(len(completo) / 1024),
+            'json_reduzido_kb': round(len(reduzido) / 1024),
+            'figura_completa_ms': round(tempo_completo * 1e3, 1),
+            'piramide_ms': round(tempo_piramide * 1e3, 1),
+            'figura_reduzida_ms': round(tempo_reduzido * 1e3, 1),
+            'zoom_minmax_ms': round(zoom_novo * 1e3, 2),
+            'zoom_cache_ms': round(zoom_cache * 1e3, 3),
+            'zoom_lttb_ms': round(zoom_lttb * 1e3, 1),
+        }
+        if renderizador:
+            if n <= renderizar_completa_ate:
+                linha['render_completa_ms'] = renderizacao_ms(figura_completa)
+            linha['render_reduzida_ms'] = renderizacao_ms(figura_reduzida)
+        resultados.append(linha)
+    return resultados
+
+
+if __name__ == "__main__":
+    tamanhos = tuple(int(n) for n in sys.argv[1:]) or (10_000, 100_000, 1_000_000)
+    for linha in benchmark(tamanhos):
+        print(json.dumps(linha))
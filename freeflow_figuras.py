@@ -0,0 +1,260 @@
+"""
+Figuras do painel Free Flow (AED.py) com cache por hash dos dados de entrada.
+
+- Os dados de cada gráfico (CAPEX, OPEX, inadimplência, eficiência) ficam em DADOS_FREEFLOW;
+  o gráfico em leque da simulação de Monte Carlo ('leque') recebe os percentis calculados na página e
+  é montado por figura_avulsa (sem cache: cada combinação de parâmetros geraria um arquivo novo).
+- A figura serializada (JSON do Plotly) é gravada em .cache_freeflow/<nome>_<hash>.json e o objeto
+  go.Figure correspondente fica em memória: nas reexecuções do Streamlit não há construção de DataFrames
+  nem validação da figura (com um dict, st.plotly_chart remonta e valida um go.Figure a cada rerun).
+- O hash cobre os dados e VERSAO_FIGURAS; mudou o layout de um gráfico, incremente VERSAO_FIGURAS.
+- Se existir freeflow_inadimplencia.json (apurado dos eventos dos pórticos por freeflow_transacoes.py),
+  a série de inadimplência/impontualidade vem dele em vez dos valores fixos.
+- Séries longas (diárias/horárias) são reduzidas ao orçamento de pontos do gráfico antes do hash e da
+  construção da figura (freeflow_amostragem.py).
+
+Pré-compilação para o deploy: python freeflow_figuras.py [pasta_destino]
+"""
+import hashlib
+import json
+from pathlib import Path
+import re
+import sys
+
+from freeflow_amostragem import LARGURA_PADRAO_PX, reduzir_se_longa
+
+PASTA_CACHE = Path(__file__).with_name('.cache_freeflow')
+ARQUIVO_SERIES = Path(__file__).with_name('freeflow_inadimplencia.json')
+VERSAO_FIGURAS = 2
+
+DADOS_FREEFLOW = {
+    'capex': {
+        "Modelo": ["Tradicional (3 Praças)", "Free Flow (3 Pórticos)"],
+        "Custo (R$ milhões)": [216.9, 30.7],
+    },
+    'opex': {
+        "Categoria": ["Pessoal (Arrecadadores, Conferentes, Líderes)", "Transporte de Valores", "Operação e Manutenção Eletrônica"],
+        "Modelo Tradicional (R$ milhões/ano)": [83, 10, 7],
+        "Modelo Free Flow (R$ milhões/ano)": [5, 0, 9],
+    },
+    'inadimplencia': {
+        "Mês": ["jun/24", "jul/24", "ago/24", "set/24", "out/24"],
+        "Taxa de Inadimplência (%)": [6.5, 7.2, 8.0, 9.1, 8.5],
+        "Taxa de Impontualidade (%)": [11.8, 11.9, 11.8, 11.9, 11.8],
+    },
+    'eficiencia': {
+        "Mês": ["jun/24", "jul/24", "ago/24", "set/24", "out/24"],
+        "Benefício Líquido (%)": [4.0, 5.5, 6.8, 8.2, 9.5],
+        "Inadimplência (%)": [6.5, 7.2, 8.0, 9.1, 8.5],
+    },
+}
+
+# Memória do processo: (pasta, nome, hash) -> go.Figure; (arquivo, mtime, tamanho) -> dados
+_FIGURAS = {}
+_DADOS = {}
+
+
+# --- 1. CONSTRUÇÃO DAS FIGURAS ---
+
+def _figura_capex(dados):
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    capex_data = pd.DataFrame(dados)
+    fig = go.Figure(go.Bar(
+        x=capex_data["Modelo"],
+        y=capex_data["Custo (R$ milhões)"],
+        text=capex_data["Custo (R$ milhões)"],
+        textposition="auto",
+        marker_color=["#C0392B", "#27AE60"]
+    ))
+    fig.update_layout(title="Redução de 86% no Custo de Capital (CAPEX)",
+                      yaxis_title="Custo Total (R$ milhões)",
+                      template="plotly_white")
+    return fig
+
+
+def _figura_opex(dados):
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    opex_data = pd.DataFrame(dados)
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=opex_data["Categoria"],
+        y=opex_data["Modelo Tradicional (R$ milhões/ano)"],
+        name="Tradicional",
+        marker_color="#C0392B"
+    ))
+    fig.add_trace(go.Bar(
+        x=opex_data["Categoria"],
+        y=opex_data["Modelo Free Flow (R$ milhões/ano)"],
+        name="Free Flow",
+        marker_color="#27AE60"
+    ))
+    fig.update_layout(barmode="group", template="plotly_white",
+                      title="Redução de Custos Operacionais (OPEX)",
+                      yaxis_title="Custo Estimado (R$ milhões/ano)")
+    return fig
+
+
+def _periodo(meses):
+    """Ano ou intervalo de anos dos rótulos ('jun/24', '2024-06', '2024-06-01T00'); None se não houver ano."""
+    anos = set()
+    for mes in map(str, meses):
+        encontrado = re.match(r'(\d{4})-', mes) or re.search(r'/(\d{2}|\d{4})$', mes)
+        if encontrado:
+            ano = int(encontrado.group(1))
+            anos.add(ano if ano >= 100 else 2000 + ano)
+    if not anos:
+        return None
+    return str(min(anos)) if min(anos) == max(anos) else f"{min(anos)}–{max(anos)}"
+
+
+def _figura_inadimplencia(dados):
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    inad_data = pd.DataFrame(dados)
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=inad_data["Mês"], y=inad_data["Taxa de Inadimplência (%)"],
+                             mode="lines+markers", name="Inadimplência", line=dict(color="red", width=3)))
+    fig.add_trace(go.Scatter(x=inad_data["Mês"], y=inad_data["Taxa de Impontualidade (%)"],
+                             mode="lines+markers", name="Impontualidade", line=dict(color="orange", width=3, dash="dash")))
+    media = inad_data["Taxa de Inadimplência (%)"].mean()
+    if pd.notna(media):
+        fig.add_hline(y=media, line_dash="dot", line_color="gray",
+                      annotation_text=f"Média de inadimplência: {media:.2f}%".replace(".", ","),
+                      annotation_position="bottom right")
+    periodo = _periodo(inad_data["Mês"])
+    fig.update_layout(template="plotly_white",
+                      title="Tendência da Inadimplência e Impontualidade" + (f" ({periodo})" if periodo else ""),
+                      yaxis_title="Percentual (%)", legend_title="Indicadores")
+    return fig
+
+
+def _figura_eficiencia(dados):
+    import pandas as pd
+    import plotly.graph_objects as go
+
+    eff_data = pd.DataFrame(dados)
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(x=eff_data["Mês"], y=eff_data["Benefício Líquido (%)"],
+                             mode="lines+markers", name="Benefício Líquido (Eficiência)",
+                             line=dict(color="green", width=3)))
+    fig.add_trace(go.Scatter(x=eff_data["Mês"], y=eff_data["Inadimplência (%)"],
+                             mode="lines+markers", name="Inadimplência",
+                             line=dict(color="red", width=3, dash="dash")))
+    fig.update_layout(template="plotly_white", title="Evolução da Eficiência Líquida — Benefícios Superam Custos",
+                      yaxis_title="Percentual (%)", legend_title="Indicadores")
+    return fig
+
+
+def _figura_leque(dados):
+    """Gráfico em leque: faixas de percentis do benefício líquido acumulado (simulação de Monte Carlo)."""
+    import plotly.graph_objects as go
+
+    anos = dados["Ano"]
+    fig = go.Figure()
+    faixas = [("p5", "p95", "rgba(39, 174, 96, 0.15)", "90% dos cenários"),
+              ("p10", "p90", "rgba(39, 174, 96, 0.25)", "80% dos cenários"),
+              ("p25", "p75", "rgba(39, 174, 96, 0.40)", "50% dos cenários")]
+    for inferior, superior, cor, nome in faixas:
+        fig.add_trace(go.Scatter(x=anos, y=dados[superior], mode="lines", line=dict(width=0),
+                                 showlegend=False, hoverinfo="skip"))
+        fig.add_trace(go.Scatter(x=anos, y=dados[inferior], mode="lines", line=dict(width=0),
+                                 fill="tonexty", fillcolor=cor, name=nome))
+    fig.add_trace(go.Scatter(x=anos, y=dados["p50"], mode="lines", name="Mediana",
+                             line=dict(color="green", width=3)))
+    fig.add_hline(y=0, line_dash="dot", line_color="gray")
+    fig.update_layout(template="plotly_white", title="Benefício Líquido Acumulado do Free Flow (valor presente)",
+                      xaxis_title="Ano da concessão", yaxis_title="R$ milhões", legend_title="Faixas")
+    return fig
+
+
+CONSTRUTORES = {
+    'capex': _figura_capex,
+    'opex': _figura_opex,
+    'inadimplencia': _figura_inadimplencia,
+    'eficiencia': _figura_eficiencia,
+    'leque': _figura_leque,
+}
+
+
+# --- 2. CACHE ---
+
+def hash_dados(nome, dados):
+    """Hash estável dos dados de entrada de uma figura (listas/dicts serializáveis em JSON)."""
+    texto = json.dumps({'nome': nome, 'versao': VERSAO_FIGURAS, 'dados': dados},
+                       sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(texto.encode('utf-8')).hexdigest()[:16]
+
+
+def figura(nome, dados=None, pasta_cache=PASTA_CACHE):
+    """
+    go.Figure pronta para st.plotly_chart (o mesmo objeto entre reexecuções; não deve ser alterado).
+    - Memória do processo -> JSON em pasta_cache -> construção com pandas/Plotly (só quando os dados mudam).
+    """
+    import plotly.io as pio
+
+    dados = DADOS_FREEFLOW[nome] if dados is None else dados
+    chave = (str(pasta_cache), nome, hash_dados(nome, dados))
+    if chave in _FIGURAS:
+        return _FIGURAS[chave]
+
+    arquivo = Path(pasta_cache) / f'{nome}_{chave[2]}.json'
+    if arquivo.exists():
+        fig = pio.from_json(arquivo.read_text(encoding='utf-8'))
+    else:
+        fig = CONSTRUTORES[nome](dados)
+        arquivo.parent.mkdir(parents=True, exist_ok=True)
+        temporario = arquivo.with_suffix('.tmp')
+        temporario.write_text(fig.to_json(), encoding='utf-8')
+        temporario.replace(arquivo)
+    _FIGURAS[chave] = fig
+    return fig
+
+
+def figura_avulsa(nome, dados):
+    """
+    go.Figure construída na hora, sem memória nem disco: para dados que variam por sessão (leque de uma
+    simulação, janela de zoom), que fariam o cache crescer sem limite.
+    """
+    return CONSTRUTORES[nome](dados)
+
+
+def dados_freeflow(arquivo_series=ARQUIVO_SERIES):
+    """
+    DADOS_FREEFLOW com a série de inadimplência apurada dos eventos, quando disponível.
+    - Relido só quando o arquivo muda: o mesmo objeto é devolvido entre reexecuções.
+    """
+    arquivo_series = Path(arquivo_series)
+    if not arquivo_series.exists():
+        return DADOS_FREEFLOW
+    estado = arquivo_series.stat()
+    chave = (str(arquivo_series), estado.st_mtime_ns, estado.st_size)
+    if chave not in _DADOS:
+        _DADOS.clear()
+        _DADOS[chave] = {**DADOS_FREEFLOW, 'inadimplencia': json.loads(arquivo_series.read_text(encoding='utf-8'))}
+    return _DADOS[chave]
+
+
+def figuras_freeflow(dados=None, pasta_cache=PASTA_CACHE, largura_px=LARGURA_PADRAO_PX):
+    """Todas as figuras do painel, na ordem de exibição (séries longas reduzidas para largura_px)."""
+    dados = dados or dados_freeflow()
+    return {nome: figura(nome, reduzir_se_longa(dados[nome], largura_px), pasta_cache) for nome in DADOS_FREEFLOW}
+
+
+# --- 3. PRÉ-COMPILAÇÃO ---
+
+def precompilar(pasta_cache=PASTA_CACHE):
+    """Gera em disco o JSON de todas as figuras (passo de build do deploy). Retorna os arquivos gerados."""
+    dados = dados_freeflow()
+    figuras_freeflow(dados, pasta_cache)
+    return [Path(pasta_cache) / f'{nome}_{hash_dados(nome, reduzir_se_longa(dados[nome]))}.json' for nome in DADOS_FREEFLOW]
+
+
+if __name__ == "__main__":
+    destino = Path(sys.argv[1]) if len(sys.argv) > 1 else PASTA_CACHE
+    for arquivo in precompilar(destino):
+        print(arquivo)
@@ -0,0 +1,208 @@
+"""
+Simulação de Monte Carlo do benefício líquido do Free Flow frente ao modelo tradicional.
+
+Por cenário (valores em R$ milhões):
+- economia de CAPEX (ano 0) = CAPEX tradicional - CAPEX Free Flow
+- economia de OPEX (anual) = soma dos itens do tradicional - soma dos itens do Free Flow
+- perda de receita (anual, cresce com o tráfego) = volume * tarifa * (inadimplência - evasão do modelo tradicional)
+- custo de cobrança (anual, cresce com o tráfego) = volume * impontualidade * custo por passagem impontual
+- benefício líquido acumulado no ano t = valor presente dos fluxos até t, à taxa de desconto do cenário
+
+As variáveis são sorteadas de DISTRIBUICOES_PADRAO (ou de um dicionário com o mesmo formato), em lotes
+NumPy; cada lote tem sua própria semente derivada de 'semente', então o resultado é o mesmo com ou sem
+pool de processos.
+
+Benchmark: python freeflow_montecarlo.py [cenarios] [processos]
+"""
+from concurrent.futures import ProcessPoolExecutor
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# (tipo, parâmetros): 'fixo' (valor), 'uniforme' (mín, máx), 'triangular' (mín, moda, máx),
+# 'normal' (média, desvio), 'normal_positiva' (idem, truncada em zero), 'lognormal' (mediana, sigma)
+DISTRIBUICOES_PADRAO = {
+    # CAPEX (R$ milhões) — 3 praças x 3 pórticos
+    'capex_tradicional': ('triangular', (190.0, 216.9, 260.0)),
+    'capex_free_flow': ('triangular', (25.0, 30.7, 45.0)),
+    # OPEX (R$ milhões/ano), por item
+    'opex_pessoal_tradicional': ('normal_positiva', (83.0, 6.0)),
+    'opex_transporte_tradicional': ('normal_positiva', (10.0, 1.5)),
+    'opex_eletronica_tradicional': ('normal_positiva', (7.0, 1.0)),
+    'opex_pessoal_free_flow': ('normal_positiva', (5.0, 1.0)),
+    'opex_transporte_free_flow': ('fixo', (0.0,)),
+    'opex_eletronica_free_flow': ('triangular', (7.0, 9.0, 14.0)),
+    # Tráfego e receita
+    'volume_anual': ('lognormal', (22.0, 0.15)),           # milhões de passagens/ano
+    'crescimento_trafego': ('normal', (0.02, 0.01)),
+    'tarifa_media': ('triangular', (6.5, 8.0, 10.0)),      # R$/passagem
+    # Comportamento de pagamento
+    'taxa_inadimplencia': ('triangular', (0.065, 0.0803, 0.12)),
+    'taxa_impontualidade': ('triangular', (0.10, 0.118, 0.16)),
+    'evasao_tradicional': ('uniforme', (0.0, 0.01)),
+    'custo_cobranca': ('triangular', (1.0, 2.0, 4.0)),     # R$ por passagem impontual
+    # Financeiro
+    'taxa_desconto': ('triangular', (0.06, 0.0875, 0.11)),
+}
+
+HORIZONTE_ANOS = 30
+TAMANHO_LOTE = 250_000
+PERCENTIS_LEQUE = (5, 10, 25, 50, 75, 90, 95)
+
+
+# --- 1. SORTEIO E AVALIAÇÃO POR LOTE ---
+
+def sortear(rng, tipo, parametros, n):
+    """Amostra n valores de uma distribuição no formato de DISTRIBUICOES_PADRAO."""
+    if tipo == 'fixo':
+        return np.full(n, float(parametros[0]))
+    if tipo == 'uniforme':
+        return rng.uniform(parametros[0], parametros[1], n)
+    if tipo == 'triangular':
+        return rng.triangular(parametros[0], parametros[1], parametros[2], n)
+    if tipo == 'normal':
+        return rng.normal(parametros[0], parametros[1], n)
+    if tipo == 'normal_positiva':
+        return np.maximum(rng.normal(parametros[0], parametros[1], n), 0.0)
+    if tipo == 'lognormal':
+        return parametros[0] * rng.lognormal(0.0, parametros[1], n)
+    raise ValueError(f"Distribuição desconhecida: {tipo}")
+
+
+def _avaliar_lote(argumentos):
+    """
+    Sorteia e avalia um lote (executado nos processos do pool).
+    Retorna os componentes do fluxo por cenário: economia de CAPEX, fluxo anual fixo (OPEX),
+    fluxo anual ligado ao tráfego (negativo), crescimento do tráfego e taxa de desconto.
+    """
+    semente, n, distribuicoes = argumentos
+    rng = np.random.default_rng(semente)
+    v = {nome: sortear(rng, tipo, parametros, n) for nome, (tipo, parametros) in distribuicoes.items()}
+
+    economia_capex = v['capex_tradicional'] - v['capex_free_flow']
+    economia_opex = (v['opex_pessoal_tradicional'] + v['opex_transporte_tradicional'] + v['opex_eletronica_tradicional']
+                     - v['opex_pessoal_free_flow'] - v['opex_transporte_free_flow'] - v['opex_eletronica_free_flow'])
+    perda_receita = v['volume_anual'] * v['tarifa_media'] * (v['taxa_inadimplencia'] - v['evasao_tradicional'])
+    custo_cobranca = v['volume_anual'] * v['taxa_impontualidade'] * v['custo_cobranca']
+    return np.stack([economia_capex, economia_opex, -(perda_receita + custo_cobranca),
+                     v['crescimento_trafego'], v['taxa_desconto']])
+
+
+# --- 2. SIMULAÇÃO ---
+
+def _percentis(valores, percentis):
+    """
+    Todos os percentis de uma vez (mesma interpolação linear de np.percentile).
+    - Uma ordenação e uma indexação vetorizada: para 7 percentis de 1 milhão de valores, ~3x mais rápido que
+      np.percentile/np.quantile, que fazem uma seleção parcial por posição pedida.
+    """
+    ordenados = np.sort(valores)
+    posicoes = np.asarray(percentis, dtype=np.float64) / 100 * (len(ordenados) - 1)
+    inferior = np.floor(posicoes).astype(np.int64)
+    superior = np.minimum(inferior + 1, len(ordenados) - 1)
+    peso = posicoes - inferior
+    return ordenados[inferior] * (1 - peso) + ordenados[superior] * peso
+
+
+class ResultadoSimulacao:
+    """
+    Componentes por cenário (matriz 5 x n) e horizonte.
+    - vpl(ano): benefício líquido acumulado (valor presente) até o ano, por cenário
+    - leque(): percentis do benefício acumulado ano a ano (para o gráfico em leque)
+    - resumo(): estatísticas do benefício no fim do horizonte (média, mínimo, P1/P5/P50/P95 e proporções
+      de cenários com benefício positivo e negativo)
+    """
+
+    def __init__(self, componentes, horizonte):
+        self.componentes = componentes
+        self.horizonte = horizonte
+
+    def __len__(self):
+        return self.componentes.shape[1]
+
+    def _acumulados(self):
+        """Gera (ano, benefício acumulado por cenário) de 0 até o horizonte."""
+        economia_capex, fluxo_fixo, fluxo_trafego, crescimento, desconto = self.componentes
+        acumulado = economia_capex.copy()
+        fator_desconto = np.ones_like(desconto)
+        fator_trafego = np.ones_like(crescimento)
+        yield 0, acumulado
+        for ano in range(1, self.horizonte + 1):
+            fator_desconto /= 1.0 + desconto
+            acumulado += (fluxo_fixo + fluxo_trafego * fator_trafego) * fator_desconto
+            fator_trafego *= 1.0 + crescimento
+            yield ano, acumulado
+
+    def vpl(self, ano=None):
+        ano = self.horizonte if ano is None else ano
+        for atual, acumulado in self._acumulados():
+            if atual == ano:
+                return acumulado.copy()
+        raise ValueError(f"Ano fora do horizonte: {ano}")
+
+    def leque(self, percentis=PERCENTIS_LEQUE):
+        """DataFrame Ano x percentis (R$ milhões) do benefício líquido acumulado."""
+        linhas = [_percentis(acumulado, percentis) for _, acumulado in self._acumulados()]
+        tabela = pd.DataFrame(linhas, columns=[f"p{p}" for p in percentis])
+        tabela.insert(0, 'Ano', range(self.horizonte + 1))
+        return tabela
+
+    def resumo(self):
+        final = self.vpl()
+        p1, p5, p50, p95 = _percentis(final, (1, 5, 50, 95))
+        return {
+            'cenarios': len(self),
+            'media': float(final.mean()),
+            'minimo': float(final.min()),
+            'p1': float(p1),
+            'p5': float(p5),
+            'p50': float(p50),
+            'p95': float(p95),
+            'prob_positivo': float((final > 0).mean()),
+            'prob_negativo': float((final < 0).mean()),
+        }
+
+
+def simular(cenarios=1_000_000, distribuicoes=None, horizonte=HORIZONTE_ANOS, semente=0,
+            tamanho_lote=TAMANHO_LOTE, processos=None):
+    """
+    Executa a simulação em lotes.
+    - processos: None ou 1 = no processo atual; > 1 = lotes distribuídos num pool de processos
+    - semente: mesmo valor, mesmo resultado (independe de processos)
+    """
+    distribuicoes = {**DISTRIBUICOES_PADRAO, **(distribuicoes or {})}
+    tamanhos = [tamanho_lote] * (cenarios // tamanho_lote)
+    if cenarios % tamanho_lote:
+        tamanhos.append(cenarios % tamanho_lote)
+    sementes = np.random.SeedSequence(semente).spawn(len(tamanhos))
+    tarefas = [(s, n, distribuicoes) for s, n in zip(sementes, tamanhos)]
+
+    if processos and processos > 1 and len(tarefas) > 1:
+        with ProcessPoolExecutor(max_workers=min(processos, len(tarefas))) as pool:
+            lotes = list(pool.map(_avaliar_lote, tarefas))
+    else:
+        lotes = [_avaliar_lote(tarefa) for tarefa in tarefas]
+    return ResultadoSimulacao(np.concatenate(lotes, axis=1), horizonte)
+
+
+def benchmark(cenarios=1_000_000, processos=None):
+    inicio = time.perf_counter()
+    resultado = simular(cenarios, processos=processos)
+    simulacao = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    leque = resultado.leque()
+    percentis = time.perf_counter() - inicio
+    return {'cenarios': cenarios, 'processos': processos or 1, 'segundos_simulacao': round(simulacao, 2),
+            'segundos_leque': round(percentis, 2), **resultado.resumo()}, leque
+
+
+if __name__ == "__main__":
+    cenarios = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    processos = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+    for p in sorted({1, processos}):
+        resumo, leque = benchmark(cenarios, p)
+        print(resumo)
+    print(leque.round(1).to_string(index=False))
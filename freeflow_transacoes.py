@@ -0,0 +1,358 @@
+"""
+Apuração de inadimplência e impontualidade do Free Flow a partir dos eventos brutos dos pórticos.
+
+- Evento: (instante, tipo, id_passagem, valor); instante em segundos (epoch), tipo 0 = passagem, 1 = pagamento.
+- Os arquivos (CSV com essas colunas, em ordem de instante) são lidos em blocos por um pipeline de geradores;
+  logs separados de passagens e pagamentos podem ser combinados com intercalar().
+- Cada passagem fica em aberto até ser paga ou até o prazo de inadimplência vencer, e só então sai da memória:
+  o estado é limitado às passagens da janela [agora - prazo_inadimplencia, agora], não ao histórico inteiro.
+- Classificação (pelo mês da passagem):
+  - paga até prazo_pagamento dias: pontual
+  - não paga no prazo: impontual (paga depois ou não)
+  - não paga até prazo_inadimplencia dias: inadimplente
+- Um id_passagem repetido enquanto a passagem original está em aberto (ex.: leitura duplicada) é descartado
+  e contado em passagens_duplicadas; depois que a original é paga ou vence, o id volta a valer como nova passagem.
+- tabela_grafico() devolve o mesmo formato de DADOS_FREEFLOW['inadimplencia'] (Mês, taxas em %).
+
+Benchmark com eventos sintéticos: python freeflow_transacoes.py --benchmark
+Apuração de arquivos: python freeflow_transacoes.py eventos1.csv [eventos2.csv ...] [--saida arquivo.json]
+"""
+import heapq
+import json
+from pathlib import Path
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from freeflow_figuras import ARQUIVO_SERIES
+
+COLUNAS_EVENTO = ['instante', 'tipo', 'id_passagem', 'valor']
+PASSAGEM, PAGAMENTO = 0, 1
+
+DIA = 86_400
+PRAZO_PAGAMENTO_DIAS = 30
+PRAZO_INADIMPLENCIA_DIAS = 90
+TAMANHO_BLOCO = 1_000_000
+
+MESES_ABREV = ['jan', 'fev', 'mar', 'abr', 'mai', 'jun', 'jul', 'ago', 'set', 'out', 'nov', 'dez']
+
+
+# --- 1. LEITURA EM BLOCOS ---
+
+def ler_eventos(caminhos, tamanho_bloco=TAMANHO_BLOCO):
+    """Gera blocos (instante, tipo, id_passagem, valor) em arrays NumPy, arquivo por arquivo."""
+    for caminho in caminhos:
+        leitor = pd.read_csv(caminho, usecols=COLUNAS_EVENTO, chunksize=tamanho_bloco,
+                             dtype={'instante': 'int64', 'tipo': 'int8', 'id_passagem': 'int64', 'valor': 'float64'})
+        for bloco in leitor:
+            yield tuple(bloco[coluna].to_numpy() for coluna in COLUNAS_EVENTO)
+
+
+def _eventos(blocos):
+    """Achata blocos em eventos individuais (tuplas), preservando a ordem."""
+    for instantes, tipos, ids, valores in blocos:
+        yield from zip(instantes.tolist(), tipos.tolist(), ids.tolist(), valores.tolist())
+
+
+def intercalar(*fluxos_de_blocos, tamanho_bloco=TAMANHO_BLOCO):
+    """
+    Combina vários fluxos ordenados (ex.: log de passagens e log de pagamentos) num único fluxo
+    ordenado por instante, sem carregá-los inteiros; na mesma data, a passagem vem antes do pagamento.
+    """
+    mesclado = heapq.merge(*(_eventos(fluxo) for fluxo in fluxos_de_blocos), key=lambda evento: (evento[0], evento[1]))
+    while True:
+        lote = [evento for _, evento in zip(range(tamanho_bloco), mesclado)]
+        if not lote:
+            return
+        instantes, tipos, ids, valores = zip(*lote)
+        yield (np.array(instantes, dtype=np.int64), np.array(tipos, dtype=np.int8),
+               np.array(ids, dtype=np.int64), np.array(valores, dtype=np.float64))
+
+
+def reagrupar(blocos, tamanho_bloco=TAMANHO_BLOCO):
+    """Junta blocos pequenos consecutivos até tamanho_bloco eventos (menos reconstruções de índice no apurador)."""
+    pendentes, total = [], 0
+    for bloco in blocos:
+        pendentes.append(bloco)
+        total += len(bloco[0])
+        if total >= tamanho_bloco:
+            yield tuple(np.concatenate(colunas) for colunas in zip(*pendentes))
+            pendentes, total = [], 0
+    if pendentes:
+        yield tuple(np.concatenate(colunas) for colunas in zip(*pendentes))
+
+
+def _indice_mes(instantes):
+    """Meses desde jan/1970 para instantes em segundos (epoch)."""
+    return instantes.astype('datetime64[s]').astype('datetime64[M]').astype(np.int64)
+
+
+def rotulo_mes(indice_mes):
+    """Índice de mês (desde jan/1970) -> rótulo do painel, ex.: 'jun/24'."""
+    ano, mes = divmod(int(indice_mes), 12)
+    return f"{MESES_ABREV[mes]}/{(1970 + ano) % 100:02d}"
+
+
+# --- 2. APURAÇÃO ---
+
+class ApuradorInadimplencia:
+    """
+    Casa passagens e pagamentos em fluxo, bloco a bloco (operações vetorizadas), mantendo agregados mensais.
+    - consumir(blocos): processa um iterável de blocos (pode ser chamado várias vezes, em ordem);
+      blocos pequenos são reagrupados até tamanho_bloco eventos
+    - agregados(): DataFrame por mês da passagem
+    Os vencimentos são verificados ao fim de cada bloco; como um pagamento só vale se feito dentro
+    do prazo de inadimplência, o resultado não depende do tamanho dos blocos.
+    """
+
+    CAMPOS = ['passagens', 'pagas_no_prazo', 'pagas_em_atraso', 'impontuais', 'inadimplentes',
+              'valor_passagens', 'valor_inadimplente']
+
+    def __init__(self, prazo_pagamento_dias=PRAZO_PAGAMENTO_DIAS, prazo_inadimplencia_dias=PRAZO_INADIMPLENCIA_DIAS):
+        if prazo_inadimplencia_dias < prazo_pagamento_dias:
+            raise ValueError("prazo_inadimplencia_dias deve ser maior ou igual a prazo_pagamento_dias")
+        self.prazo_pagamento = prazo_pagamento_dias * DIA
+        self.prazo_inadimplencia = prazo_inadimplencia_dias * DIA
+        self.instante = None
+        self.pagamentos_sem_passagem = 0
+        self.passagens_duplicadas = 0
+        self._meses = {}
+        # Passagens em aberto (ordem de chegada): instante, id, mês, valor, já contada como impontual
+        self._abertas = {
+            'instante': np.empty(0, np.int64), 'id': np.empty(0, np.int64), 'mes': np.empty(0, np.int64),
+            'valor': np.empty(0, np.float64), 'impontual': np.empty(0, bool),
+        }
+
+    def _somar(self, campo, meses, pesos=None):
+        """Soma (contagem ou pesos) por mês no contador 'campo'."""
+        if not len(meses):
+            return
+        posicao = self.CAMPOS.index(campo)
+        unicos, inverso = np.unique(meses, return_inverse=True)
+        totais = np.bincount(inverso, weights=pesos, minlength=len(unicos))
+        for mes, total in zip(unicos.tolist(), totais.tolist()):
+            contadores = self._meses.get(mes)
+            if contadores is None:
+                contadores = self._meses[mes] = [0, 0, 0, 0, 0, 0.0, 0.0]
+            contadores[posicao] += total if pesos is not None else int(total)
+
+    def _filtrar(self, manter):
+        self._abertas = {nome: coluna[manter] for nome, coluna in self._abertas.items()}
+
+    def _bloco(self, instantes, tipos, ids, valores):
+        passagem = tipos == PASSAGEM
+        abertas = self._abertas
+        novas = {'instante': instantes[passagem], 'id': ids[passagem], 'valor': valores[passagem]}
+        indice = pd.Index(np.concatenate([abertas['id'], novas['id']]))
+        if not indice.is_unique:
+            # Id repetido enquanto a passagem original está em aberto (ex.: leitura duplicada no pórtico):
+            # só a primeira ocorrência vale; as demais são descartadas antes do casamento e contadas à parte
+            repetida = indice.duplicated()[len(abertas['id']):]
+            self.passagens_duplicadas += int(repetida.sum())
+            novas = {nome: coluna[~repetida] for nome, coluna in novas.items()}
+            indice = pd.Index(np.concatenate([abertas['id'], novas['id']]))
+        novas['mes'] = _indice_mes(novas['instante'])
+        novas['impontual'] = np.zeros(len(novas['id']), bool)
+        self._somar('passagens', novas['mes'])
+        self._somar('valor_passagens', novas['mes'], novas['valor'])
+        self._abertas = abertas = {nome: np.concatenate([abertas[nome], novas[nome]]) for nome in abertas}
+
+        # Pagamentos: casa pelo id entre as passagens em aberto (o primeiro pagamento de cada passagem vale)
+        pagamento = ~passagem
+        ids_pagos, instantes_pagos = ids[pagamento], instantes[pagamento]
+        posicoes = indice.get_indexer(ids_pagos)
+        atraso = instantes_pagos - (abertas['instante'][posicoes] if len(abertas['id']) else 0)
+        valido = (posicoes >= 0) & (atraso >= 0) & (atraso <= self.prazo_inadimplencia)
+        valido[valido] = ~pd.Index(posicoes[valido]).duplicated()
+        self.pagamentos_sem_passagem += int((~valido).sum())
+
+        posicoes, atraso = posicoes[valido], atraso[valido]
+        no_prazo = atraso <= self.prazo_pagamento
+        self._somar('pagas_no_prazo', abertas['mes'][posicoes[no_prazo]])
+        atrasadas = posicoes[~no_prazo]
+        self._somar('pagas_em_atraso', abertas['mes'][atrasadas])
+        self._somar('impontuais', abertas['mes'][atrasadas[~abertas['impontual'][atrasadas]]])
+        pagas = np.zeros(len(abertas['id']), bool)
+        pagas[posicoes] = True
+
+        # Vencimentos no fim do bloco: prazo de pagamento (impontual) e de inadimplência (sai da memória)
+        agora = int(instantes[-1])
+        idade = agora - abertas['instante']
+        vencida = ~pagas & ~abertas['impontual'] & (idade > self.prazo_pagamento)
+        self._somar('impontuais', abertas['mes'][vencida])
+        abertas['impontual'] |= vencida
+        inadimplente = ~pagas & (idade > self.prazo_inadimplencia)
+        self._somar('inadimplentes', abertas['mes'][inadimplente])
+        self._somar('valor_inadimplente', abertas['mes'][inadimplente], abertas['valor'][inadimplente])
+        self._filtrar(~(pagas | inadimplente))
+        self.instante = agora
+
+    def consumir(self, blocos, tamanho_bloco=TAMANHO_BLOCO):
+        for instantes, tipos, ids, valores in reagrupar(blocos, tamanho_bloco):
+            if len(instantes):
+                self._bloco(instantes, tipos, ids, valores)
+        return self
+
+    def pendentes(self):
+        """Passagens ainda mantidas em memória (dentro da janela de apuração)."""
+        return len(self._abertas['id'])
+
+    def agregados(self):
+        """
+        Agregados por mês da passagem.
+        - fechado: todas as passagens do mês já passaram do prazo de inadimplência (taxas definitivas)
+        - em_aberto: passagens sem pagamento ainda dentro do prazo de inadimplência
+        """
+        if not self._meses:
+            return pd.DataFrame(columns=['mes', 'Mês'] + self.CAMPOS + ['em_aberto', 'fechado'])
+        indices = sorted(self._meses)
+        tabela = pd.DataFrame([self._meses[i] for i in indices], columns=self.CAMPOS)
+        tabela.insert(0, 'Mês', [rotulo_mes(i) for i in indices])
+        tabela.insert(0, 'mes', indices)
+        tabela['em_aberto'] = (tabela['passagens'] - tabela['pagas_no_prazo'] - tabela['pagas_em_atraso']
+                               - tabela['inadimplentes'])
+        fim_do_mes = (np.array(indices, dtype='datetime64[M]') + 1).astype('datetime64[s]').astype(np.int64)
+        tabela['fechado'] = fim_do_mes + self.prazo_inadimplencia <= self.instante
+        return tabela
+
+
+def tabela_grafico(agregados, apenas_fechados=False):
+    """Agregados mensais no formato consumido pelo gráfico de inadimplência (DADOS_FREEFLOW['inadimplencia'])."""
+    if apenas_fechados:
+        agregados = agregados[agregados['fechado']]
+    passagens = agregados['passagens'].where(agregados['passagens'] > 0)
+    return pd.DataFrame({
+        "Mês": agregados['Mês'].to_numpy(),
+        "Taxa de Inadimplência (%)": (100 * agregados['inadimplentes'] / passagens).round(2).to_numpy(),
+        "Taxa de Impontualidade (%)": (100 * agregados['impontuais'] / passagens).round(2).to_numpy(),
+    })
+
+
+def apurar_arquivos(caminhos, tamanho_bloco=TAMANHO_BLOCO, **prazos):
+    """Atalho: lê os arquivos em blocos e devolve o DataFrame de agregados mensais."""
+    return ApuradorInadimplencia(**prazos).consumir(ler_eventos(caminhos, tamanho_bloco)).agregados()
+
+
+def gravar_series(tabela, caminho=ARQUIVO_SERIES):
+    """Grava a série mensal (formato do gráfico); o painel passa a usá-la no lugar dos valores fixos."""
+    Path(caminho).write_text(json.dumps(tabela.to_dict(orient='list'), ensure_ascii=False, indent=2), encoding='utf-8')
+    return caminho
+
+
+# --- 3. GERADOR SINTÉTICO E BENCHMARK ---
+
+def gerar_eventos(passagens_por_dia=100_000, dias=150, inicio='2024-06-01', taxa_atraso=0.038,
+                  taxa_inadimplencia=0.08, valor_medio=12.0, semente=0, taxa_duplicadas=0.0,
+                  prazo_pagamento_dias=PRAZO_PAGAMENTO_DIAS, prazo_inadimplencia_dias=PRAZO_INADIMPLENCIA_DIAS):
+    """
+    Gera blocos diários de eventos ordenados por instante (mesmo formato de ler_eventos).
+    - taxa_atraso: fração paga depois do prazo (mas antes do prazo de inadimplência)
+    - taxa_inadimplencia: fração nunca paga
+    - taxa_duplicadas: fração das passagens emitida de novo com o mesmo id (leitura duplicada no pórtico)
+    Os pagamentos futuros ficam num buffer limitado à janela de inadimplência.
+    """
+    rng = np.random.default_rng(semente)
+    rng_duplicadas = np.random.default_rng([semente, 1])  # sorteio à parte: o restante independe de taxa_duplicadas
+    inicio = int(np.datetime64(inicio, 's').astype(np.int64))
+    prazo, prazo_inad = prazo_pagamento_dias * DIA, prazo_inadimplencia_dias * DIA
+    futuros = (np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, np.float64))
+    proximo_id = 0
+    for dia in range(dias + prazo_inadimplencia_dias):
+        fim_dia = inicio + (dia + 1) * DIA
+        if dia < dias:
+            n = passagens_por_dia
+            instantes = inicio + dia * DIA + np.sort(rng.integers(0, DIA, n))
+            ids = np.arange(proximo_id, proximo_id + n, dtype=np.int64)
+            proximo_id += n
+            valores = np.round(rng.exponential(valor_medio, n), 2)
+            sorteio = rng.random(n)
+            atraso = np.where(sorteio < taxa_atraso, rng.integers(prazo + 1, prazo_inad, n), rng.integers(0, prazo, n))
+            pagos = ~((sorteio >= taxa_atraso) & (sorteio < taxa_atraso + taxa_inadimplencia))
+            futuros = tuple(np.concatenate(par) for par in zip(
+                futuros, (instantes[pagos] + atraso[pagos], ids[pagos], valores[pagos])))
+            if taxa_duplicadas:
+                # Leitura duplicada: mesmo id e valor alguns segundos depois, no mesmo dia
+                repetir = rng_duplicadas.random(n) < taxa_duplicadas
+                instantes = np.concatenate([
+                    instantes, np.minimum(instantes[repetir] + rng_duplicadas.integers(1, 60, int(repetir.sum())), fim_dia - 1)])
+                ids = np.concatenate([ids, ids[repetir]])
+                valores = np.concatenate([valores, valores[repetir]])
+        else:
+            instantes = ids = np.empty(0, np.int64)
+            valores = np.empty(0, np.float64)
+
+        hoje = futuros[0] < fim_dia
+        pagamentos = tuple(coluna[hoje] for coluna in futuros)
+        futuros = tuple(coluna[~hoje] for coluna in futuros)
+
+        todos_instantes = np.concatenate([instantes, pagamentos[0]])
+        tipos = np.concatenate([np.full(len(instantes), PASSAGEM, np.int8), np.full(len(pagamentos[0]), PAGAMENTO, np.int8)])
+        ordem = np.lexsort((tipos, todos_instantes))
+        if len(ordem):
+            yield (todos_instantes[ordem], tipos[ordem], np.concatenate([ids, pagamentos[1]])[ordem],
+                   np.concatenate([valores, pagamentos[2]])[ordem])
+
+
+def gravar_eventos(caminho, blocos):
+    """Grava blocos de eventos em CSV (uma escrita por bloco)."""
+    with open(caminho, 'w', encoding='utf-8', newline='') as arquivo:
+        arquivo.write(','.join(COLUNAS_EVENTO) + '\n')
+        for bloco in blocos:
+            pd.DataFrame(dict(zip(COLUNAS_EVENTO, bloco))).to_csv(arquivo, header=False, index=False)
+    return caminho
+
+
+def benchmark(passagens_por_dia=100_000, dias=150, caminho_csv=None, taxa_duplicadas=0.01):
+    """
+    Vazão (eventos/s) do apurador com eventos sintéticos em memória e, opcionalmente, via CSV.
+    Também repete a apuração em memória com taxa_duplicadas de ids repetidos: as taxas mensais devem
+    coincidir com as da série sem repetição (diferença máxima em pontos percentuais no resultado).
+    """
+    blocos = list(gerar_eventos(passagens_por_dia, dias))
+    eventos = sum(len(bloco[0]) for bloco in blocos)
+
+    inicio = time.perf_counter()
+    apurador = ApuradorInadimplencia().consumir(blocos)
+    segundos = time.perf_counter() - inicio
+    resultado = {'eventos': eventos, 'segundos_memoria': round(segundos, 2),
+                 'eventos_por_s_memoria': round(eventos / segundos)}
+    tabela = tabela_grafico(apurador.agregados())
+
+    if taxa_duplicadas:
+        blocos_duplicados = list(gerar_eventos(passagens_por_dia, dias, taxa_duplicadas=taxa_duplicadas))
+        eventos_duplicados = sum(len(bloco[0]) for bloco in blocos_duplicados)
+        inicio = time.perf_counter()
+        apurador_duplicados = ApuradorInadimplencia().consumir(blocos_duplicados)
+        segundos = time.perf_counter() - inicio
+        diferenca = (tabela_grafico(apurador_duplicados.agregados()).iloc[:, 1:] - tabela.iloc[:, 1:]).abs()
+        resultado.update({'passagens_duplicadas': apurador_duplicados.passagens_duplicadas,
+                          'eventos_por_s_duplicados': round(eventos_duplicados / segundos),
+                          'diferenca_max_pp_duplicados': float(diferenca.max().max())})
+
+    if caminho_csv:
+        gravar_eventos(caminho_csv, blocos)
+        inicio = time.perf_counter()
+        apurar_arquivos([caminho_csv])
+        segundos = time.perf_counter() - inicio
+        resultado.update({'segundos_csv': round(segundos, 2), 'eventos_por_s_csv': round(eventos / segundos)})
+    return resultado, tabela
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    if not argumentos or argumentos[0] == '--benchmark':
+        resultado, tabela = benchmark(caminho_csv=argumentos[1] if len(argumentos) > 1 else None)
+        print(resultado)
+        print(tabela.to_string(index=False))
+    else:
+        saida = ARQUIVO_SERIES
+        if '--saida' in argumentos:
+            posicao = argumentos.index('--saida')
+            saida = argumentos[posicao + 1]
+            del argumentos[posicao:posicao + 2]
+        agregados = apurar_arquivos(argumentos)
+        print(agregados.to_string(index=False))
+        # Só meses fechados: nos meses em aberto as passagens ainda no prazo derrubam a taxa para perto de zero
+        print(f"Série gravada em {gravar_series(tabela_grafico(agregados, apenas_fechados=True), saida)}")
@@ -0,0 +1,300 @@
+"""
+Recalculo incremental da calculadora A2.py: as verbas como um grafo de dependências com nós memorizados.
+
+- Cada nó é uma função; as dependências são os nomes dos seus parâmetros (entradas do formulário ou outros nós).
+- Cada nó guarda um cache próprio, chaveado pelos valores efetivos das dependências (LRU, CAPACIDADE_NO
+  entradas). Depois de editar um campo, só os nós a jusante recebem valores novos e são recalculados; os
+  demais respondem do cache.
+- GrafoCalculo.recalculados: nós recalculados na última avaliação (o resto veio do cache).
+- Entradas e valores dos nós intermediários precisam ser hashable (números, datas, tuplas).
+
+Entradas: salario_base, saldo_fgts, data_admissao, data_demissao, dias_trabalhados.
+Benchmark (latência por edição de um campo): python grafo_rescisao.py [--app]
+"""
+from collections import OrderedDict
+from datetime import date
+import inspect
+import sys
+import time
+
+from inicializacao import pd
+from rescisao import (
+    LINHAS_DESCONTOS,
+    LINHAS_VERBAS,
+    calcular_aviso_previo_indenizado,
+    calcular_meses_proporcionais,
+    calcular_saldo_salario,
+    get_inss_aliquota_e_deducao,
+    get_irrf_aliquota_e_deducao,
+)
+from tabelas_impostos import IRRF
+
+CAPACIDADE_NO = 32
+
+# --- 1. GRAFO ---
+
+class _No:
+    def __init__(self, nome, funcao, capacidade):
+        self.nome = nome
+        self.funcao = funcao
+        self.dependencias = tuple(inspect.signature(funcao).parameters)
+        self.capacidade = capacidade
+        self.cache = OrderedDict()
+
+
+class GrafoCalculo:
+    """Nós memorizados; avaliar() puxa só o que os alvos pedem e recalcula só o que mudou."""
+
+    def __init__(self, funcoes, capacidade=CAPACIDADE_NO):
+        self.nos = {nome: _No(nome, funcao, capacidade) for nome, funcao in funcoes.items()}
+        self.recalculados = []
+
+    def avaliar(self, entradas, alvos=None):
+        """Valores dos nós em 'alvos' (padrão: todos) para as entradas dadas."""
+        valores = dict(entradas)
+        self.recalculados = []
+        for alvo in alvos or self.nos:
+            self._valor(alvo, valores)
+        return valores
+
+    def _valor(self, nome, valores):
+        if nome in valores:
+            return valores[nome]
+        if nome not in self.nos:
+            raise KeyError(f"Entrada ausente no grafo: {nome}")
+        no = self.nos[nome]
+        chave = tuple(self._valor(dependencia, valores) for dependencia in no.dependencias)
+        if chave in no.cache:
+            no.cache.move_to_end(chave)
+            valor = no.cache[chave]
+        else:
+            valor = no.funcao(*chave)
+            no.cache[chave] = valor
+            if len(no.cache) > no.capacidade:
+                no.cache.popitem(last=False)
+            self.recalculados.append(nome)
+        valores[nome] = valor
+        return valor
+
+    def limpar(self):
+        for no in self.nos.values():
+            no.cache.clear()
+
+
+# --- 2. NÓS DA RESCISÃO (mesmas fórmulas de rescisao.py / A2.py) ---
+
+_NOS_RESCISAO = {}
+
+
+def _no(funcao):
+    _NOS_RESCISAO[funcao.__name__] = funcao
+    return funcao
+
+
+@_no
+def saldo_salario(salario_base, dias_trabalhados):
+    return calcular_saldo_salario(salario_base, dias_trabalhados)
+
+
+@_no
+def meses_proporcionais(data_admissao, data_demissao):
+    # (meses do 13º, meses das férias)
+    return calcular_meses_proporcionais(data_admissao, data_demissao)
+
+
+@_no
+def decimo_terceiro(salario_base, meses_proporcionais):
+    return (salario_base / 12) * meses_proporcionais[0]
+
+
+@_no
+def ferias(salario_base, meses_proporcionais):
+    # (base, 1/3 constitucional, total)
+    base = (salario_base / 12) * meses_proporcionais[1]
+    terco = base / 3
+    return base, terco, base + terco
+
+
+@_no
+def aviso_previo(data_admissao, data_demissao, salario_base):
+    # (valor, dias)
+    return calcular_aviso_previo_indenizado(data_admissao, data_demissao, salario_base)
+
+
+@_no
+def multa_fgts(saldo_fgts):
+    return saldo_fgts * 0.40
+
+
+@_no
+def inss_principal(saldo_salario, data_demissao):
+    # Aviso Prévio Indenizado é isento de INSS (Súmula 449 TST): a base é só o saldo de salário
+    return get_inss_aliquota_e_deducao(saldo_salario, data_demissao)
+
+
+@_no
+def inss_13(decimo_terceiro, data_demissao):
+    return get_inss_aliquota_e_deducao(decimo_terceiro, data_demissao)
+
+
+@_no
+def irrf_principal(saldo_salario, aviso_previo, inss_principal, data_demissao):
+    return get_irrf_aliquota_e_deducao((saldo_salario + aviso_previo[0]) - inss_principal, data_demissao)
+
+
+@_no
+def total_descontos(inss_principal, inss_13, irrf_principal):
+    return inss_principal + inss_13 + irrf_principal
+
+
+@_no
+def verbas_brutas(saldo_salario, aviso_previo, decimo_terceiro, ferias):
+    return saldo_salario + aviso_previo[0] + decimo_terceiro + ferias[2]
+
+
+@_no
+def verbas_liquidas(verbas_brutas, total_descontos):
+    return verbas_brutas - total_descontos
+
+
+@_no
+def total_receber(verbas_liquidas, saldo_fgts, multa_fgts):
+    return verbas_liquidas + saldo_fgts + multa_fgts
+
+
+@_no
+def tabela_verbas(saldo_salario, decimo_terceiro, ferias, aviso_previo, multa_fgts):
+    return pd.DataFrame({
+        'Verba': [rotulo for rotulo, _, _ in LINHAS_VERBAS],
+        'Valor Bruto (R$)': [saldo_salario, decimo_terceiro, ferias[2], aviso_previo[0], multa_fgts],
+        'Natureza': [natureza for _, _, natureza in LINHAS_VERBAS]
+    })
+
+
+@_no
+def tabela_descontos(inss_principal, inss_13, irrf_principal):
+    return pd.DataFrame({
+        'Desconto': [rotulo for rotulo, _, _, _ in LINHAS_DESCONTOS],
+        'Valor (R$)': [inss_principal, inss_13, irrf_principal],
+        'Base': [base for _, _, base, _ in LINHAS_DESCONTOS],
+        'Base Legal': [base_legal for _, _, _, base_legal in LINHAS_DESCONTOS]
+    })
+
+
+# Pizza das verbas pagas diretamente, em Vega-Lite (o mesmo gráfico que o Altair gerava): só os dados mudam,
+# então o nó monta um dict em vez de construir e validar um alt.Chart a cada recálculo
+ESPEC_GRAFICO_VERBAS = {
+    'title': 'Verbas Pagas Diretamente (Exclui FGTS/Multa)',
+    'mark': {'type': 'arc', 'outerRadius': 120},
+    'encoding': {
+        'theta': {'field': 'Valor', 'type': 'quantitative'},
+        'color': {'field': 'Verba', 'type': 'nominal'},
+        'tooltip': [{'field': 'Verba', 'type': 'nominal'},
+                    {'field': 'Valor', 'type': 'quantitative', 'format': '$,.2f'}],
+    },
+}
+
+
+@_no
+def grafico_verbas(saldo_salario, decimo_terceiro, ferias, aviso_previo):
+    """Especificação Vega-Lite (dict) da pizza, pronta para st.vega_lite_chart."""
+    verbas = zip(['Saldo Salário', '13º Prop.', 'Férias Prop.', 'Aviso Prévio'],
+                 [saldo_salario, decimo_terceiro, ferias[2], aviso_previo[0]])
+    return {**ESPEC_GRAFICO_VERBAS, 'data': {'values': [{'Verba': v, 'Valor': valor} for v, valor in verbas]}}
+
+
+def _brl(valor):
+    return f"{valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+@_no
+def tabela_irrf(data_demissao):
+    faixas_irrf = IRRF.tabela(data_demissao)
+    return pd.DataFrame({
+        'Base C. (Até)': [f"R$ {_brl(teto)}" if teto != float('inf') else 'Acima' for teto, _, _ in faixas_irrf],
+        'Alíquota': [f"{aliquota * 100:.1f}%".replace(".", ",") for _, aliquota, _ in faixas_irrf],
+        'Dedução (R$)': [_brl(deducao) for _, _, deducao in faixas_irrf]
+    })
+
+
+def grafo_rescisao(capacidade=CAPACIDADE_NO):
+    """Um grafo novo (caches vazios) com os nós da calculadora; na tela, um por sessão."""
+    return GrafoCalculo(_NOS_RESCISAO, capacidade)
+
+
+# --- 3. BENCHMARK ---
+
+ENTRADAS_EXEMPLO = {
+    'salario_base': 4500.0,
+    'saldo_fgts': 12000.0,
+    'data_admissao': date(2019, 3, 11),
+    'data_demissao': date(2025, 6, 14),
+    'dias_trabalhados': 14,
+}
+
+EDICOES_EXEMPLO = {
+    'saldo_fgts': 15000.0,
+    'dias_trabalhados': 20,
+    'salario_base': 5200.0,
+    'data_demissao': date(2025, 7, 2),
+    'data_admissao': date(2018, 1, 8),
+}
+
+
+def _ms(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1e3
+
+
+def benchmark(repeticoes=20):
+    """Por campo editado: recálculo completo (caches vazios) x incremental, e os nós recalculados."""
+    grafo = grafo_rescisao()
+    grafo.avaliar(ENTRADAS_EXEMPLO)  # aquece a importação do pandas
+    completo = _ms(lambda: grafo_rescisao().avaliar(ENTRADAS_EXEMPLO), repeticoes)
+    resultados = []
+    for campo, novo in EDICOES_EXEMPLO.items():
+        alternadas = [ENTRADAS_EXEMPLO, {**ENTRADAS_EXEMPLO, campo: novo}]
+        grafo = grafo_rescisao(capacidade=1)  # capacidade 1: cada edição recalcula de fato o que depende do campo
+        grafo.avaliar(alternadas[0])
+        estado = {'i': 0}
+
+        def editar():
+            estado['i'] += 1
+            grafo.avaliar(alternadas[estado['i'] % 2])
+
+        incremental = _ms(editar, repeticoes)
+        resultados.append({'campo': campo, 'completo_ms': round(completo, 2), 'incremental_ms': round(incremental, 2),
+                           'recalculados': list(grafo.recalculados)})
+    return resultados
+
+
+def benchmark_app(repeticoes=5, caminho='A2.py'):
+    """Latência do rerun do A2.py no executor headless do Streamlit, depois do primeiro cálculo, por campo editado."""
+    from streamlit.testing.v1 import AppTest
+
+    app = AppTest.from_file(caminho, default_timeout=120)
+    app.run()
+    app.button[0].click().run()
+    rotulos = {'salario_base': "Salário Mensal Bruto (R$):", 'saldo_fgts': "Saldo do FGTS (R$):",
+               'dias_trabalhados': "Dias Trabalhados no Último Mês (0 a 30):"}
+    resultados = []
+    for campo, rotulo in rotulos.items():
+        widget = next(w for w in app.number_input if w.label == rotulo)
+        original = widget.value
+        tempos = []
+        for i in range(repeticoes):
+            widget.set_value(original + (i % 2 + 1))
+            inicio = time.perf_counter()
+            app.run()
+            tempos.append((time.perf_counter() - inicio) * 1e3)
+            widget = next(w for w in app.number_input if w.label == rotulo)
+        resultados.append({'campo': campo, 'rerun_ms': round(sorted(tempos)[len(tempos) // 2], 1),
+                           'excecoes': [e.message for e in app.exception]})
+    return resultados
+
+
+if __name__ == "__main__":
+    for linha in benchmark_app() if '--app' in sys.argv else benchmark():
+        print(linha)
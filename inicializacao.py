@@ -0,0 +1,42 @@
+"""
+Inicialização leve compartilhada pelos apps Streamlit e módulos auxiliares.
+
+- preguicoso('pandas') devolve um módulo-procurador: a importação real só acontece no primeiro acesso
+  a um atributo (pd.DataFrame, np.where, ...). Assim a primeira renderização da página não espera por
+  pandas/numpy/altair/requests se eles só são usados depois (botão, upload, gráfico).
+- Depois de carregado, os atributos do módulo real ficam copiados no procurador: o custo por acesso é o
+  de um módulo comum.
+- Seguro entre threads (sessões do Streamlit): a importação em si passa pelo mecanismo padrão do Python,
+  e o módulo real continua registrado normalmente em sys.modules.
+
+Handles prontos: pd, np, alt.
+Medição de partida a frio de cada app: python benchmark_partida.py
+"""
+import importlib
+import types
+
+_PROCURADORES = {}
+
+
+class _ModuloPreguicoso(types.ModuleType):
+    """Procurador que importa o módulo real no primeiro acesso a atributo."""
+
+    def __getattr__(self, atributo):
+        modulo = importlib.import_module(self.__name__)
+        self.__dict__.update(modulo.__dict__)
+        return getattr(modulo, atributo)
+
+    def __repr__(self):
+        return f"<módulo preguiçoso '{self.__name__}'>"
+
+
+def preguicoso(nome):
+    """Módulo com importação adiada (um procurador por nome)."""
+    if nome not in _PROCURADORES:
+        _PROCURADORES[nome] = _ModuloPreguicoso(nome)
+    return _PROCURADORES[nome]
+
+
+pd = preguicoso('pandas')
+np = preguicoso('numpy')
+alt = preguicoso('altair')
@@ -0,0 +1,270 @@
+"""
+Instrumentação por seção dos apps Streamlit: tempo de parede, tempo de CPU e memória a cada execução (rerun).
+
+Uso nos apps:
+    import instrumentacao
+    instrumentacao.iniciar('A2.py')              # no topo do script: abre a execução atual
+    with instrumentacao.secao('impostos'):       # em volta de cada seção (aceita aninhamento)
+        ...
+    @instrumentacao.secao('figura')              # ou como decorador
+    def construir(): ...
+    instrumentacao.painel()                      # no fim: painel recolhível (só com INSTRUMENTACAO_PAINEL=1)
+
+Configuração (variáveis de ambiente, lidas na importação):
+- INSTRUMENTACAO=1 liga a medição. Desligada (padrão), secao() devolve um contexto vazio compartilhado e,
+  como decorador, a própria função: o custo é o de uma chamada de função
+- INSTRUMENTACAO_ARQUIVO: arquivo JSON-lines de saída (padrão instrumentacao.jsonl), uma linha por seção
+- INSTRUMENTACAO_PERFIL=cprofile|tracemalloc: amostragem detalhada das seções de nível mais alto
+- INSTRUMENTACAO_AMOSTRA: fração das execuções amostradas (padrão 0.1)
+- INSTRUMENTACAO_PAINEL=1: mostra o painel de depuração no fim da página (liga a medição)
+
+Campos de cada linha:
+- app, execucao (id do rerun), secao (caminho 'pai/filho'), inicio (epoch), parede_ms
+- cpu_ms: CPU da thread do script (o Streamlit roda cada sessão numa thread própria)
+- rss_delta_kb: variação da memória residente atual do processo entre o início e o fim da seção
+  (/proc/self/statm; negativa quando a seção libera memória; ausente fora do Linux). É do processo
+  inteiro: sessões simultâneas e o coletor de lixo entram na conta; para a alocação da própria seção,
+  use INSTRUMENTACAO_PERFIL=tracemalloc
+- erro: nome da exceção, se a seção terminou com uma
+- nas execuções amostradas: perfil (funções mais caras no cProfile) ou alocado_kb/pico_alocado_kb (tracemalloc;
+  o tracemalloc vale para o processo todo, então só uma seção é amostrada por vez)
+
+Resumo do arquivo (p50/p95 por app e seção): python instrumentacao.py [arquivo.jsonl]
+Custo da seção com a configuração atual:        python instrumentacao.py --sobrecarga
+"""
+import cProfile
+import functools
+import io
+import json
+import os
+from pathlib import Path
+import pstats
+import random
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+
+PAINEL = os.environ.get('INSTRUMENTACAO_PAINEL', '') == '1'
+ATIVA = os.environ.get('INSTRUMENTACAO', '') == '1' or PAINEL
+ARQUIVO = Path(os.environ.get('INSTRUMENTACAO_ARQUIVO', 'instrumentacao.jsonl'))
+PERFIL = os.environ.get('INSTRUMENTACAO_PERFIL', '').lower() or None
+AMOSTRA = float(os.environ.get('INSTRUMENTACAO_AMOSTRA', '0.1'))
+FUNCOES_PERFIL = 15
+_PAGINA_KB = os.sysconf('SC_PAGE_SIZE') // 1024 if hasattr(os, 'sysconf') else 4
+
+_LOCAL = threading.local()
+_TRAVA_ARQUIVO = threading.Lock()
+_TRAVA_PERFIL = threading.Lock()
+
+if PERFIL not in (None, 'cprofile', 'tracemalloc'):
+    raise ValueError(f"INSTRUMENTACAO_PERFIL inválido: {PERFIL} (use cprofile ou tracemalloc)")
+
+
+# --- 1. MEDIÇÃO DESLIGADA ---
+
+class _Desligada:
+    """Contexto vazio e decorador identidade (um só objeto compartilhado)."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, valor, rastreio):
+        return False
+
+    def __call__(self, funcao):
+        return funcao
+
+
+_DESLIGADA = _Desligada()
+
+
+# --- 2. EXECUÇÃO E SEÇÕES ---
+
+def _rss_kb():
+    """Memória residente atual do processo em KB (2º campo de /proc/self/statm, em páginas); None sem /proc."""
+    try:
+        with open('/proc/self/statm', 'rb') as statm:
+            return int(statm.read().split()[1]) * _PAGINA_KB
+    except OSError:
+        return None
+
+
+class _Execucao:
+    """Uma execução do script: id, pilha de seções abertas e registros já fechados."""
+
+    def __init__(self, app):
+        self.app = app
+        self.id = uuid.uuid4().hex[:12]
+        self.pilha = []
+        self.registros = []
+        self.perfil = PERFIL if PERFIL and random.random() < AMOSTRA else None
+
+
+class _Secao:
+    """Mede o bloco na execução corrente da thread; fora de uma execução não faz nada."""
+
+    def __init__(self, nome):
+        self.nome = nome
+
+    def __call__(self, funcao):
+        @functools.wraps(funcao)
+        def medida(*args, **kwargs):
+            with _Secao(self.nome):
+                return funcao(*args, **kwargs)
+        return medida
+
+    def __enter__(self):
+        self._execucao = execucao = getattr(_LOCAL, 'execucao', None)
+        if execucao is None:
+            return self
+        self._caminho = '/'.join([*execucao.pilha, self.nome])
+        self._perfilador = None
+        if execucao.perfil and not execucao.pilha and _TRAVA_PERFIL.acquire(blocking=False):
+            if execucao.perfil == 'cprofile':
+                self._perfilador = cProfile.Profile()
+                self._perfilador.enable()
+            elif tracemalloc.is_tracing():
+                _TRAVA_PERFIL.release()  # outro código já está rastreando: não interfere
+            else:
+                tracemalloc.start()
+                self._perfilador = 'tracemalloc'
+        execucao.pilha.append(self.nome)
+        self._inicio = time.time()
+        self._rss = _rss_kb()
+        self._cpu = time.thread_time()
+        self._parede = time.perf_counter()
+        return self
+
+    def __exit__(self, tipo, valor, rastreio):
+        execucao = self._execucao
+        if execucao is None:
+            return False
+        parede = time.perf_counter() - self._parede
+        cpu = time.thread_time() - self._cpu
+        execucao.pilha.pop()
+        registro = {
+            'app': execucao.app,
+            'execucao': execucao.id,
+            'secao': self._caminho,
+            'inicio': round(self._inicio, 3),
+            'parede_ms': round(parede * 1e3, 3),
+            'cpu_ms': round(cpu * 1e3, 3),
+        }
+        rss = _rss_kb()
+        if rss is not None and self._rss is not None:
+            registro['rss_delta_kb'] = rss - self._rss
+        if tipo is not None:
+            registro['erro'] = tipo.__name__
+        if self._perfilador is not None:
+            registro.update(self._encerrar_perfil())
+        execucao.registros.append(registro)
+        _gravar(registro)
+        return False
+
+    def _encerrar_perfil(self):
+        try:
+            if self._perfilador == 'tracemalloc':
+                alocado, pico = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                return {'alocado_kb': alocado // 1024, 'pico_alocado_kb': pico // 1024}
+            self._perfilador.disable()
+            saida = io.StringIO()
+            pstats.Stats(self._perfilador, stream=saida).sort_stats('cumulative').print_stats(FUNCOES_PERFIL)
+            return {'perfil': saida.getvalue()}
+        finally:
+            _TRAVA_PERFIL.release()
+
+
+def _gravar(registro):
+    linha = json.dumps(registro, ensure_ascii=False) + '\n'
+    with _TRAVA_ARQUIVO:
+        with open(ARQUIVO, 'a', encoding='utf-8') as arquivo:
+            arquivo.write(linha)
+
+
+def iniciar(app):
+    """Abre a execução corrente da thread (chamar no topo do script, a cada rerun)."""
+    _LOCAL.execucao = _Execucao(app) if ATIVA else None
+
+
+def secao(nome):
+    """Context manager/decorador que mede um trecho da execução corrente."""
+    return _Secao(nome) if ATIVA else _DESLIGADA
+
+
+def registros():
+    """Registros das seções já encerradas na execução corrente da thread."""
+    execucao = getattr(_LOCAL, 'execucao', None)
+    return list(execucao.registros) if execucao else []
+
+
+# --- 3. PAINEL DE DEPURAÇÃO ---
+
+def painel():
+    """Painel recolhível com as seções desta execução (somente com INSTRUMENTACAO_PAINEL=1)."""
+    if not PAINEL:
+        return
+    import streamlit as st
+
+    linhas = registros()
+    with st.expander(f"⏱️ Instrumentação — {len(linhas)} seções nesta execução", expanded=False):
+        if not linhas:
+            st.caption("Nenhuma seção medida nesta execução.")
+            return
+        colunas = ['secao', 'parede_ms', 'cpu_ms', 'rss_delta_kb', 'alocado_kb', 'pico_alocado_kb', 'erro']
+        st.dataframe([{c: linha[c] for c in colunas if c in linha} for linha in linhas],
+                     use_container_width=True, hide_index=True)
+        for linha in linhas:
+            if 'perfil' in linha:
+                st.markdown(f"**cProfile — {linha['secao']}**")
+                st.code(linha['perfil'], language=None)
+        st.caption(f"Execução {linhas[0]['execucao']} — registros em {ARQUIVO.resolve()}")
+
+
+# --- 4. RESUMO DO ARQUIVO ---
+
+def _percentil(valores, p):
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def resumir(arquivo=ARQUIVO):
+    """Por app e seção: execuções, p50/p95 do tempo de parede, média de CPU e maior variação de RSS."""
+    grupos = {}
+    with open(arquivo, encoding='utf-8') as entrada:
+        for linha in entrada:
+            if linha.strip():
+                registro = json.loads(linha)
+                grupos.setdefault((registro['app'], registro['secao']), []).append(registro)
+    return [
+        {
+            'app': app,
+            'secao': nome,
+            'n': len(lista),
+            'parede_p50_ms': round(_percentil([r['parede_ms'] for r in lista], 50), 1),
+            'parede_p95_ms': round(_percentil([r['parede_ms'] for r in lista], 95), 1),
+            'cpu_media_ms': round(sum(r['cpu_ms'] for r in lista) / len(lista), 1),
+            'rss_delta_max_kb': max((r['rss_delta_kb'] for r in lista if 'rss_delta_kb' in r), default=None),
+            'erros': sum('erro' in r for r in lista),
+        }
+        for (app, nome), lista in sorted(grupos.items())
+    ]
+
+
+def sobrecarga(repeticoes=1_000_000):
+    """Custo médio (ns) de um 'with secao(...)' vazio com a configuração atual, fora de uma execução."""
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        with secao('vazia'):
+            pass
+    return (time.perf_counter() - inicio) / repeticoes * 1e9
+
+
+if __name__ == "__main__":
+    if '--sobrecarga' in sys.argv:
+        print(f"ativa={ATIVA}: {sobrecarga():.0f} ns por seção")
+    else:
+        for linha in resumir(sys.argv[1] if len(sys.argv) > 1 else ARQUIVO):
+            print(json.dumps(linha, ensure_ascii=False))
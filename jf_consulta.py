@@ -0,0 +1,153 @@
+"""
+Consultas indexadas ao BD Consolidado da JF.
+
+- Índice hash em 'chave' (ex.: TRF1_DF_2019) e em (Sigla, secao, ano): consulta pontual em O(1).
+- Índice ordenado em (Sigla, secao, ano): fatias por intervalo de anos em O(log n) por seção.
+- Projeção de colunas: só as colunas pedidas são lidas do cache colunar (e ficam em memória para as próximas).
+
+Micro-benchmark (painel sintético crescente): python jf_consulta.py
+"""
+from bisect import bisect_left, bisect_right
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from jf_dados import ARQUIVO_JF, PASTA_CACHE, carregar_jf
+
+COLUNAS_INDICE = ['chave', 'Sigla', 'secao', 'ano']
+
+
+class ConsultaJF:
+    """
+    Camada de consulta sobre o painel da JF.
+    - df: DataFrame já carregado (opcional). Sem df, lê do cache colunar apenas as colunas do índice
+      e as demais sob demanda.
+    """
+
+    def __init__(self, df=None, caminho=ARQUIVO_JF, pasta_cache=PASTA_CACHE):
+        self._caminho = caminho
+        self._pasta_cache = pasta_cache
+        self._df = df
+        indice = df[COLUNAS_INDICE] if df is not None else carregar_jf(COLUNAS_INDICE, caminho, pasta_cache)
+        self._colunas = {coluna: indice[coluna].reset_index(drop=True) for coluna in COLUNAS_INDICE}
+
+        siglas = indice['Sigla'].astype(str).to_numpy()
+        secoes = indice['secao'].astype(str).to_numpy()
+        anos = indice['ano'].astype(int).to_numpy()
+
+        # Hash: chave -> linha e (Sigla, secao, ano) -> linha
+        self._por_chave = {chave: i for i, chave in enumerate(indice['chave'].astype(str))}
+        self._por_tupla = {(s, c, int(a)): i for i, (s, c, a) in enumerate(zip(siglas, secoes, anos))}
+
+        # Ordenado: (Sigla, secao, ano) -> linha, para fatias por intervalo de anos
+        ordem = np.lexsort((anos, secoes, siglas))
+        self._ordenadas = [(siglas[i], secoes[i], int(anos[i])) for i in ordem]
+        self._posicoes = ordem
+        self._secoes_por_sigla = {}
+        for sigla, secao, _ in self._ordenadas:
+            secoes_sigla = self._secoes_por_sigla.setdefault(sigla, [])
+            if not secoes_sigla or secoes_sigla[-1] != secao:
+                secoes_sigla.append(secao)
+
+    def __len__(self):
+        return len(self._por_chave)
+
+    # --- Projeção de colunas ---
+
+    def _carregar_colunas(self, colunas):
+        """Garante em memória as colunas pedidas (lidas do DataFrame de origem ou do cache colunar)."""
+        faltando = [coluna for coluna in colunas if coluna not in self._colunas]
+        if faltando:
+            if self._df is not None:
+                novas = self._df[faltando].reset_index(drop=True)
+            else:
+                novas = carregar_jf(faltando, self._caminho, self._pasta_cache)
+            for coluna in faltando:
+                self._colunas[coluna] = novas[coluna]
+
+    def _linhas(self, posicoes, colunas):
+        """Monta o DataFrame das linhas pedidas apenas com as colunas projetadas."""
+        colunas = list(colunas) if colunas is not None else COLUNAS_INDICE
+        self._carregar_colunas(colunas)
+        posicoes = np.asarray(posicoes, dtype=np.int64)
+        return pd.DataFrame({coluna: self._colunas[coluna].take(posicoes).to_numpy() for coluna in colunas},
+                            index=pd.Index(posicoes, name='linha'))
+
+    def _linha(self, posicao, colunas):
+        """Uma única linha (Series) com as colunas projetadas, sem montar DataFrame."""
+        colunas = list(colunas) if colunas is not None else COLUNAS_INDICE
+        self._carregar_colunas(colunas)
+        return pd.Series({coluna: self._colunas[coluna].iat[posicao] for coluna in colunas}, name=posicao, dtype=object)
+
+    # --- Consultas ---
+
+    def por_chave(self, chave, colunas=None):
+        """Consulta pontual pela chave (ex.: 'TRF1_DF_2019'). KeyError se não existir."""
+        return self._linha(self._por_chave[chave], colunas)
+
+    def ponto(self, sigla, secao, ano, colunas=None):
+        """Consulta pontual por (Sigla, secao, ano), ex.: ('TRF1', 'DF', 2019). KeyError se não existir."""
+        return self._linha(self._por_tupla[(sigla, secao, int(ano))], colunas)
+
+    def posicoes_intervalo(self, sigla, ano_inicio=None, ano_fim=None, secao=None):
+        """Linhas de uma Sigla (ou de uma seção) entre dois anos, inclusive, via busca binária."""
+        ano_inicio = -sys.maxsize if ano_inicio is None else int(ano_inicio)
+        ano_fim = sys.maxsize if ano_fim is None else int(ano_fim)
+        secoes = [secao] if secao is not None else self._secoes_por_sigla.get(sigla, [])
+        posicoes = []
+        for sec in secoes:
+            inicio = bisect_left(self._ordenadas, (sigla, sec, ano_inicio))
+            fim = bisect_right(self._ordenadas, (sigla, sec, ano_fim))
+            posicoes.extend(self._posicoes[inicio:fim])
+        return posicoes
+
+    def intervalo(self, sigla, ano_inicio=None, ano_fim=None, secao=None, colunas=None):
+        """
+        Fatia por intervalo de anos, ex.: todas as seções do TRF3 de 2015 a 2021.
+        - Ordenado por seção e ano; colunas=None devolve apenas as colunas do índice.
+        """
+        return self._linhas(self.posicoes_intervalo(sigla, ano_inicio, ano_fim, secao), colunas)
+
+# --- Micro-benchmark ---
+
+def _painel_sintetico(df, fator):
+    """Replica o painel 'fator' vezes com Siglas distintas (mesma distribuição de seções e anos)."""
+    copias = []
+    for k in range(fator):
+        copia = df[COLUNAS_INDICE + ['cn1']].copy()
+        copia['Sigla'] = copia['Sigla'].astype(str) + f"_{k}"
+        copia['chave'] = copia['chave'].astype(str) + f"_{k}"
+        copias.append(copia)
+    return pd.concat(copias, ignore_index=True)
+
+
+def _medir(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1e6
+
+
+def benchmark(fatores=(1, 10, 100, 1000), repeticoes=2000):
+    """Tempo médio (µs) por consulta, índice x varredura por máscara booleana, com o painel crescendo."""
+    base = carregar_jf(COLUNAS_INDICE + ['cn1'])
+    resultados = []
+    for fator in fatores:
+        df = _painel_sintetico(base, fator)
+        consulta = ConsultaJF(df)
+        resultados.append({
+            'linhas': len(df),
+            'ponto_indice_us': _medir(lambda: consulta.ponto('TRF1_0', 'DF', 2019, ['cn1']), repeticoes),
+            'intervalo_indice_us': _medir(lambda: consulta.intervalo('TRF3_0', 2015, 2021, colunas=['cn1']), repeticoes),
+            'ponto_mascara_us': _medir(lambda: df.loc[(df['Sigla'] == 'TRF1_0') & (df['secao'] == 'DF') & (df['ano'] == 2019), 'cn1'],
+                                       max(repeticoes // 20, 5)),
+            'intervalo_mascara_us': _medir(lambda: df.loc[(df['Sigla'] == 'TRF3_0') & df['ano'].between(2015, 2021), 'cn1'],
+                                           max(repeticoes // 20, 5)),
+        })
+    return pd.DataFrame(resultados)
+
+
+if __name__ == "__main__":
+    print(benchmark().round(1).to_string(index=False))
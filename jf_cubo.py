@@ -0,0 +1,197 @@
+"""
+Cubo materializado de indicadores de produtividade da JF (tribunal × seção × ano).
+
+- Somas por seção (folhas: linhas com trib == 0) e agregações para o TRF (secao='total')
+  e para o nível nacional (Sigla='TRF', secao='total'), na mesma convenção do arquivo de origem.
+- Indicadores de razão (ipm1je, iad1je, tc1je) são recalculados a partir das somas de
+  numerador e denominador em cada nível, nunca pela média das razões; numerador e denominador
+  seguem a metodologia do CNJ usada no arquivo, de modo que as folhas reproduzem as colunas de origem
+  (conferir com python jf_cubo.py).
+- Atualização incremental: um ano novo ou uma nova versão do arquivo substitui apenas as folhas
+  recebidas e recalcula só os agregados dos (Sigla, ano) e anos afetados.
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+
+from jf_dados import carregar_jf
+
+DIMENSOES = ['Sigla', 'secao', 'ano']
+NIVEIS = ['secao', 'tribunal', 'nacional']
+
+# Totais exibidos nos painéis
+MEDIDAS = ['cn1', 'Tbaix', 'CP', 'Mag', 'Serv']
+
+# Razão = soma(numerador) / soma(denominador); os termos de cada folha vêm de _termos()
+INDICADORES = {
+    # Índice de Produtividade dos Magistrados (1º grau + JE): baixados / magistrados médios no ano
+    'ipm1je': ('ipm1je_num', 'ipm1je_den'),
+    # Índice de Atendimento à Demanda: baixados / casos novos
+    'iad1je': ('iad1je_num', 'iad1je_den'),
+    # Taxa de Congestionamento: pendentes / (pendentes + baixados); até 2015, 1 - baixados / (novos + pendentes)
+    'tc1je': ('tc1je_num', 'tc1je_den'),
+}
+
+# Ano em que o CNJ passou a calcular a Taxa de Congestionamento sem os casos novos
+ANO_TC_SEM_CASOS_NOVOS = 2016
+
+# Colunas lidas do arquivo: medidas e insumos dos indicadores (ipm1je entra só para recuperar
+# o denominador fracionário, que o arquivo não traz)
+COLUNAS_ORIGEM = list(dict.fromkeys(
+    MEDIDAS + ['tbaix1', 'tbaixje', 'cn1', 'cnje', 'cp1', 'cpje', 'mag1je', 'ipm1je']
+))
+COLUNAS_SOMA = MEDIDAS + [termo for termos in INDICADORES.values() for termo in termos]
+
+SIGLA_NACIONAL = 'TRF'
+SECAO_TOTAL = 'total'
+
+# Diferença relativa aceita ao conferir as folhas com o arquivo: as razões vêm com 5 casas, e o iad1je de
+# três seções do TRF1 em 2016 foi calculado com contagens que diferem em menos de um processo das publicadas
+TOLERANCIA_ORIGEM = 1e-4
+
+
+def _termos(origem, anos):
+    """
+    Numerador e denominador de cada indicador por folha, somáveis entre seções do mesmo ano.
+    - ipm1je: o CNJ divide pela média de magistrados no ano (dias de exercício / 365), e o arquivo só traz
+      mag1je arredondado; a média é recuperada como baixados / ipm1je da própria folha (mag1je quando
+      a folha não tem ipm1je ou não baixou processos).
+    - tc1je: até 2015, 1 - baixados / (casos novos + pendentes); desde 2016, pendentes / (pendentes + baixados).
+    """
+    ipm_origem = origem['ipm1je']
+    origem = origem.fillna(0.0)
+    baixados = origem['tbaix1'] + origem['tbaixje']
+    casos_novos = origem['cn1'] + origem['cnje']
+    pendentes = origem['cp1'] + origem['cpje']
+    mag_medio = (baixados / ipm_origem.where(ipm_origem > 0)).where(baixados > 0)
+    antigo = anos < ANO_TC_SEM_CASOS_NOVOS
+    return pd.DataFrame({
+        'ipm1je_num': baixados,
+        'ipm1je_den': mag_medio.fillna(origem['mag1je']),
+        'iad1je_num': baixados,
+        'iad1je_den': casos_novos,
+        'tc1je_num': np.where(antigo, casos_novos + pendentes - baixados, pendentes),
+        'tc1je_den': np.where(antigo, casos_novos + pendentes, pendentes + baixados),
+    }, index=origem.index)
+
+
+def _folhas(df):
+    """Linhas de seção (trib == 0) com as dimensões, as MEDIDAS e os termos dos indicadores (nulos = 0)."""
+    folhas = df[df['trib'] == 0]
+    origem = folhas[COLUNAS_ORIGEM].astype('float64')
+    anos = folhas['ano'].astype(int).to_numpy()
+    somas = pd.concat([origem[MEDIDAS].fillna(0.0), _termos(origem, anos)], axis=1)
+    somas.index = pd.MultiIndex.from_arrays(
+        [folhas['Sigla'].astype(str), folhas['secao'].astype(str), anos], names=DIMENSOES
+    )
+    return somas
+
+
+def _calcular_indicadores(somas):
+    """Acrescenta as razões calculadas sobre as somas (denominador zero -> nulo)."""
+    resultado = somas.copy()
+    for indicador, (numerador, denominador) in INDICADORES.items():
+        den = somas[denominador]
+        resultado[indicador] = somas[numerador] / den.where(den != 0)
+    return resultado
+
+
+def divergencias(df, tolerancia=TOLERANCIA_ORIGEM):
+    """
+    Folhas em que um indicador do cubo não reproduz a coluna do arquivo de origem.
+    Retorna DataFrame (Sigla, secao, ano, indicador, cubo, origem); vazio quando tudo confere.
+    """
+    folhas = df[df['trib'] == 0]
+    calculados = _calcular_indicadores(_folhas(df))
+    linhas = []
+    for indicador in INDICADORES:
+        origem = folhas[indicador].astype('float64').to_numpy()
+        cubo = calculados[indicador].to_numpy()
+        confere = np.isclose(cubo, origem, rtol=tolerancia, atol=1e-5) | (np.isnan(cubo) & np.isnan(origem))
+        for posicao in np.flatnonzero(~confere):
+            linhas.append((*calculados.index[posicao], indicador, cubo[posicao], origem[posicao]))
+    return pd.DataFrame(linhas, columns=DIMENSOES + ['indicador', 'cubo', 'origem'])
+
+
+class CuboJF:
+    """
+    Cubo materializado.
+    - tabela: DataFrame indexado por (nivel, Sigla, secao, ano) com MEDIDAS, somas auxiliares e INDICADORES.
+    """
+
+    def __init__(self, df=None):
+        self._folhas = None
+        self.tabela = pd.DataFrame()
+        if df is not None:
+            self.atualizar(df)
+
+    def atualizar(self, df):
+        """
+        Incorpora linhas novas ou reapresentadas (ex.: ano novo, nova versão do arquivo).
+        - Folhas recebidas substituem as existentes com a mesma (Sigla, secao, ano).
+        - Só os agregados de tribunal/ano e nacionais dos anos afetados são recalculados.
+        Retorna o número de células (linhas do cubo) recalculadas.
+        """
+        novas = _folhas(df)
+        if novas.empty:
+            return 0
+        if self._folhas is None:
+            self._folhas = novas.sort_index()
+        else:
+            mantidas = self._folhas[~self._folhas.index.isin(novas.index)]
+            self._folhas = pd.concat([mantidas, novas]).sort_index()
+
+        anos = novas.index.get_level_values('ano').unique()
+        tribunais = novas.index.droplevel('secao').unique()
+
+        folhas_afetadas = self._folhas.loc[self._folhas.index.droplevel('secao').isin(tribunais)]
+        por_tribunal = folhas_afetadas.groupby(level=['Sigla', 'ano']).sum()
+        por_tribunal.index = pd.MultiIndex.from_arrays(
+            [por_tribunal.index.get_level_values('Sigla'), [SECAO_TOTAL] * len(por_tribunal),
+             por_tribunal.index.get_level_values('ano')], names=DIMENSOES
+        )
+        nacional = self._folhas[self._folhas.index.get_level_values('ano').isin(anos)].groupby(level='ano').sum()
+        nacional.index = pd.MultiIndex.from_arrays(
+            [[SIGLA_NACIONAL] * len(nacional), [SECAO_TOTAL] * len(nacional), nacional.index], names=DIMENSOES
+        )
+
+        recalculadas = pd.concat({
+            'secao': _calcular_indicadores(novas),
+            'tribunal': _calcular_indicadores(por_tribunal),
+            'nacional': _calcular_indicadores(nacional),
+        }, names=['nivel'])
+
+        if self.tabela.empty:
+            self.tabela = recalculadas
+        else:
+            self.tabela = pd.concat([self.tabela[~self.tabela.index.isin(recalculadas.index)], recalculadas])
+        self.tabela = self.tabela.sort_index()
+        return len(recalculadas)
+
+    def consultar(self, nivel='tribunal', sigla=None, secao=None, ano=None, colunas=None):
+        """
+        Leitura direta do cubo (sem reagrupar o painel bruto).
+        - nivel: 'secao', 'tribunal' ou 'nacional'
+        - sigla / secao / ano: valor único, lista ou None (todos); ano aceita slice (ex.: slice(2015, 2021))
+        - colunas: padrão MEDIDAS + INDICADORES
+        """
+        colunas = colunas or MEDIDAS + list(INDICADORES)
+        seletor = tuple(
+            slice(None) if valor is None else valor if isinstance(valor, (list, slice)) else [valor]
+            for valor in (nivel, sigla, secao, ano)
+        )
+        return self.tabela.loc[seletor, colunas].droplevel('nivel')
+
+
+def cubo_jf():
+    """Cubo montado a partir do cache colunar (lê apenas as colunas usadas pelo cubo)."""
+    return CuboJF(carregar_jf(DIMENSOES + ['trib'] + COLUNAS_ORIGEM))
+
+
+if __name__ == '__main__':
+    diferentes = divergencias(carregar_jf(list(dict.fromkeys(DIMENSOES + ['trib'] + COLUNAS_ORIGEM + list(INDICADORES)))))
+    if not diferentes.empty:
+        print(diferentes.to_string(index=False))
+        sys.exit(f'{len(diferentes)} folhas não reproduzem o arquivo de origem')
+    print('Indicadores das folhas conferem com o arquivo de origem')
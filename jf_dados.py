@@ -0,0 +1,219 @@
+"""
+Leitura tipada e cache colunar do BD Consolidado da Justiça Federal (JF).
+
+- O CSV (';', vírgula decimal, ~120 colunas) é lido uma única vez com um esquema explícito:
+  contadores inteiros (nulos permitidos), decimais com vírgula, categorias para os textos repetidos.
+- O resultado é gravado em Parquet (memory-map) em .cache_jf/, com o hash do CSV no nome do arquivo:
+  alterar o CSV invalida o cache automaticamente.
+- Leituras seguintes carregam só as colunas pedidas, em milissegundos: o hash do CSV fica memorizado no
+  processo e só é recalculado quando o mtime ou o tamanho do arquivo mudam.
+"""
+import hashlib
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+ARQUIVO_JF = Path(__file__).with_name("BD_Consolidado_JF_Secao_23_Set_2025.csv")
+PASTA_CACHE = Path(__file__).with_name(".cache_jf")
+
+# Memória do processo: caminho resolvido -> ((mtime_ns, tamanho), hash do conteúdo)
+_HASHES = {}
+
+# --- 1. ESQUEMA ---
+
+COLUNA_CHAVE = 'chave'  # ex.: TRF1_DF_2012
+COLUNAS_CATEGORICAS = ['Sigla', 'dsc_tribunal', 'secao']
+COLUNAS_PEQUENAS = {'ano': 'int16', 'trib': 'int8'}
+# Indicadores com vírgula decimal (ex.: 0,00129) e o PIB em notação científica (ex.: 9,915317e+12)
+COLUNAS_DECIMAIS = ['pib', 'g1', 'g7', 'f2', 'f3', 'cm1je', 'k1je', 'ipm1je', 'ipsjud1je', 'iad1je', 'tc1je']
+# Demais colunas: contadores inteiros (processos, magistrados, servidores, despesas em R$)
+
+# Marcadores de valor ausente encontrados nas planilhas de origem
+VALORES_NULOS = ['', '-', '#VALOR!', '#DIV/0!']
+
+
+def _limpar_nomes(colunas):
+    """Remove espaços e quebras de linha dos nomes de coluna."""
+    return colunas.str.strip().str.replace("\n", " ")
+
+
+def aplicar_esquema(df):
+    """Converte um DataFrame lido como texto para os tipos do esquema."""
+    df = df.copy()
+    df.columns = _limpar_nomes(df.columns)
+    for coluna in df.columns:
+        valores = df[coluna].str.strip()
+        valores = valores.mask(valores.isin(VALORES_NULOS))
+        if coluna == COLUNA_CHAVE:
+            df[coluna] = valores.astype('string')
+        elif coluna in COLUNAS_CATEGORICAS:
+            df[coluna] = valores.astype('category')
+        elif coluna in COLUNAS_PEQUENAS:
+            df[coluna] = pd.to_numeric(valores).astype(COLUNAS_PEQUENAS[coluna])
+        elif coluna in COLUNAS_DECIMAIS:
+            df[coluna] = pd.to_numeric(valores.str.replace(',', '.', regex=False)).astype('Float64')
+        else:
+            df[coluna] = pd.to_numeric(valores).astype('Int64')
+    return df
+
+
+def ler_csv_jf(caminho=ARQUIVO_JF):
+    """Lê o CSV original (sem cache) já com o esquema aplicado."""
+    bruto = pd.read_csv(caminho, sep=';', encoding='utf-8', dtype=str, keep_default_na=False)
+    return aplicar_esquema(bruto)
+
+# --- 2. CACHE COLUNAR ---
+
+def hash_arquivo(caminho, tamanho_bloco=1 << 20):
+    """
+    SHA-256 do conteúdo do arquivo (identifica a versão do CSV).
+    - Memorizado por (caminho resolvido, mtime_ns, tamanho): chamadas seguintes custam um stat, e o
+      arquivo só é relido quando um dos dois muda.
+    """
+    caminho = Path(caminho).resolve()
+    estado = caminho.stat()
+    assinatura = (estado.st_mtime_ns, estado.st_size)
+    memorizado = _HASHES.get(caminho)
+    if memorizado is not None and memorizado[0] == assinatura:
+        return memorizado[1]
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(tamanho_bloco), b''):
+            sha.update(bloco)
+    _HASHES[caminho] = (assinatura, sha.hexdigest())
+    return _HASHES[caminho][1]
+
+
+def caminho_cache(caminho=ARQUIVO_JF, pasta_cache=PASTA_CACHE):
+    """Arquivo Parquet correspondente à versão atual do CSV."""
+    caminho = Path(caminho)
+    return Path(pasta_cache) / f"{caminho.stem}.{hash_arquivo(caminho)[:16]}.parquet"
+
+
+def gerar_cache(caminho=ARQUIVO_JF, pasta_cache=PASTA_CACHE):
+    """Lê o CSV, grava o Parquet da versão atual e remove caches de versões anteriores."""
+    destino = caminho_cache(caminho, pasta_cache)
+    destino.parent.mkdir(parents=True, exist_ok=True)
+    df = ler_csv_jf(caminho)
+    temporario = destino.with_suffix('.tmp')
+    df.to_parquet(temporario, index=False)
+    temporario.replace(destino)
+    for antigo in destino.parent.glob(f"{Path(caminho).stem}.*.parquet"):
+        if antigo != destino:
+            antigo.unlink()
+    return destino
+
+
+def carregar_jf(colunas=None, caminho=ARQUIVO_JF, pasta_cache=PASTA_CACHE):
+    """
+    Carrega o BD Consolidado da JF a partir do cache colunar (gera o cache se necessário).
+    - colunas: lista de colunas a ler (None = todas). Só essas colunas são lidas do disco.
+    """
+    destino = caminho_cache(caminho, pasta_cache)
+    if not destino.exists():
+        destino = gerar_cache(caminho, pasta_cache)
+    tabela = pq.read_table(destino, columns=colunas, memory_map=True)
+    return tabela.to_pandas()
+
+# --- 3. REPRESENTAÇÃO COMPACTA ---
+
+# Colunas com pelo menos esta fração de nulos são candidatas a armazenamento esparso
+LIMITE_ESPARSO = 0.5
+
+_TIPOS_INTEIROS = ['Int8', 'Int16', 'Int32', 'Int64']
+
+
+def _menor_inteiro(serie):
+    """Menor tipo inteiro anulável que comporta os valores da coluna."""
+    minimo, maximo = serie.min(), serie.max()
+    for tipo in _TIPOS_INTEIROS:
+        limites = np.iinfo(tipo.lower())
+        if limites.min <= minimo and maximo <= limites.max:
+            return serie.astype(tipo)
+    return serie
+
+
+def _esparsa(serie):
+    """
+    Versão esparsa (nulos não ocupam memória).
+    - float32 só para colunas de valores inteiros abaixo de 2**24 (representação exata); indicadores
+      decimais ficam em float64 (em float32, 0,00129 viraria 0,0012900000438).
+    """
+    valores = serie.astype('float64')
+    presentes = valores.dropna()
+    inteiros = bool((presentes == np.round(presentes)).all()) and presentes.abs().max() < 2 ** 24
+    return valores.astype(pd.SparseDtype('float32' if inteiros else 'float64', np.nan))
+
+
+def compactar(df, limite_esparso=LIMITE_ESPARSO):
+    """
+    Reduz o uso de memória do painel:
+    - contadores no menor tipo inteiro possível
+    - colunas majoritariamente nulas em formato esparso (quando fica menor que a versão densa)
+    - colunas 100% nulas removidas (ficam disponíveis sob demanda em PainelJF.coluna)
+    - textos repetidos como categoria (dicionário)
+    Retorna (DataFrame compacto, lista de colunas vazias removidas).
+    """
+    compacto = {}
+    vazias = []
+    for coluna in df.columns:
+        serie = df[coluna]
+        fracao_nula = serie.isna().mean()
+        if fracao_nula == 1.0:
+            vazias.append(coluna)
+            continue
+        if pd.api.types.is_integer_dtype(serie.dtype):
+            serie = _menor_inteiro(serie)
+        elif pd.api.types.is_string_dtype(serie.dtype) and serie.nunique() < len(serie) / 2:
+            serie = serie.astype('category')
+        if fracao_nula >= limite_esparso and pd.api.types.is_numeric_dtype(serie.dtype):
+            esparsa = _esparsa(serie)
+            if esparsa.memory_usage(deep=True) < serie.memory_usage(deep=True):
+                serie = esparsa
+        compacto[coluna] = serie
+    return pd.DataFrame(compacto, index=df.index), vazias
+
+
+def relatorio_memoria(antes, depois):
+    """Bytes por coluna antes e depois da compactação (colunas removidas aparecem com 0 bytes depois)."""
+    bytes_antes = antes.memory_usage(deep=True, index=False)
+    bytes_depois = depois.memory_usage(deep=True, index=False).reindex(bytes_antes.index, fill_value=0)
+    relatorio = pd.DataFrame({
+        'tipo_antes': antes.dtypes.astype(str),
+        'tipo_depois': depois.dtypes.astype(str).reindex(bytes_antes.index, fill_value='(removida)'),
+        'bytes_antes': bytes_antes,
+        'bytes_depois': bytes_depois,
+    })
+    relatorio['reducao_%'] = (1 - relatorio['bytes_depois'] / relatorio['bytes_antes']) * 100
+    relatorio.loc['TOTAL'] = ['', '', bytes_antes.sum(), bytes_depois.sum(),
+                              (1 - bytes_depois.sum() / bytes_antes.sum()) * 100]
+    return relatorio
+
+
+class PainelJF:
+    """
+    Painel da JF em representação compacta.
+    - dados: DataFrame compacto
+    - colunas_vazias: colunas removidas por estarem 100% nulas (materializadas só quando pedidas)
+    - relatorio: bytes por coluna antes/depois
+    """
+
+    def __init__(self, df, limite_esparso=LIMITE_ESPARSO):
+        self.dados, self.colunas_vazias = compactar(df, limite_esparso)
+        self.relatorio = relatorio_memoria(df, self.dados)
+        self._tipos_vazias = {coluna: df[coluna].dtype for coluna in self.colunas_vazias}
+
+    def coluna(self, nome):
+        """Acesso a qualquer coluna, inclusive as removidas (recriadas como nulas, com o tipo original)."""
+        if nome in self.dados.columns:
+            return self.dados[nome]
+        if nome in self._tipos_vazias:
+            return pd.Series(pd.NA, index=self.dados.index, dtype=self._tipos_vazias[nome], name=nome)
+        raise KeyError(nome)
+
+
+def carregar_jf_compacto(colunas=None, caminho=ARQUIVO_JF, pasta_cache=PASTA_CACHE, limite_esparso=LIMITE_ESPARSO):
+    """Carrega o painel (via cache colunar) já na representação compacta."""
+    return PainelJF(carregar_jf(colunas, caminho, pasta_cache), limite_esparso)
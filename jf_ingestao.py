@@ -0,0 +1,172 @@
+"""
+Ingestão incremental de várias versões (releases) do BD Consolidado da JF.
+
+- Cada arquivo é um retrato datado (ex.: ..._23_Set_2025.csv) que reapresenta todos os anos.
+- Arquivos novos são lidos em paralelo (pool de processos) com o esquema de jf_dados.
+- Consolidação por 'chave' com a versão mais recente prevalecendo; cada linha nova, alterada ou
+  removida entre versões fica registrada na tabela de alterações.
+- Como cada versão reapresenta todos os anos, uma chave ausente de uma versão mais recente é removida
+  do consolidado; uma versão mais antiga processada depois já foi superada e não altera nada.
+- Um manifesto com o hash do conteúdo de cada arquivo evita reprocessar o que já foi visto:
+  acrescentar um arquivo mensal custa a leitura de um arquivo, não do histórico inteiro.
+
+Uso: python jf_ingestao.py arquivo1.csv [arquivo2.csv ...]
+"""
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+import json
+import os
+from pathlib import Path
+import re
+import sys
+
+import pandas as pd
+
+from jf_dados import COLUNA_CHAVE, PASTA_CACHE, hash_arquivo, ler_csv_jf
+
+MESES = {'jan': 1, 'fev': 2, 'mar': 3, 'abr': 4, 'mai': 5, 'jun': 6,
+         'jul': 7, 'ago': 8, 'set': 9, 'out': 10, 'nov': 11, 'dez': 12}
+_PADRAO_DATA = re.compile(r'_(\d{1,2})_([A-Za-z]{3})_(\d{4})')
+
+COLUNA_RELEASE = '_release'
+COLUNA_HASH = '_hash_linha'
+
+
+def data_release(caminho):
+    """Data da versão a partir do nome do arquivo (ex.: _23_Set_2025); sem data no nome, usa a data de modificação."""
+    encontrado = _PADRAO_DATA.search(Path(caminho).stem)
+    if encontrado and encontrado.group(2).lower() in MESES:
+        dia, mes, ano = encontrado.groups()
+        return date(int(ano), MESES[mes.lower()], int(dia))
+    return date.fromtimestamp(os.path.getmtime(caminho))
+
+
+def _ler_release(caminho):
+    """Lê um arquivo de versão (executado nos processos do pool) e calcula o hash de cada linha."""
+    df = ler_csv_jf(caminho)
+    df[COLUNA_HASH] = pd.util.hash_pandas_object(df.drop(columns=COLUNA_CHAVE), index=False).to_numpy()
+    df[COLUNA_RELEASE] = pd.Timestamp(data_release(caminho))
+    return df
+
+
+class IngestaoJF:
+    """
+    Estado persistente da ingestão (em pasta_cache):
+    - manifesto_releases.json: hash -> arquivo, data da versão, linhas, linhas novas/alteradas/removidas,
+      data de processamento
+    - consolidado_releases.parquet: uma linha por chave (versão mais recente), com _release e _hash_linha
+    - alteracoes_releases.parquet: chave, release, release_anterior, tipo ('nova', 'alterada' ou 'removida')
+    """
+
+    def __init__(self, pasta_cache=PASTA_CACHE):
+        self.pasta = Path(pasta_cache)
+        self._caminho_manifesto = self.pasta / 'manifesto_releases.json'
+        self._caminho_consolidado = self.pasta / 'consolidado_releases.parquet'
+        self._caminho_alteracoes = self.pasta / 'alteracoes_releases.parquet'
+        self.manifesto = json.loads(self._caminho_manifesto.read_text(encoding='utf-8')) if self._caminho_manifesto.exists() else {}
+
+    def consolidado(self):
+        """Tabela consolidada (uma linha por chave, versão mais recente)."""
+        if not self._caminho_consolidado.exists():
+            return pd.DataFrame()
+        return pd.read_parquet(self._caminho_consolidado)
+
+    def alteracoes(self):
+        """Registro de linhas novas/alteradas/removidas por versão."""
+        if not self._caminho_alteracoes.exists():
+            return pd.DataFrame(columns=[COLUNA_CHAVE, 'release', 'release_anterior', 'tipo'])
+        return pd.read_parquet(self._caminho_alteracoes)
+
+    def _gravar(self, caminho, df):
+        temporario = caminho.with_suffix('.tmp')
+        df.to_parquet(temporario, index=False)
+        temporario.replace(caminho)
+
+    def ingerir(self, arquivos, processos=None):
+        """
+        Processa apenas os arquivos cujo conteúdo ainda não consta do manifesto.
+        Retorna um resumo: arquivos novos/ignorados, linhas novas/alteradas/removidas/inalteradas.
+        """
+        hashes = {str(caminho): hash_arquivo(caminho) for caminho in arquivos}
+        novos = list({hash_: caminho for caminho, hash_ in reversed(hashes.items()) if hash_ not in self.manifesto}.values())
+        resumo = {'arquivos_novos': len(novos), 'arquivos_ignorados': len(hashes) - len(novos),
+                  'linhas_novas': 0, 'linhas_alteradas': 0, 'linhas_removidas': 0, 'linhas_inalteradas': 0}
+        if not novos:
+            return resumo
+
+        if len(novos) == 1 or processos == 1:
+            releases = [_ler_release(caminho) for caminho in novos]
+        else:
+            with ProcessPoolExecutor(max_workers=processos or min(len(novos), os.cpu_count())) as pool:
+                releases = list(pool.map(_ler_release, novos))
+
+        consolidado = self.consolidado()
+        alteracoes = [self.alteracoes()]
+        ultima_release = max((pd.Timestamp(item['release']) for item in self.manifesto.values()), default=None)
+        # Da versão mais antiga para a mais recente: a última a ser aplicada prevalece
+        for caminho, release in sorted(zip(novos, releases), key=lambda par: par[1][COLUNA_RELEASE].iloc[0]):
+            consolidado, registro, inalteradas = self._aplicar(consolidado, release, ultima_release)
+            data = release[COLUNA_RELEASE].iloc[0]
+            ultima_release = data if ultima_release is None else max(ultima_release, data)
+            alteracoes.append(registro)
+            contagens = {f'linhas_{tipo}s': int((registro['tipo'] == tipo).sum())
+                         for tipo in ('nova', 'alterada', 'removida')}
+            for campo, quantidade in contagens.items():
+                resumo[campo] += quantidade
+            resumo['linhas_inalteradas'] += inalteradas
+            self.manifesto[hashes[caminho]] = {
+                'arquivo': Path(caminho).name,
+                'release': release[COLUNA_RELEASE].iloc[0].date().isoformat(),
+                'linhas': len(release),
+                **contagens,
+                'processado_em': datetime.now().isoformat(timespec='seconds'),
+            }
+
+        self.pasta.mkdir(parents=True, exist_ok=True)
+        self._gravar(self._caminho_consolidado, consolidado)
+        self._gravar(self._caminho_alteracoes, pd.concat([a for a in alteracoes if not a.empty], ignore_index=True))
+        temporario = self._caminho_manifesto.with_suffix('.tmp')
+        temporario.write_text(json.dumps(self.manifesto, ensure_ascii=False, indent=2), encoding='utf-8')
+        temporario.replace(self._caminho_manifesto)
+        return resumo
+
+    @staticmethod
+    def _aplicar(consolidado, release, ultima_release=None):
+        """
+        Mescla uma versão no consolidado, tocando apenas as linhas novas, alteradas ou removidas.
+        - Cada versão reapresenta todos os anos: chaves do consolidado ausentes dela são removidas.
+        - ultima_release: data da versão mais recente já aplicada. Uma versão anterior (reprocessamento fora
+          de ordem) já foi superada: não altera linhas nem reinsere chaves removidas depois dela.
+        """
+        data = release[COLUNA_RELEASE].iloc[0]
+        if ultima_release is not None and data < ultima_release:
+            return consolidado, pd.DataFrame(columns=[COLUNA_CHAVE, 'release', 'release_anterior', 'tipo']), len(release)
+        if consolidado.empty:
+            registro = pd.DataFrame({COLUNA_CHAVE: release[COLUNA_CHAVE], 'release': data,
+                                     'release_anterior': pd.NaT, 'tipo': 'nova'})
+            return release.reset_index(drop=True), registro, 0
+
+        atual = consolidado.set_index(COLUNA_CHAVE)[[COLUNA_HASH, COLUNA_RELEASE]]
+        comparacao = release[[COLUNA_CHAVE, COLUNA_HASH]].join(atual, on=COLUNA_CHAVE, rsuffix='_atual')
+        nova = comparacao[COLUNA_HASH + '_atual'].isna()
+        alterada = ~nova & (comparacao[COLUNA_HASH] != comparacao[COLUNA_HASH + '_atual'])
+        aplicar = (nova | alterada).to_numpy()
+        removida = ~consolidado[COLUNA_CHAVE].isin(release[COLUNA_CHAVE])
+
+        registro = pd.DataFrame({
+            COLUNA_CHAVE: [*release.loc[aplicar, COLUNA_CHAVE], *consolidado.loc[removida, COLUNA_CHAVE]],
+            'release': data,
+            'release_anterior': [*comparacao.loc[aplicar, COLUNA_RELEASE], *consolidado.loc[removida, COLUNA_RELEASE]],
+            'tipo': ['nova' if n else 'alterada' for n in nova[aplicar]] + ['removida'] * int(removida.sum()),
+        })
+        linhas = release[aplicar]
+        if len(linhas) or removida.any():
+            mantidas = consolidado[~removida & ~consolidado[COLUNA_CHAVE].isin(linhas[COLUNA_CHAVE])]
+            consolidado = pd.concat([mantidas, linhas], ignore_index=True)
+        return consolidado, registro, int((~aplicar).sum())
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit("Uso: python jf_ingestao.py arquivo1.csv [arquivo2.csv ...]")
+    print(IngestaoJF().ingerir(sys.argv[1:]))
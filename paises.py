@@ -1,13 +1,20 @@
-import pandas as pd
 import streamlit as st
-import plotly.express as px
 
-dataset = pd.read_csv('https://www.irdx.com.br/media/uploads/paises.csv')
+import instrumentacao
+from paises_dados import REGIOES, figura_choropleth
 
-fig = px.choropleth(dataset,
-                    locations=dataset['iso3'],
-                    color=dataset['longitude'],
-                    hover_name=dataset['nome'])
-fig.update_layout(title='Mapa Coroplético dos Países',
-                  geo_scope='world')
+instrumentacao.iniciar("paises.py")
+
+# Região visível: define o recorte e o nível de simplificação da geometria local (ver paises_geometria.py)
+regiao = st.selectbox("Região", list(REGIOES))
+
+# Tabela local (paises.csv) e figura pré-serializada em .cache_paises/: sem rede após o primeiro snapshot
+with instrumentacao.secao("figura"):
+    try:
+        fig = figura_choropleth(regiao=regiao)
+    except FileNotFoundError as e:
+        st.error(str(e))
+        st.stop()
 st.plotly_chart(fig, use_container_width=True, theme="streamlit")
+
+instrumentacao.painel()
@@ -0,0 +1,160 @@
+"""
+Camada de dados local do mapa de países (paises.py).
+
+- paises.csv fica versionado ao lado do app (snapshot): o app não acessa a rede; o download remoto
+  só acontece quando pedido explicitamente (python paises_dados.py --atualizar).
+- A tabela é lida uma vez por processo e identificada pelo hash do conteúdo.
+- A especificação do mapa coroplético (JSON do Plotly) é gerada uma vez por versão da tabela, região
+  e nível de geometria, gravada em .cache_paises/ e servida do cache nas execuções seguintes.
+- Os contornos vêm da geometria local simplificada (paises_geometria.py), no nível adequado à região
+  visível; sem a geometria local (snapshot ausente ou inválido), cai no mapa embutido do Plotly.
+- Em memória fica o go.Figure (não o dict): st.plotly_chart não precisa remontar nem validar a figura.
+"""
+import hashlib
+import io
+from pathlib import Path
+import sys
+import urllib.request
+
+from inicializacao import pd
+
+URL_PAISES = 'https://www.irdx.com.br/media/uploads/paises.csv'
+ARQUIVO_PAISES = Path(__file__).with_name('paises.csv')
+PASTA_CACHE = Path(__file__).with_name('.cache_paises')
+
+# Região visível: ((lon_min, lon_max), (lat_min, lat_max)); None = mundo inteiro
+REGIOES = {
+    'Mundo': None,
+    'América do Sul': ((-82, -34), (-56, 13)),
+    'América do Norte': ((-170, -50), (7, 84)),
+    'Europa': ((-25, 45), (34, 72)),
+    'África': ((-20, 55), (-36, 38)),
+    'Ásia': ((25, 150), (-11, 78)),
+    'Oceania': ((110, 180), (-50, 0)),
+}
+
+REGIOES_MUNDO = ((-180, 180), (-90, 90))
+
+# Memória do processo: hash do CSV -> DataFrame; (pasta, chave da figura) -> go.Figure
+_TABELAS = {}
+_FIGURAS = {}
+
+
+def atualizar_snapshot(url=URL_PAISES, destino=ARQUIVO_PAISES, timeout=30):
+    """Baixa a tabela remota e substitui o snapshot local (validando que o CSV é legível antes de gravar)."""
+    with urllib.request.urlopen(url, timeout=timeout) as resposta:
+        conteudo = resposta.read()
+    pd.read_csv(io.BytesIO(conteudo))
+    temporario = Path(destino).with_suffix('.tmp')
+    temporario.write_bytes(conteudo)
+    temporario.replace(destino)
+    return destino
+
+
+def _conteudo_local(caminho=ARQUIVO_PAISES):
+    """Conteúdo do snapshot local (versionado junto com o app; nunca baixado durante a execução)."""
+    caminho = Path(caminho)
+    if not caminho.exists():
+        raise FileNotFoundError(f"Snapshot {caminho.name} não encontrado: gere com "
+                                "'python paises_dados.py --atualizar'")
+    return caminho.read_bytes()
+
+
+def _hash_local(caminho=ARQUIVO_PAISES):
+    conteudo = _conteudo_local(caminho)
+    return hashlib.sha256(conteudo).hexdigest()[:16], conteudo
+
+
+def carregar_paises(caminho=ARQUIVO_PAISES):
+    """Retorna (hash do conteúdo, DataFrame). Releitura do CSV só quando o conteúdo muda."""
+    hash_conteudo, conteudo = _hash_local(caminho)
+    if hash_conteudo not in _TABELAS:
+        _TABELAS[hash_conteudo] = pd.read_csv(io.BytesIO(conteudo))
+    return hash_conteudo, _TABELAS[hash_conteudo]
+
+
+def _construir_figura(dataset, geojson=None, regiao=None):
+    import plotly.express as px
+
+    if geojson is None:
+        fig = px.choropleth(dataset,
+                            locations=dataset['iso3'],
+                            color=dataset['longitude'],
+                            hover_name=dataset['nome'])
+    else:
+        # Geometria local: sem camadas de fundo (o template liga terra e lagos), senão o contorno grosseiro
+        # do mapa embutido aparece por baixo dos contornos locais
+        fig = px.choropleth(dataset,
+                            geojson=geojson,
+                            featureidkey='id',
+                            locations=dataset['iso3'],
+                            color=dataset['longitude'],
+                            hover_name=dataset['nome'])
+        fig.update_geos(visible=False, showland=False, showlakes=False, showframe=False)
+        if regiao is None:
+            # Com geojson o plotly.js centra pelos contornos, que cruzam o antimeridiano (Rússia, Fiji)
+            regiao = REGIOES_MUNDO
+    fig.update_layout(title='Mapa Coroplético dos Países',
+                      geo_scope='world')
+    if regiao is not None:
+        fig.update_geos(lonaxis_range=list(regiao[0]), lataxis_range=list(regiao[1]))
+    return fig
+
+
+def _figura_em_cache(chave, pasta_cache, construir):
+    """go.Figure da chave: memória do processo -> JSON em pasta_cache -> construir() (gravado em disco)."""
+    import plotly.io as pio
+
+    chave_memoria = (str(pasta_cache), chave)
+    if chave_memoria in _FIGURAS:
+        return _FIGURAS[chave_memoria]
+    arquivo_figura = Path(pasta_cache) / f'choropleth_{chave}.json'
+    if arquivo_figura.exists():
+        fig = pio.from_json(arquivo_figura.read_text(encoding='utf-8'))
+    else:
+        fig = construir()
+        arquivo_figura.parent.mkdir(parents=True, exist_ok=True)
+        temporario = arquivo_figura.with_suffix('.tmp')
+        temporario.write_text(fig.to_json(), encoding='utf-8')
+        temporario.replace(arquivo_figura)
+    _FIGURAS[chave_memoria] = fig
+    return fig
+
+
+def figura_choropleth(caminho=ARQUIVO_PAISES, pasta_cache=PASTA_CACHE, regiao='Mundo', largura_px=1200):
+    """
+    go.Figure do mapa coroplético, pronta para st.plotly_chart (o mesmo objeto entre reexecuções: com um
+    dict, o Streamlit remontaria e validaria a figura a cada rerun).
+    - regiao: chave de REGIOES; define o recorte do mapa e, com largura_px, o nível de simplificação.
+    - Memória do processo -> arquivo em .cache_paises/ -> construção com plotly.express (só na primeira vez).
+    - Sem a geometria local (snapshot ausente ou inválido), usa o contorno embutido do Plotly.
+    """
+    import paises_geometria
+
+    hash_conteudo, _ = _hash_local(caminho)
+    limites = REGIOES[regiao]
+    nivel = paises_geometria.escolher_nivel(360.0 if limites is None else limites[0][1] - limites[0][0], largura_px)
+    def construir_local():
+        dataset = carregar_paises(caminho)[1]
+        return _construir_figura(dataset, paises_geometria.geojson_nivel(nivel, iso3=dataset['iso3'], regiao=limites),
+                                 limites)
+
+    try:
+        chave = _chave(hash_conteudo, f'{paises_geometria.hash_geometria()}_{nivel}', regiao)
+        return _figura_em_cache(chave, pasta_cache, construir_local)
+    except (OSError, ValueError):
+        # Geometria indisponível (paises_geometria repete a falha sem refazer o pré-cálculo por alguns minutos)
+        return _figura_em_cache(_chave(hash_conteudo, 'embutida', regiao), pasta_cache,
+                                lambda: _construir_figura(carregar_paises(caminho)[1], None, limites))
+
+
+def _chave(hash_conteudo, geometria, regiao):
+    return hashlib.sha256(f'{hash_conteudo}|{geometria}|{regiao}'.encode()).hexdigest()[:16]
+
+
+if __name__ == '__main__':
+    if '--atualizar' in sys.argv:
+        print(f'Snapshot atualizado: {atualizar_snapshot()}')
+    hash_conteudo, dataset = carregar_paises()
+    figura_choropleth()
+    print(f'{len(dataset)} países (hash {hash_conteudo}); figura em {PASTA_CACHE}')
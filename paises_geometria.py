@@ -0,0 +1,469 @@
+"""
+Geometria local dos países para o mapa coroplético (paises.py), em níveis de simplificação pré-calculados.
+
+- Fonte: Natural Earth admin 0, escala 1:110m (176 países), versionada ao lado do app como
+  paises_geometria.geojson. O snapshot é a redistribuição do geopandas (naturalearth_lowres: mesma
+  geometria, só nome/continente/ISO3, códigos -99 de França e Noruega corrigidos). O app nunca baixa
+  a fonte: python paises_geometria.py --atualizar troca o snapshot pelo arquivo oficial de URL_GEOMETRIA;
+  sem snapshot, o mapa usa o contorno embutido do Plotly. Código ISO3 em PROPRIEDADES_ISO3.
+- Topologia no estilo TopoJSON: coordenadas quantizadas numa grade fina, anéis cortados nos pontos de
+  junção entre países e cada arco guardado uma única vez (fronteiras compartilhadas não se repetem).
+- Cada nível simplifica os arcos com Douglas-Peucker (tolerância em graus), requantiza numa grade de
+  metade da tolerância e grava os arcos em deltas inteiros (.cache_paises/geometria_<nível>_<hash>.json).
+  Como a fronteira é um arco só, os vizinhos continuam encaixados depois da simplificação.
+- Ilhas e países pequenos que sumiriam num nível grosso mantêm o maior anel sem simplificação e na grade
+  base (arcos listados em 'arcs_base', com 'transform_base'): Luxemburgo, Gâmbia, Brunei etc. aparecem em
+  todo nível. Microestados (Mônaco, Vaticano) não existem na escala 1:110m e ficam sem contorno.
+- escolher_nivel(): nível mais grosso cujo erro fica abaixo de 1 pixel para a extensão visível e a largura
+  do gráfico; geojson_nivel(): GeoJSON (só os países pedidos e que cruzam a região) para o Plotly.
+
+Benchmark por nível (arcos, pontos, bytes do TopoJSON, do GeoJSON e da figura, tempo de montagem e,
+com kaleido instalado, tempo de renderização do plotly.js): python paises_geometria.py [fonte.geojson]
+
+Medido com o snapshot versionado (450 KB de GeoJSON, 594 arcos, pré-cálculo 0,8 s), figura do mundo inteiro:
+    nível   tolerância  pontos  TopoJSON  figura (gzip)     renderização kaleido
+    baixo   0,25°       4.489   49 KB     96 KB (25 KB)     ~370 ms
+    medio   0,05°       7.576   79 KB     163 KB (47 KB)    ~290 ms
+    alto    0,01°       8.092   93 KB     186 KB (57 KB)    ~410 ms
+"""
+import hashlib
+import json
+from pathlib import Path
+import sys
+import time
+import urllib.request
+
+from inicializacao import np
+
+URL_GEOMETRIA = ('https://raw.githubusercontent.com/nvkelso/natural-earth-vector/master/geojson/'
+                 'ne_110m_admin_0_countries.geojson')
+ARQUIVO_GEOMETRIA = Path(__file__).with_name('paises_geometria.geojson')
+PASTA_CACHE = Path(__file__).with_name('.cache_paises')
+
+PROPRIEDADES_ISO3 = ('ISO_A3_EH', 'ISO_A3', 'ADM0_A3', 'iso_a3', 'adm0_a3', 'id')
+QUANTIZACAO_BASE = 1e-5          # graus (~1 m): grade em que a topologia é montada
+NIVEIS = {'baixo': 0.25, 'medio': 0.05, 'alto': 0.01}   # tolerância de simplificação em graus
+LARGURA_PADRAO_PX = 1200
+VERSAO_GEOMETRIA = 2
+TTL_FALHA_S = 300                # fonte inválida: nova tentativa de pré-cálculo só depois deste prazo
+
+# Memória do processo: (caminho, mtime, tamanho) -> (hash, bytes); hash da fonte -> (instante, erro) da
+# última falha no pré-cálculo; (hash da fonte, nível) -> TopoJSON / GeoJSON
+_FONTES = {}
+_FALHAS = {}
+_TOPOLOGIAS = {}
+_GEOJSONS = {}
+
+
+# --- 1. FONTE ---
+
+def atualizar_snapshot(url=URL_GEOMETRIA, destino=ARQUIVO_GEOMETRIA, timeout=60):
+    """Baixa o GeoJSON de países e substitui o snapshot local (validando o JSON antes de gravar)."""
+    with urllib.request.urlopen(url, timeout=timeout) as resposta:
+        conteudo = resposta.read()
+    if json.loads(conteudo).get('type') != 'FeatureCollection':
+        raise ValueError(f"{url} não é um GeoJSON FeatureCollection")
+    temporario = Path(destino).with_suffix('.tmp')
+    temporario.write_bytes(conteudo)
+    temporario.replace(destino)
+    return destino
+
+
+def _fonte(caminho=ARQUIVO_GEOMETRIA):
+    """
+    (hash, bytes) do GeoJSON de origem; FileNotFoundError se o snapshot não existir (nada é baixado aqui).
+    - O arquivo tem alguns MB: só é relido e re-hasheado quando muda a data de modificação ou o tamanho.
+    """
+    caminho = Path(caminho)
+    if not caminho.exists():
+        raise FileNotFoundError(f"Geometria {caminho.name} não encontrada: gere com "
+                                "'python paises_geometria.py --atualizar'")
+    estado = caminho.stat()
+    chave = (str(caminho.resolve()), estado.st_mtime_ns, estado.st_size)
+    if chave not in _FONTES:
+        conteudo = caminho.read_bytes()
+        _FONTES[chave] = hashlib.sha256(conteudo).hexdigest()[:16], conteudo
+    return _FONTES[chave]
+
+
+def hash_geometria(caminho=ARQUIVO_GEOMETRIA):
+    """Hash do GeoJSON de origem (entra na chave de cache das figuras que usam a geometria local)."""
+    return _fonte(caminho)[0]
+
+
+def _iso3(propriedades, feature):
+    for chave in PROPRIEDADES_ISO3:
+        valor = propriedades.get(chave) or (feature.get(chave) if chave == 'id' else None)
+        if isinstance(valor, str) and len(valor) == 3 and valor != '-99':
+            return valor.upper()
+    return None
+
+
+def _poligonos(geometria):
+    if geometria is None:
+        return []
+    if geometria['type'] == 'Polygon':
+        return [geometria['coordinates']]
+    if geometria['type'] == 'MultiPolygon':
+        return geometria['coordinates']
+    return []
+
+
+def _anel_quantizado(anel):
+    """Anel como tupla de pontos inteiros na grade base, sem repetição consecutiva nem ponto de fechamento."""
+    pontos = np.rint(np.asarray(anel, dtype=np.float64)[:, :2] / QUANTIZACAO_BASE).astype(np.int64)
+    resultado = []
+    for x, y in pontos.tolist():
+        if not resultado or resultado[-1] != (x, y):
+            resultado.append((x, y))
+    if len(resultado) > 1 and resultado[0] == resultado[-1]:
+        resultado.pop()
+    return resultado
+
+
+# --- 2. TOPOLOGIA (junções e arcos compartilhados) ---
+
+def _juncoes(aneis):
+    """Pontos em que os vizinhos diferem entre ocorrências: onde uma fronteira compartilhada começa ou termina."""
+    vizinhos = {}
+    juncoes = set()
+    for anel in aneis:
+        n = len(anel)
+        for i, ponto in enumerate(anel):
+            par = frozenset((anel[i - 1], anel[(i + 1) % n]))
+            anterior = vizinhos.setdefault(ponto, par)
+            if anterior != par:
+                juncoes.add(ponto)
+    return juncoes
+
+
+def _cortar(anel, juncoes):
+    """Arcos de um anel: de junção a junção; sem junções, o anel inteiro começando no menor ponto."""
+    cortes = [i for i, ponto in enumerate(anel) if ponto in juncoes]
+    if not cortes:
+        inicio = anel.index(min(anel))
+        girado = anel[inicio:] + anel[:inicio]
+        return [girado + [girado[0]]]
+    girado = anel[cortes[0]:] + anel[:cortes[0]]
+    girado.append(girado[0])
+    posicoes = [i - cortes[0] for i in cortes] + [len(anel)]
+    return [girado[a:b + 1] for a, b in zip(posicoes, posicoes[1:])]
+
+
+def montar_topologia(geojson):
+    """
+    Países -> (arcos, objetos): arcos únicos em pontos da grade base; objetos[iso3] é uma lista de polígonos,
+    cada polígono uma lista de anéis, cada anel uma lista de índices de arco (~i = arco i invertido).
+    """
+    paises = {}
+    for feature in geojson['features']:
+        iso3 = _iso3(feature.get('properties') or {}, feature)
+        if iso3 is None:
+            continue
+        for poligono in _poligonos(feature.get('geometry')):
+            aneis = [anel for anel in map(_anel_quantizado, poligono) if len(anel) >= 3]
+            if aneis:
+                paises.setdefault(iso3, []).append(aneis)
+
+    juncoes = _juncoes(anel for poligonos in paises.values() for poligono in poligonos for anel in poligono)
+    arcos, indices = [], {}
+    objetos = {}
+    for iso3, poligonos in paises.items():
+        objetos[iso3] = []
+        for poligono in poligonos:
+            aneis_arcos = []
+            for anel in poligono:
+                referencias = []
+                for arco in _cortar(anel, juncoes):
+                    chave = tuple(arco)
+                    if chave in indices:
+                        referencias.append(indices[chave])
+                    elif chave[::-1] in indices:
+                        referencias.append(~indices[chave[::-1]])
+                    else:
+                        indices[chave] = len(arcos)
+                        arcos.append(np.asarray(arco, dtype=np.int64))
+                        referencias.append(indices[chave])
+                aneis_arcos.append(referencias)
+            objetos[iso3].append(aneis_arcos)
+    return arcos, objetos
+
+
+# --- 3. SIMPLIFICAÇÃO E CODIFICAÇÃO POR NÍVEL ---
+
+def douglas_peucker(pontos, tolerancia):
+    """Índices mantidos por Douglas-Peucker (extremos sempre mantidos; arcos fechados usam o ponto mais distante)."""
+    n = len(pontos)
+    if n <= 2 or tolerancia <= 0:
+        return np.arange(n)
+    pontos = pontos.astype(np.float64)
+    manter = np.zeros(n, dtype=bool)
+    manter[0] = manter[-1] = True
+    pilha = [(0, n - 1)]
+    while pilha:
+        a, b = pilha.pop()
+        if b - a < 2:
+            continue
+        trecho = pontos[a + 1:b]
+        origem, direcao = pontos[a], pontos[b] - pontos[a]
+        comprimento = np.hypot(*direcao)
+        if comprimento == 0:
+            distancias = np.hypot(*(trecho - origem).T)
+        else:
+            relativo = trecho - origem
+            distancias = np.abs(direcao[0] * relativo[:, 1] - direcao[1] * relativo[:, 0]) / comprimento
+        i = int(np.argmax(distancias))
+        if distancias[i] > tolerancia or (comprimento == 0 and a == 0 and b == n - 1):
+            manter[a + 1 + i] = True
+            pilha.extend(((a, a + 1 + i), (a + 1 + i, b)))
+    return np.flatnonzero(manter)
+
+
+def _requantizar(pontos, fator):
+    """Pontos da grade base na grade do nível (fator = passo do nível / passo base), sem repetições consecutivas."""
+    grade = np.rint(pontos / fator).astype(np.int64)
+    if len(grade) > 2:
+        repetido = np.r_[False, (grade[1:] == grade[:-1]).all(axis=1)]
+        repetido[-1] = False
+        grade = grade[~repetido]
+    return grade
+
+
+def _pontos_anel(referencias, arcos):
+    pontos = []
+    for referencia in referencias:
+        arco = arcos[referencia] if referencia >= 0 else arcos[~referencia][::-1]
+        pontos.extend(map(tuple, arco[1:] if pontos else arco))
+    return pontos
+
+
+def _anel_valido(referencias, arcos):
+    return len(set(_pontos_anel(referencias, arcos))) >= 3
+
+
+def simplificar_nivel(arcos, objetos, tolerancia):
+    """
+    TopoJSON (dict) do nível: arcos simplificados, requantizados em passo = tolerância/2 e codificados em deltas.
+    Polígonos cujo anel externo degenera somem; país que sumiria inteiro mantém o maior anel sem simplificação
+    nem requantização (arcos em 'arcs_base', deltas na grade base): na grade do nível (0,125° no nível baixo)
+    um país menor que o passo viraria um ponto.
+    """
+    passo = tolerancia / 2
+    fator = passo / QUANTIZACAO_BASE
+    tolerancia_base = tolerancia / QUANTIZACAO_BASE
+
+    simplificados = [_requantizar(arco[douglas_peucker(arco, tolerancia_base)], fator) for arco in arcos]
+    preservados = set()
+    for poligonos in objetos.values():
+        if not any(_anel_valido(poligono[0], simplificados) for poligono in poligonos):
+            maior = max(poligonos, key=lambda p: sum(len(arcos[r if r >= 0 else ~r]) for r in p[0]))
+            preservados.update(r if r >= 0 else ~r for r in maior[0])
+    for indice in preservados:
+        simplificados[indice] = arcos[indice]
+
+    geometrias = []
+    for iso3, poligonos in objetos.items():
+        validos = []
+        for poligono in poligonos:
+            if _anel_valido(poligono[0], simplificados):
+                validos.append([anel for anel in poligono if _anel_valido(anel, simplificados)])
+        if validos:
+            geometrias.append({'type': 'MultiPolygon', 'id': iso3, 'arcs': validos})
+
+    origem = np.rint(np.array([-180.0, -90.0]) / passo).astype(np.int64)
+    origem_base = np.rint(np.array([-180.0, -90.0]) / QUANTIZACAO_BASE).astype(np.int64)
+    arcos_delta = []
+    for indice, arco in enumerate(simplificados):
+        relativo = arco - (origem_base if indice in preservados else origem)
+        arcos_delta.append(np.vstack([relativo[:1], np.diff(relativo, axis=0)]).tolist())
+    return {
+        'type': 'Topology',
+        'transform': {'scale': [passo, passo], 'translate': (origem * passo).tolist()},
+        'transform_base': {'scale': [QUANTIZACAO_BASE, QUANTIZACAO_BASE],
+                           'translate': (origem_base * QUANTIZACAO_BASE).tolist()},
+        'arcs_base': sorted(preservados),
+        'objects': {'paises': {'type': 'GeometryCollection', 'geometries': geometrias}},
+        'arcs': arcos_delta,
+    }
+
+
+def topologia_nivel(nivel, caminho=ARQUIVO_GEOMETRIA, pasta_cache=PASTA_CACHE):
+    """
+    TopoJSON do nível: memória do processo -> .cache_paises/ -> pré-cálculo (todos os níveis de uma vez).
+    - Falha no pré-cálculo (fonte que não é GeoJSON válido, disco): a mesma exceção é repetida sem refazer
+      o trabalho por TTL_FALHA_S segundos; depois disso, nova tentativa.
+    """
+    hash_fonte, conteudo = _fonte(caminho)
+    chave = (hash_fonte, nivel)
+    if chave in _TOPOLOGIAS:
+        return _TOPOLOGIAS[chave]
+    arquivo = Path(pasta_cache) / f'geometria_v{VERSAO_GEOMETRIA}_{nivel}_{hash_fonte}.json'
+    if not arquivo.exists():
+        falha = _FALHAS.get(hash_fonte)
+        if falha and time.monotonic() - falha[0] < TTL_FALHA_S:
+            raise falha[1]
+        try:
+            precalcular(caminho, pasta_cache, conteudo)
+        except (OSError, ValueError) as erro:
+            _FALHAS[hash_fonte] = (time.monotonic(), erro)
+            raise
+        _FALHAS.pop(hash_fonte, None)
+    _TOPOLOGIAS[chave] = json.loads(arquivo.read_text(encoding='utf-8'))
+    return _TOPOLOGIAS[chave]
+
+
+def precalcular(caminho=ARQUIVO_GEOMETRIA, pasta_cache=PASTA_CACHE, conteudo=None):
+    """Monta a topologia uma vez e grava todos os níveis; retorna {nível: arquivo}."""
+    hash_fonte, conteudo = (hashlib.sha256(conteudo).hexdigest()[:16], conteudo) if conteudo else _fonte(caminho)
+    geojson = json.loads(conteudo)
+    if not isinstance(geojson, dict) or geojson.get('type') != 'FeatureCollection':
+        raise ValueError("A fonte da geometria não é um GeoJSON FeatureCollection")
+    arcos, objetos = montar_topologia(geojson)
+    pasta = Path(pasta_cache)
+    pasta.mkdir(parents=True, exist_ok=True)
+    arquivos = {}
+    for nivel, tolerancia in NIVEIS.items():
+        arquivo = pasta / f'geometria_v{VERSAO_GEOMETRIA}_{nivel}_{hash_fonte}.json'
+        temporario = arquivo.with_suffix('.tmp')
+        temporario.write_text(json.dumps(simplificar_nivel(arcos, objetos, tolerancia), separators=(',', ':')),
+                              encoding='utf-8')
+        temporario.replace(arquivo)
+        arquivos[nivel] = arquivo
+    return arquivos
+
+
+# --- 4. NÍVEL POR REGIÃO VISÍVEL E GEOJSON PARA O PLOTLY ---
+
+def escolher_nivel(extensao_lon=360.0, largura_px=LARGURA_PADRAO_PX):
+    """Nível mais grosso cuja tolerância não passa de 1 pixel (graus por pixel da região visível)."""
+    graus_por_px = extensao_lon / max(largura_px, 1)
+    adequados = [nivel for nivel, tolerancia in NIVEIS.items() if tolerancia <= graus_por_px]
+    if adequados:
+        return max(adequados, key=NIVEIS.get)
+    return min(NIVEIS, key=NIVEIS.get)
+
+
+def _decodificar(topologia):
+    """TopoJSON do nível -> GeoJSON completo (coordenadas arredondadas à precisão do nível), com bbox por país."""
+    base = set(topologia['arcs_base'])
+    arcos = []
+    for indice, delta in enumerate(topologia['arcs']):
+        transformacao = topologia['transform_base' if indice in base else 'transform']
+        (sx, sy), (tx, ty) = transformacao['scale'], transformacao['translate']
+        absoluto = np.cumsum(np.asarray(delta, dtype=np.int64), axis=0)
+        arcos.append(np.round(absoluto * [sx, sy] + [tx, ty], max(0, int(np.ceil(-np.log10(sx))))))
+
+    def anel(referencias):
+        partes = [arcos[r] if r >= 0 else arcos[~r][::-1] for r in referencias]
+        pontos = np.vstack([partes[0]] + [p[1:] for p in partes[1:]])
+        return pontos
+
+    features = []
+    for geometria in topologia['objects']['paises']['geometries']:
+        poligonos = [[anel(referencias) for referencias in poligono] for poligono in geometria['arcs']]
+        externos = np.vstack([poligono[0] for poligono in poligonos])
+        features.append({
+            'type': 'Feature',
+            'id': geometria['id'],
+            'properties': {},
+            'bbox': [*externos.min(axis=0).tolist(), *externos.max(axis=0).tolist()],
+            'geometry': {'type': 'MultiPolygon',
+                         'coordinates': [[a.tolist() for a in poligono] for poligono in poligonos]},
+        })
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+def _cruza(bbox, regiao):
+    if regiao is None:
+        return True
+    (lon_min, lon_max), (lat_min, lat_max) = regiao
+    return bbox[0] <= lon_max and bbox[2] >= lon_min and bbox[1] <= lat_max and bbox[3] >= lat_min
+
+
+def geojson_nivel(nivel, iso3=None, regiao=None, caminho=ARQUIVO_GEOMETRIA, pasta_cache=PASTA_CACHE):
+    """
+    GeoJSON do nível para go.Choropleth(geojson=..., featureidkey='id').
+    - iso3: só estes países (os que têm dado no mapa); regiao: ((lon_min, lon_max), (lat_min, lat_max)),
+      só os países que cruzam a região visível.
+    """
+    hash_fonte, _ = _fonte(caminho)
+    chave = (hash_fonte, nivel)
+    if chave not in _GEOJSONS:
+        _GEOJSONS[chave] = _decodificar(topologia_nivel(nivel, caminho, pasta_cache))
+    codigos = set(iso3) if iso3 is not None else None
+    features = [
+        {k: v for k, v in feature.items() if k != 'bbox'}
+        for feature in _GEOJSONS[chave]['features']
+        if (codigos is None or feature['id'] in codigos) and _cruza(feature['bbox'], regiao)
+    ]
+    return {'type': 'FeatureCollection', 'features': features}
+
+
+# --- 5. BENCHMARK ---
+
+def _renderizador():
+    """Função figura -> PNG usando o plotly.js local (kaleido); None se o kaleido não estiver instalado."""
+    try:
+        from kaleido.scopes.plotly import PlotlyScope  # kaleido 0.2.x (Chromium embutido)
+    except ImportError:
+        try:
+            import kaleido  # noqa: F401  (kaleido >= 1 usa o Chrome instalado)
+            import plotly.io as pio
+        except ImportError:
+            return None
+        return lambda figura: pio.to_image(figura, format='png')
+    import plotly
+    plotly_js = Path(plotly.__file__).parent / 'package_data' / 'plotly.min.js'
+    escopo = PlotlyScope(plotlyjs=str(plotly_js), mathjax=False)
+    return lambda figura: escopo.transform(figura, format='png')
+
+
+def benchmark(caminho=ARQUIVO_GEOMETRIA, renderizar=True):
+    """Por nível: tamanho da geometria e da figura (com e sem gzip), tempo de montagem e de renderização."""
+    import gzip
+    from inicializacao import pd
+    from paises_dados import _construir_figura
+
+    hash_fonte, conteudo = _fonte(caminho)
+    inicio = time.perf_counter()
+    precalcular(caminho, conteudo=conteudo)
+    precalculo = time.perf_counter() - inicio
+    renderizador = _renderizador() if renderizar else None
+    iso3 = [f['id'] for f in geojson_nivel(min(NIVEIS, key=NIVEIS.get), caminho=caminho)['features']]
+    dataset = pd.DataFrame({'iso3': iso3, 'nome': iso3, 'longitude': np.linspace(-180, 180, len(iso3))})
+    linhas = []
+    for nivel in NIVEIS:
+        topologia = topologia_nivel(nivel, caminho)
+        inicio = time.perf_counter()
+        figura = _construir_figura(dataset, geojson_nivel(nivel, iso3=iso3, caminho=caminho))
+        montagem = time.perf_counter() - inicio
+        figura_json = figura.to_json().encode()
+        linha = {
+            'nivel': nivel,
+            'tolerancia_graus': NIVEIS[nivel],
+            'arcos': len(topologia['arcs']),
+            'pontos': sum(len(arco) for arco in topologia['arcs']),
+            'topojson_kb': round(len(json.dumps(topologia, separators=(',', ':'))) / 1024, 1),
+            'figura_kb': round(len(figura_json) / 1024, 1),
+            'figura_gzip_kb': round(len(gzip.compress(figura_json)) / 1024, 1),
+            'montagem_ms': round(montagem * 1e3, 1),
+        }
+        if renderizador:
+            renderizador(figura)  # aquecimento
+            inicio = time.perf_counter()
+            renderizador(figura)
+            linha['renderizacao_ms'] = round((time.perf_counter() - inicio) * 1e3, 1)
+        linhas.append(linha)
+    return {'fonte_kb': round(len(conteudo) / 1024, 1), 'paises': len(iso3),
+            'precalculo_s': round(precalculo, 2), 'hash': hash_fonte}, linhas
+
+
+if __name__ == '__main__':
+    argumentos = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if '--atualizar' in sys.argv:
+        print(f'Snapshot atualizado: {atualizar_snapshot()}')
+    resumo, linhas = benchmark(argumentos[0] if argumentos else ARQUIVO_GEOMETRIA,
+                               renderizar='--sem-renderizar' not in sys.argv)
+    print(resumo)
+    for linha in linhas:
+        print(linha)
@@ -0,0 +1,199 @@
+"""
+Cálculos rescisórios (CLT) usados pela calculadora A2.py.
+
+- Funções escalares: um empregado por chamada (usadas na interface Streamlit).
+- Funções em lote: colunas inteiras (folhas com centenas de milhares de linhas),
+  calculadas com arrays NumPy e devolvidas em um DataFrame.
+- Linha de comando: python rescisao.py entrada.csv saida.csv
+"""
+import argparse
+import sys
+import time
+
+from dateutil.relativedelta import relativedelta
+
+from datas_vetorizadas import anos_completos, meses_proporcionais
+from inicializacao import np, pd
+from tabelas_impostos import INSS, IRRF
+
+# --- 1. TABELAS DE IMPOSTOS (registro por vigência em tabelas_impostos.py) ---
+
+def get_inss_aliquota_e_deducao(salario_base, data_referencia=None):
+    # Tabela INSS Progressiva vigente na data de referência (2022 / 2023 / 2024 / 2025)
+    # data_referencia=None usa a tabela mais recente (2025: 1.518,00 | 2.793,88 | 4.190,83 | 8.157,41)
+    return INSS.calcular(salario_base, data_referencia)
+
+
+def get_irrf_aliquota_e_deducao(base_ir, data_referencia=None):
+    # Tabela IRRF mensal vigente na data de referência (inclui a mudança de maio/2025)
+    return IRRF.calcular(base_ir, data_referencia)
+
+# --- 2. FUNÇÕES DE CÁLCULO (Lógica Trabalhista) ---
+
+def calcular_meses_proporcionais(admissao, demissao):
+    """
+    Calcula os meses proporcionais para 13º e Férias:
+    - Regra prática adotada: fracionamento de 15 dias ou mais conta como mês completo.
+    - Implementação via relativedelta para obter meses completos entre as datas.
+    """
+    if demissao <= admissao:
+        return 0, 0
+
+    diferenca = relativedelta(demissao.replace(day=1), admissao.replace(day=1))
+    total_meses = diferenca.years * 12 + diferenca.months + 1
+
+    if demissao.day < 15 and diferenca.months > 0:
+          total_meses -= 1
+
+    return total_meses, total_meses
+
+
+def calcular_aviso_previo_indenizado(admissao, demissao, salario_base):
+    """
+    Aviso Prévio Indenizado:
+    - Base legal: CLT art. 487 + Lei 12.506/2011 (acréscimo de 3 dias por ano completo, até 60 dias adicionais)
+    - Dias = 30 dias + min(anos_completos*3, 60)
+    """
+    tempo_servico = relativedelta(demissao, admissao)
+    anos_trabalhados = tempo_servico.years
+
+    dias_ap = 30
+    dias_adicionais = min(anos_trabalhados * 3, 60)
+    dias_ap += dias_adicionais
+
+    valor_dia = salario_base / 30.0
+    valor_ap = valor_dia * dias_ap
+
+    return valor_ap, dias_ap
+
+def calcular_saldo_salario(salario_base, dias_trabalhados_no_mes):
+    """Saldo de Salário = (salário / 30) * dias trabalhados (CLT - prática adotada)"""
+    valor_dia = salario_base / 30.0
+    saldo = valor_dia * dias_trabalhados_no_mes
+    return saldo
+
+# --- 3. CÁLCULO EM LOTE (arrays NumPy) ---
+
+# Colunas esperadas no CSV de entrada do lote
+COLUNAS_ENTRADA = ['salario_base', 'saldo_fgts', 'data_admissao', 'data_demissao', 'dias_trabalhados']
+
+
+def inss_lote(salario_base, datas_referencia=None):
+    """Versão vetorizada de get_inss_aliquota_e_deducao (mesmas operações, mesmo resultado)."""
+    return INSS.calcular_lote(salario_base, datas_referencia)
+
+
+def irrf_lote(base_ir, datas_referencia=None):
+    """Versão vetorizada de get_irrf_aliquota_e_deducao (mesmas operações, mesmo resultado)."""
+    return IRRF.calcular_lote(base_ir, datas_referencia)
+
+
+def _para_datetime64(coluna):
+    """Converte uma coluna (strings ISO, datetime64 ou date) em array datetime64[D]."""
+    return pd.to_datetime(pd.Series(coluna)).to_numpy(dtype='datetime64[D]')
+
+
+def calcular_rescisoes_lote(salario_base, saldo_fgts, data_admissao, data_demissao, dias_trabalhados):
+    """
+    Calcula todas as verbas rescisórias para colunas inteiras de empregados.
+    - Mesmas fórmulas e mesma ordem de operações da calculadora (A2.py): resultados idênticos ao caminho escalar.
+    - INSS e IRRF usam a tabela vigente na data de demissão de cada linha (lotes com anos misturados).
+    - Retorna um DataFrame com uma linha por empregado.
+    """
+    salario_base = np.asarray(salario_base, dtype=np.float64)
+    saldo_fgts = np.asarray(saldo_fgts, dtype=np.float64)
+    dias_trabalhados = np.asarray(dias_trabalhados, dtype=np.float64)
+    admissao_64 = _para_datetime64(data_admissao)
+    demissao_64 = _para_datetime64(data_demissao)
+    meses_prop = meses_proporcionais(admissao_64, demissao_64)
+    anos_trabalhados = anos_completos(admissao_64, demissao_64)
+
+    # Saldo de Salário
+    valor_saldo_salario = (salario_base / 30.0) * dias_trabalhados
+
+    # 13º e Férias Proporcionais (+1/3)
+    valor_13_proporcional = (salario_base / 12) * meses_prop
+    valor_ferias_prop_base = (salario_base / 12) * meses_prop
+    valor_ferias_prop_total = valor_ferias_prop_base + (valor_ferias_prop_base / 3)
+
+    # Aviso Prévio Indenizado
+    dias_ap = 30 + np.minimum(anos_trabalhados * 3, 60)
+    valor_ap = (salario_base / 30.0) * dias_ap
+
+    # Multa FGTS (40%)
+    valor_multa_fgts = saldo_fgts * 0.40
+
+    # Descontos
+    inss_principal = inss_lote(valor_saldo_salario, demissao_64)
+    inss_13 = inss_lote(valor_13_proporcional, demissao_64)
+    irrf_principal = irrf_lote((valor_saldo_salario + valor_ap) - inss_principal, demissao_64)
+    total_descontos = inss_principal + inss_13 + irrf_principal
+
+    # Totais
+    verbas_brutas_diretas = valor_saldo_salario + valor_ap + valor_13_proporcional + valor_ferias_prop_total
+    verbas_pagas_liquidas = verbas_brutas_diretas - total_descontos
+    total_liquido_simulado = verbas_pagas_liquidas + saldo_fgts + valor_multa_fgts
+
+    return pd.DataFrame({
+        'meses_proporcionais': meses_prop,
+        'dias_aviso_previo': dias_ap,
+        'saldo_salario': valor_saldo_salario,
+        'decimo_terceiro_prop': valor_13_proporcional,
+        'ferias_prop_terco': valor_ferias_prop_total,
+        'aviso_previo': valor_ap,
+        'multa_fgts': valor_multa_fgts,
+        'inss_saldo_salario': inss_principal,
+        'inss_13': inss_13,
+        'irrf': irrf_principal,
+        'total_descontos': total_descontos,
+        'verbas_brutas': verbas_brutas_diretas,
+        'verbas_liquidas': verbas_pagas_liquidas,
+        'total_receber': total_liquido_simulado,
+    })
+
+
+def calcular_rescisoes_df(df):
+    """Atalho para DataFrames com as colunas de COLUNAS_ENTRADA (ex.: CSV da folha). Mantém as colunas originais."""
+    faltando = [c for c in COLUNAS_ENTRADA if c not in df.columns]
+    if faltando:
+        raise ValueError(f"Colunas ausentes no arquivo: {', '.join(faltando)}")
+    resultado = calcular_rescisoes_lote(*(df[c] for c in COLUNAS_ENTRADA))
+    resultado.index = df.index
+    return pd.concat([df, resultado], axis=1)
+
+# --- 4. LINHAS DO EXTRATO (tabelas da calculadora e extratos exportados em lote) ---
+
+# (rótulo, coluna de calcular_rescisoes_lote, natureza / base legal)
+LINHAS_VERBAS = [
+    ('Saldo de Salário', 'saldo_salario', 'Tributável (CLT, Art. 462)'),
+    ('13º Salário Prop. (Avos)', 'decimo_terceiro_prop', 'Tributável (Lei 4.090/62)'),
+    ('Férias Proporcionais (+1/3)', 'ferias_prop_terco', 'Isenta (CLT, Art. 146)'),
+    ('Aviso Prévio', 'aviso_previo', 'Tributável para IRRF (CLT, Art. 487)'),
+    ('Multa FGTS (40%)', 'multa_fgts', 'Isenta (Lei 8.036/90)'),
+]
+
+# (rótulo, coluna de calcular_rescisoes_lote, base de cálculo, base legal)
+LINHAS_DESCONTOS = [
+    ('INSS (Saldo Salário)', 'inss_saldo_salario', 'SS', 'Lei 8.212/91, Art. 28 (AP isento: Súmula 449 TST)'),
+    ('INSS (13º Proporcional)', 'inss_13', '13º', 'Lei 8.212/91, Art. 28, § 7º'),
+    ('IRRF (Principal)', 'irrf', 'SS e AP (Após INSS)', 'Lei 7.713/88, Art. 7º'),
+]
+
+# --- 5. LINHA DE COMANDO ---
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Calcula as verbas rescisórias de uma folha inteira (CSV).")
+    parser.add_argument("entrada", help=f"CSV com as colunas: {', '.join(COLUNAS_ENTRADA)}")
+    parser.add_argument("saida", help="CSV de saída com as verbas calculadas")
+    parser.add_argument("--sep", default=",", help="Separador do CSV (padrão: ',')")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    df = pd.read_csv(args.entrada, sep=args.sep)
+    resultado = calcular_rescisoes_df(df)
+    resultado.to_csv(args.saida, sep=args.sep, index=False)
+    print(f"{len(resultado)} rescisões calculadas em {time.perf_counter() - inicio:.2f}s -> {args.saida}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
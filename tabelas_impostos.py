@@ -0,0 +1,190 @@
+"""
+Tabelas progressivas de INSS e IRRF por vigência (2022 em diante).
+
+- Cada tabela é registrada pela data de início de vigência (portarias do INSS / tabelas da Receita).
+- As tabelas são compiladas uma única vez, na importação, em arrays ordenados
+  (limites, alíquotas e parcelas a deduzir acumuladas).
+- Consulta escalar: busca binária (bisect) na vigência e na faixa.
+- Consulta em lote: searchsorted na vigência e comparação com a matriz de limites,
+  com o mesmo custo para lotes de um ou de vários anos.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import date
+from functools import cached_property
+
+from inicializacao import np
+
+# --- 1. REGISTRO DE TABELAS (início de vigência -> faixas) ---
+# Cada faixa: (limite superior da faixa em R$, alíquota, parcela a deduzir em R$)
+
+TABELAS_INSS = {
+    # Portaria Interministerial MTP/ME nº 12/2022
+    date(2022, 1, 1): [
+        (1212.00, 0.075, 0.00),
+        (2427.35, 0.09, 18.18),
+        (3641.03, 0.12, 91.00),
+        (7087.22, 0.14, 163.82),
+    ],
+    # Portaria Interministerial MPS/MF nº 26/2023 (salário mínimo de R$ 1.302,00)
+    date(2023, 1, 1): [
+        (1302.00, 0.075, 0.00),
+        (2571.29, 0.09, 19.53),
+        (3856.94, 0.12, 96.67),
+        (7507.49, 0.14, 173.81),
+    ],
+    # Reajuste do salário mínimo para R$ 1.320,00 (maio/2023)
+    date(2023, 5, 1): [
+        (1320.00, 0.075, 0.00),
+        (2571.29, 0.09, 19.80),
+        (3856.94, 0.12, 96.94),
+        (7507.49, 0.14, 174.08),
+    ],
+    date(2024, 1, 1): [
+        (1412.00, 0.075, 0.00),
+        (2666.68, 0.09, 21.18),
+        (4000.03, 0.12, 101.18),
+        (7786.02, 0.14, 181.18),
+    ],
+    date(2025, 1, 1): [
+        (1518.00, 0.075, 0.00),
+        (2793.88, 0.09, 22.77),
+        (4190.83, 0.12, 106.59),
+        (8157.41, 0.14, 190.40),
+    ],
+}
+
+TABELAS_IRRF = {
+    date(2022, 1, 1): [
+        (1903.98, 0.00, 0.00),
+        (2826.65, 0.075, 142.80),
+        (3751.05, 0.15, 354.80),
+        (4664.68, 0.225, 636.13),
+        (float('inf'), 0.275, 869.36),
+    ],
+    # Lei 14.663/2023
+    date(2023, 5, 1): [
+        (2112.00, 0.00, 0.00),
+        (2826.65, 0.075, 158.40),
+        (3751.05, 0.15, 370.40),
+        (4664.68, 0.225, 651.73),
+        (float('inf'), 0.275, 884.96),
+    ],
+    # Lei 14.848/2024
+    date(2024, 2, 1): [
+        (2259.20, 0.00, 0.00),
+        (2826.65, 0.075, 169.44),
+        (3751.05, 0.15, 381.44),
+        (4664.68, 0.225, 662.77),
+        (float('inf'), 0.275, 896.00),
+    ],
+    # MP 1.294/2025 (mudança de maio/2025)
+    date(2025, 5, 1): [
+        (2428.80, 0.00, 0.00),
+        (2826.65, 0.075, 182.16),
+        (3751.05, 0.15, 394.16),
+        (4664.68, 0.225, 675.49),
+        (float('inf'), 0.275, 908.73),
+    ],
+}
+
+# --- 2. COMPILAÇÃO (listas na importação; matrizes no primeiro cálculo em lote) ---
+
+class TabelaCompilada:
+    """
+    Registro de tabelas em forma de arrays:
+    - vigencias: datas de início (ordenadas), como lista de date e como datetime64[D]
+    - limites / aliquotas / deducoes: matrizes (tabela x faixa), completadas com +inf na última coluna
+    - tetos: base máxima de cálculo de cada tabela (teto do INSS; +inf no IRRF)
+    """
+
+    def __init__(self, tabelas, limitar_ao_teto):
+        self.vigencias = sorted(tabelas)
+        self.faixas = []
+        self._tetos = []
+        for vigencia in self.vigencias:
+            faixas = sorted(tabelas[vigencia])
+            limites = [limite for limite, _, _ in faixas]
+            self.faixas.append((limites, [aliquota for _, aliquota, _ in faixas], [deducao for _, _, deducao in faixas]))
+            self._tetos.append(limites[-1] if limitar_ao_teto else float('inf'))
+
+    # Matrizes do cálculo em lote: montadas no primeiro uso (o cálculo escalar usa só as listas)
+
+    @cached_property
+    def vigencias_64(self):
+        return np.array(self.vigencias, dtype='datetime64[D]')
+
+    @cached_property
+    def tetos(self):
+        return np.array(self._tetos)
+
+    @cached_property
+    def _matrizes(self):
+        """limites / aliquotas / deducoes (tabela x faixa); colunas de preenchimento repetem a última faixa real."""
+        n_faixas = max(len(limites) for limites, _, _ in self.faixas)
+        limites_m = np.full((len(self.vigencias), n_faixas), np.inf)
+        aliquotas_m = np.zeros((len(self.vigencias), n_faixas))
+        deducoes_m = np.zeros((len(self.vigencias), n_faixas))
+        for i, (limites, aliquotas, deducoes) in enumerate(self.faixas):
+            limites_m[i, :len(limites)] = limites
+            aliquotas_m[i] = aliquotas + [aliquotas[-1]] * (n_faixas - len(limites))
+            deducoes_m[i] = deducoes + [deducoes[-1]] * (n_faixas - len(limites))
+        return limites_m, aliquotas_m, deducoes_m
+
+    @property
+    def limites(self):
+        return self._matrizes[0]
+
+    @property
+    def aliquotas(self):
+        return self._matrizes[1]
+
+    @property
+    def deducoes(self):
+        return self._matrizes[2]
+
+    def indice_vigencia(self, data_referencia=None):
+        """Índice da tabela vigente na data (None = tabela mais recente; datas anteriores ao registro usam a primeira)."""
+        if data_referencia is None:
+            return len(self.vigencias) - 1
+        return max(bisect_right(self.vigencias, data_referencia) - 1, 0)
+
+    def indices_vigencia(self, datas_referencia):
+        """Versão em lote de indice_vigencia (array de datas -> array de índices)."""
+        datas = np.asarray(datas_referencia, dtype='datetime64[D]')
+        return np.maximum(np.searchsorted(self.vigencias_64, datas, side='right') - 1, 0)
+
+    def calcular(self, base, data_referencia=None):
+        """Imposto progressivo de uma base: base * alíquota da faixa - parcela a deduzir."""
+        if base <= 0:
+            return 0.0
+        t = self.indice_vigencia(data_referencia)
+        limites, aliquotas, deducoes = self.faixas[t]
+        base_calculo = min(base, self._tetos[t])
+        faixa = min(bisect_left(limites, base_calculo), len(limites) - 1)
+        return float((base_calculo * aliquotas[faixa]) - deducoes[faixa])
+
+    def calcular_lote(self, base, datas_referencia=None):
+        """Versão em lote de calcular (mesmas operações, mesmo resultado); aceita datas distintas por linha."""
+        base = np.asarray(base, dtype=np.float64)
+        if datas_referencia is None:
+            t = np.full(base.shape, len(self.vigencias) - 1)
+        else:
+            t = np.broadcast_to(self.indices_vigencia(datas_referencia), base.shape)
+        base_calculo = np.minimum(base, self.tetos[t])
+        # Equivale ao bisect_left: quantidade de limites estritamente menores que a base
+        faixa = (base_calculo[..., None] > self.limites[t]).sum(axis=-1)
+        faixa = np.minimum(faixa, self.limites.shape[1] - 1)
+        resultado = (base_calculo * self.aliquotas[t, faixa]) - self.deducoes[t, faixa]
+        return np.where(base <= 0, 0.0, resultado)
+
+    def tabela(self, data_referencia=None):
+        """Faixas (limite, alíquota, dedução) vigentes na data, para exibição."""
+        return list(zip(*self.faixas[self.indice_vigencia(data_referencia)]))
+
+    def vigencia(self, data_referencia=None):
+        """Data de início da tabela vigente na data."""
+        return self.vigencias[self.indice_vigencia(data_referencia)]
+
+
+INSS = TabelaCompilada(TABELAS_INSS, limitar_ao_teto=True)
+IRRF = TabelaCompilada(TABELAS_IRRF, limitar_ao_teto=False)
@@ -1,7 +1,9 @@
 import streamlit as st
-import requests
 import random
 
+import instrumentacao
+from clima import ClienteClima
+
 # ======================
 # Configurações da Página
 # ======================
@@ -10,6 +12,54 @@ st.set_page_config(
     page_icon="🌅",
     layout="centered"
 )
+# Tempos por seção (desligado por padrão; ver instrumentacao.py)
+instrumentacao.iniciar("teste.py")
+
+# Um cliente por processo (compartilhado entre sessões): pool de conexões, cache e coalescência
+@st.cache_resource
+def cliente_clima(chave_api):
+    return ClienteClima(chave_api)
+
+
+# ======================
+# Exibição do clima (usada na consulta única e no modo várias cidades)
+# ======================
+def exibir_clima(cidade, dados):
+    temp = dados["main"]["temp"]
+    umidade = dados["main"]["humidity"]
+    clima = dados["weather"][0]["description"].capitalize()
+    weather_desc = dados["weather"][0]["description"].lower()
+
+    # ===== Temperatura =====
+    st.subheader("🌡️ Temperatura")
+    st.success(f"A temperatura em **{cidade.title()}** é de **{temp}°C** e o clima está **{clima}**.")
+
+    # ===== Umidade =====
+    st.subheader("💧 Umidade do Ar")
+    st.success(f"A umidade do ar em **{cidade.title()}** é de **{umidade}%**.")
+
+    # ===== Sugestão de roupa =====
+    st.subheader("👕 Sugestão de Roupa")
+    if temp < 15:
+        sugest = "🧥 Está bem frio — use um casaco pesado e, se possível, cachecol e luvas!"
+    elif 15 <= temp <= 25:
+        sugest = "👕 Temperatura amena — roupas leves com um agasalho à mão."
+    else:
+        sugest = "🩳 Está quente — prefira roupas leves e se hidrate bastante!"
+
+    if "chuva" in weather_desc:
+        sugest += " ☔ E não esqueça o guarda-chuva!"
+
+    st.info(sugest)
+
+
+# Várias cidades: consulta assíncrona, só quando pedida pelo botão (o conteúdo do expander roda a cada rerun);
+# o cache do cliente reaproveita as respostas válidas (10 minutos) e o último resultado fica na sessão
+def clima_varias_cidades(cidades, chave_api):
+    with st.spinner("Consultando o clima das cidades..."):
+        resultados = cliente_clima(chave_api).consultar_varias(cidades)
+    return [(r.cidade, r.status, r.dados, r.erro) for r in resultados]
+
 
 st.title("Assistente Matinal 🌞")
 st.write("Bem-vindo! Digite seu nome abaixo para começar o dia com boas energias! 💫")
@@ -42,37 +92,11 @@ if nome:
     # ======================
     if OPENWEATHER_KEY and cidade.strip():
         try:
-            url = f"https://api.openweathermap.org/data/2.5/weather?q={cidade}&units=metric&lang=pt_br&appid={OPENWEATHER_KEY}"
-            resposta = requests.get(url)
-            dados = resposta.json()
-
-            if resposta.status_code == 200:
-                temp = dados["main"]["temp"]
-                umidade = dados["main"]["humidity"]
-                clima = dados["weather"][0]["description"].capitalize()
-                weather_desc = dados["weather"][0]["description"].lower()
-
-                # ===== Temperatura =====
-                st.subheader("🌡️ Temperatura")
-                st.success(f"A temperatura em **{cidade.title()}** é de **{temp}°C** e o clima está **{clima}**.")
-
-                # ===== Umidade =====
-                st.subheader("💧 Umidade do Ar")
-                st.success(f"A umidade do ar em **{cidade.title()}** é de **{umidade}%**.")
-
-                # ===== Sugestão de roupa =====
-                st.subheader("👕 Sugestão de Roupa")
-                if temp < 15:
-                    sugest = "🧥 Está bem frio — use um casaco pesado e, se possível, cachecol e luvas!"
-                elif 15 <= temp <= 25:
-                    sugest = "👕 Temperatura amena — roupas leves com um agasalho à mão."
-                else:
-                    sugest = "🩳 Está quente — prefira roupas leves e se hidrate bastante!"
-
-                if "chuva" in weather_desc:
-                    sugest += " ☔ E não esqueça o guarda-chuva!"
-
-                st.info(sugest)
+            with instrumentacao.secao("consulta_clima"):
+                status, dados = cliente_clima(OPENWEATHER_KEY).consultar(cidade)
+
+            if status == 200:
+                exibir_clima(cidade, dados)
 
                 # ===== Mensagem final =====
                 mensagens_positivas = [
@@ -103,6 +127,32 @@ if nome:
     else:
         st.warning("Por favor, verifique se a cidade e a chave da API foram configuradas corretamente.")
 
+    # ======================
+    # Briefing matinal: várias cidades
+    # ======================
+    with st.expander("🏢 Clima em todos os escritórios"):
+        texto_cidades = st.text_area("Cidades (uma por linha):", value="Rio de Janeiro\nSão Paulo\nBrasília\nBelo Horizonte")
+        cidades = tuple(dict.fromkeys(c.strip() for c in texto_cidades.splitlines() if c.strip()))
+        if st.button("Consultar escritórios", disabled=not (OPENWEATHER_KEY and cidades)):
+            with instrumentacao.secao("clima_varias_cidades"):
+                st.session_state["clima_escritorios"] = (cidades, clima_varias_cidades(cidades, OPENWEATHER_KEY))
+        if "clima_escritorios" in st.session_state:
+            cidades_consultadas, resultados = st.session_state["clima_escritorios"]
+            if cidades_consultadas != cidades:
+                st.caption("Lista de cidades alterada: clique em **Consultar escritórios** para atualizar.")
+            falhas = [
+                f"{c} ({erro or ('cidade não encontrada' if status == 404 else f'HTTP {status}')})"
+                for c, status, _, erro in resultados if erro or status != 200
+            ]
+            if falhas:
+                st.warning("⚠️ Sem dados para: " + "; ".join(falhas))
+            for c, status, dados, erro in resultados:
+                if not erro and status == 200:
+                    st.markdown(f"### 📍 {c}")
+                    exibir_clima(c, dados)
+
 else:
     st.info("Aguardando seu nome... 😊")
 
+instrumentacao.painel()
+
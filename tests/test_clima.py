@@ -0,0 +1,160 @@
+"""
+Cliente do OpenWeather (clima.py) contra o servidor falso local: sem chave de API nem rede.
+
+Requer as dependências de teste (pip install -r requirements-dev.txt): pytest tests/test_clima.py
+"""
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from clima import ClienteClima, normalizar_cidade, servidor_falso  # noqa: E402
+
+
+@pytest.fixture
+def servidor():
+    with servidor_falso() as (url, recebidas):
+        yield url, recebidas
+
+
+@pytest.mark.parametrize('variante', ['São Paulo', 'sao paulo', 'SÃO PAULO', '  são   paulo ', 'Sao\tPaulo'])
+def test_normalizacao_ignora_acentos_maiusculas_e_espacos(variante):
+    assert normalizar_cidade(variante) == 'sao paulo'
+
+
+def test_variantes_da_cidade_compartilham_o_cache(servidor):
+    url, recebidas = servidor
+    cliente = ClienteClima('chave-falsa', url_base=url)
+    for variante in ['Rio de Janeiro', 'rio de janeiro ', 'RIO DE JANEIRO', 'Río de Janeiro']:
+        status, dados = cliente.consultar(variante)
+        assert status == 200
+    assert recebidas['total'] == 1
+    assert cliente.estatisticas()['cidades_em_cache'] == 1
+
+
+def test_entrada_expira_apos_o_ttl(servidor):
+    url, recebidas = servidor
+    cliente = ClienteClima('chave-falsa', url_base=url, ttl=0.2)
+    cliente.consultar('Recife')
+    cliente.consultar('Recife')
+    assert recebidas['total'] == 1
+    time.sleep(0.3)
+    cliente.consultar('Recife')
+    assert recebidas['total'] == 2
+
+
+def test_lru_descarta_a_cidade_usada_ha_mais_tempo(servidor):
+    url, recebidas = servidor
+    cliente = ClienteClima('chave-falsa', url_base=url, max_cidades=2)
+    cliente.consultar('Natal')
+    cliente.consultar('Belém')
+    cliente.consultar('Natal')      # Natal passa a ser a mais recente
+    cliente.consultar('Manaus')     # descarta Belém
+    assert recebidas['total'] == 3
+    cliente.consultar('Natal')
+    assert recebidas['total'] == 3
+    cliente.consultar('Belém')
+    assert recebidas['total'] == 4
+    assert cliente.estatisticas()['cidades_em_cache'] == 2
+
+
+def test_consultas_simultaneas_da_mesma_cidade_geram_uma_chamada():
+    with servidor_falso(atraso=0.3) as (url, recebidas):
+        cliente = ClienteClima('chave-falsa', url_base=url)
+        with ThreadPoolExecutor(max_workers=20) as pool:
+            respostas = list(pool.map(cliente.consultar, ['Curitiba', 'curitiba', 'CURITIBA '] * 10))
+    assert recebidas['total'] == 1
+    assert {status for status, _ in respostas} == {200}
+    assert len({id(dados) for _, dados in respostas}) == 1
+    estatisticas = cliente.estatisticas()
+    assert estatisticas['chamadas_upstream'] == 1
+    assert estatisticas['faltas'] + estatisticas['coalescidas'] + estatisticas['acertos'] == 30
+
+
+def test_contadores_de_acertos_e_faltas(servidor):
+    url, _ = servidor
+    cliente = ClienteClima('chave-falsa', url_base=url)
+    cliente.consultar('Salvador')
+    cliente.consultar('salvador')
+    cliente.consultar('Fortaleza')
+    cliente.consultar('Cidade Inexistente')
+    cliente.consultar('Cidade Inexistente')
+    assert cliente.estatisticas() == {
+        'acertos': 1, 'faltas': 4, 'coalescidas': 0, 'chamadas_upstream': 4, 'erros': 0, 'cidades_em_cache': 2,
+    }
+
+
+def test_resposta_404_nao_entra_no_cache(servidor):
+    url, recebidas = servidor
+    cliente = ClienteClima('chave-falsa', url_base=url)
+    assert cliente.consultar('Cidade Inexistente')[0] == 404
+    assert cliente.consultar('Cidade Inexistente')[0] == 404
+    assert recebidas['total'] == 2
+
+
+def test_timeout_de_leitura_e_repassado_sem_cache():
+    import requests
+
+    with servidor_falso(atraso=1.0) as (url, recebidas):
+        cliente = ClienteClima('chave-falsa', url_base=url, timeout=(1, 0.2))
+        inicio = time.perf_counter()
+        with pytest.raises(requests.Timeout):
+            cliente.consultar('Goiânia')
+        assert time.perf_counter() - inicio < 0.9
+        with pytest.raises(requests.Timeout):
+            cliente.consultar('Goiânia')
+    assert recebidas['total'] == 2
+    estatisticas = cliente.estatisticas()
+    assert estatisticas['erros'] == 2
+    assert estatisticas['cidades_em_cache'] == 0
+
+
+# --- Várias cidades (assíncrono) ---
+
+def _balde_livre():
+    """Balde próprio e folgado: os testes não gastam nem dependem da cota do BALDE_PROCESSO."""
+    from clima import BaldeDeFichas
+    return BaldeDeFichas(taxa=1000, capacidade=1000)
+
+
+def test_latencia_total_limitada_pela_concorrencia():
+    from clima import consultar_cidades
+
+    atraso = 0.3
+    cidades = [f'Escritório {i}' for i in range(20)]
+    with servidor_falso(atraso=atraso) as (url, recebidas):
+        inicio = time.perf_counter()
+        resultados = consultar_cidades(cidades, 'chave-falsa', url_base=url, concorrencia=10, balde=_balde_livre())
+        decorrido = time.perf_counter() - inicio
+    assert recebidas['total'] == 20
+    assert all(r.ok for r in resultados)
+    # 20 cidades, 10 por vez: duas levas de ~0,3 s (sequencial seriam ~6 s)
+    assert 2 * atraso <= decorrido < 4 * atraso
+
+
+def test_falhas_parciais_nao_derrubam_as_demais_cidades():
+    from clima import consultar_cidades
+
+    cidades = ['Recife', 'Cidade Inexistente', 'Cidade Lenta', 'Natal']
+    with servidor_falso(atraso=0.05, atrasos_por_cidade={'cidade lenta': 2.0}) as (url, _):
+        inicio = time.perf_counter()
+        resultados = consultar_cidades(cidades, 'chave-falsa', url_base=url, timeout=0.5, balde=_balde_livre())
+        decorrido = time.perf_counter() - inicio
+    assert [r.cidade for r in resultados] == cidades
+    assert [r.ok for r in resultados] == [True, False, False, True]
+    assert resultados[1].status == 404 and resultados[1].erro is None
+    assert resultados[2].status is None and 'tempo esgotado' in resultados[2].erro
+    assert decorrido < 1.5
+
+
+def test_consultar_varias_reaproveita_acertos_e_reconsulta_falhas():
+    with servidor_falso() as (url, recebidas):
+        cliente = ClienteClima('chave-falsa', url_base=url)
+        cidades = ['Recife', 'Cidade Inexistente', 'Natal']
+        assert [r.status for r in cliente.consultar_varias(cidades, balde=_balde_livre())] == [200, 404, 200]
+        assert [r.status for r in cliente.consultar_varias(cidades, balde=_balde_livre())] == [200, 404, 200]
+    assert recebidas['total'] == 4  # só a cidade inexistente é consultada de novo
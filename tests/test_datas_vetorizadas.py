@@ -0,0 +1,66 @@
+"""
+Propriedades do motor de datas em lote (datas_vetorizadas.py) contra as funções escalares (relativedelta).
+
+Requer as dependências de teste (pip install -r requirements-dev.txt): pytest tests/test_datas_vetorizadas.py
+"""
+from datetime import date, timedelta
+from pathlib import Path
+import sys
+
+from dateutil.relativedelta import relativedelta
+from hypothesis import given, strategies as st
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from datas_vetorizadas import (  # noqa: E402
+    anos_completos, meses_completos, meses_proporcionais, para_datetime64, verificar_equivalencia,
+)
+from rescisao import calcular_meses_proporcionais  # noqa: E402
+
+# Qualquer dia entre 1900 e 2100, com peso extra nos últimos dias do mês e em 29/02 (ajustes do relativedelta)
+datas_quaisquer = st.dates(min_value=date(1900, 1, 1), max_value=date(2100, 12, 31))
+fins_de_mes = st.builds(
+    lambda ano, mes, recuo: (date(ano + mes // 12, mes % 12 + 1, 1) - timedelta(days=recuo)),
+    st.integers(1900, 2099), st.integers(1, 12), st.integers(1, 3),
+)
+datas = st.one_of(datas_quaisquer, fins_de_mes, st.builds(date, st.sampled_from([2000, 2020, 2024]), st.just(2), st.just(29)))
+lotes = st.lists(st.tuples(datas, datas), min_size=1, max_size=50)
+
+
+@given(lotes)
+def test_meses_completos_equivale_a_relativedelta(pares):
+    inicio, fim = zip(*pares)
+    esperado = [relativedelta(f, i).years * 12 + relativedelta(f, i).months for i, f in pares]
+    assert meses_completos(inicio, fim).tolist() == esperado
+
+
+@given(lotes)
+def test_anos_completos_equivale_a_relativedelta(pares):
+    admissao, demissao = zip(*pares)
+    assert anos_completos(admissao, demissao).tolist() == [relativedelta(d, a).years for a, d in pares]
+
+
+@given(lotes)
+def test_meses_proporcionais_equivale_ao_calculo_escalar(pares):
+    admissao, demissao = zip(*pares)
+    esperado = [calcular_meses_proporcionais(a, d)[0] for a, d in pares]
+    assert meses_proporcionais(admissao, demissao).tolist() == esperado
+
+
+@pytest.mark.parametrize('ausente', [np.datetime64('NaT'), None, ''])
+def test_data_ausente_gera_erro(ausente):
+    with pytest.raises(ValueError, match='posição'):
+        meses_proporcionais(['2020-01-10', '2021-05-03'], ['2023-02-01', ausente])
+    with pytest.raises(ValueError):
+        anos_completos([ausente], ['2023-02-01'])
+
+
+def test_erro_indica_posicoes():
+    with pytest.raises(ValueError, match=r'2 data\(s\).*1, 3'):
+        para_datetime64(['2020-01-01', 'NaT', '2020-03-01', 'NaT'])
+
+
+def test_verificacao_em_massa_sem_divergencias():
+    assert verificar_equivalencia(n=20_000, semente=1) == []
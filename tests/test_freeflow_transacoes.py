@@ -0,0 +1,55 @@
+"""
+Apurador do Free Flow (freeflow_transacoes.py) com ids de passagem repetidos.
+
+Requer as dependências de teste (pip install -r requirements-dev.txt): pytest tests/test_freeflow_transacoes.py
+"""
+from pathlib import Path
+import sys
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from freeflow_transacoes import (  # noqa: E402
+    DIA, PAGAMENTO, PASSAGEM, ApuradorInadimplencia, gerar_eventos, tabela_grafico,
+)
+
+INICIO = int(np.datetime64('2024-06-01', 's').astype(np.int64))
+
+
+def _bloco(*eventos):
+    instantes, tipos, ids, valores = zip(*eventos)
+    return (np.array(instantes, np.int64), np.array(tipos, np.int8), np.array(ids, np.int64),
+            np.array(valores, np.float64))
+
+
+def test_id_repetido_em_aberto_e_descartado():
+    blocos = [
+        _bloco((INICIO, PASSAGEM, 7, 10.0), (INICIO + 5, PASSAGEM, 7, 10.0), (INICIO + 9, PASSAGEM, 8, 5.0)),
+        _bloco((INICIO + DIA, PASSAGEM, 8, 5.0), (INICIO + 2 * DIA, PAGAMENTO, 7, 10.0)),
+        _bloco((INICIO + 200 * DIA, PASSAGEM, 9, 1.0)),
+    ]
+    apurador = ApuradorInadimplencia().consumir(blocos, tamanho_bloco=1)
+    assert apurador.passagens_duplicadas == 2
+    assert apurador.pagamentos_sem_passagem == 0
+    junho = apurador.agregados().iloc[0]
+    assert (junho['passagens'], junho['pagas_no_prazo'], junho['inadimplentes']) == (2, 1, 1)
+    assert junho['valor_passagens'] == 15.0
+
+
+def test_id_volta_a_valer_depois_que_a_original_sai_da_janela():
+    blocos = [
+        _bloco((INICIO, PASSAGEM, 7, 10.0), (INICIO + DIA, PAGAMENTO, 7, 10.0)),
+        _bloco((INICIO + 2 * DIA, PASSAGEM, 7, 10.0), (INICIO + 3 * DIA, PAGAMENTO, 7, 10.0)),
+    ]
+    apurador = ApuradorInadimplencia().consumir(blocos, tamanho_bloco=1)
+    assert apurador.passagens_duplicadas == 0
+    assert apurador.agregados().iloc[0]['pagas_no_prazo'] == 2
+
+
+def test_leituras_duplicadas_nao_alteram_as_taxas():
+    limpo = ApuradorInadimplencia().consumir(gerar_eventos(2_000, 40), tamanho_bloco=5_000)
+    repetido = ApuradorInadimplencia().consumir(
+        gerar_eventos(2_000, 40, taxa_duplicadas=0.05), tamanho_bloco=5_000)
+    assert repetido.passagens_duplicadas > 0
+    assert tabela_grafico(repetido.agregados()).equals(tabela_grafico(limpo.agregados()))